@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import ScheduledJob, ScheduledJobRun
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'next_run_at', 'locked_by', 'locked_until')
+    search_fields = ('name',)
+
+
+@admin.register(ScheduledJobRun)
+class ScheduledJobRunAdmin(admin.ModelAdmin):
+    list_display = ('name', 'started_at', 'duration_ms', 'rows', 'succeeded', 'node')
+    list_filter = ('succeeded', 'name')
+    readonly_fields = ('name', 'node', 'started_at', 'duration_ms', 'rows', 'succeeded', 'error')
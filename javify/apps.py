@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class JavifyConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'javify'
+
+    def ready(self):
+        from . import checks  # noqa: F401
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'javify.settings')
 
 application = get_asgi_application()
+
+# Build the in-memory tutorial catalog before the first request
+from tutorials.catalog import warm_catalog  # noqa: E402
+
+warm_catalog()
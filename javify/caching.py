@@ -0,0 +1,206 @@
+"""
+Stale-while-revalidate response cache with request coalescing.
+
+Rendered JSON bodies are stored in the Django cache together with the
+content version they were built from and a "fresh until" time. Versions
+only ever grow, so a worker that still sees an older version (e.g. an older
+catalog snapshot) is served the newer entry and never overwrites it.
+
+  * fresh or newer entry          -> served as is (hit)
+  * expired or older version      -> one request takes the revalidation lock
+                                     and recomputes, everyone else is served
+                                     the stale body meanwhile (stale)
+  * nothing cached                -> one request computes, concurrent requests
+                                     for the same key wait for its result
+                                     instead of repeating the work (coalesced)
+
+Waiting happens per process on a per-key thread lock, and across processes
+on a lock key taken with cache.add(). That lock is only as shared as the
+cache: a per-process backend such as LocMemCache fails `check --deploy`
+(javify.E001), and with a shared CACHES backend only one worker recomputes.
+API_CACHE_ENABLED=False turns the cache off. Outcome counters are kept per
+process and exposed to staff through CacheMetricsView. Views opt in with
+@cached_response.
+"""
+import functools
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+POLL_INTERVAL = 0.05
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+_key_locks = {}  # key -> [lock, waiters]
+_key_locks_lock = threading.Lock()
+
+
+def _record(name, outcome):
+    with _metrics_lock:
+        _metrics[(name, outcome)] += 1
+
+
+def cache_metrics():
+    """{name: {outcome: count}} for this process."""
+    with _metrics_lock:
+        items = list(_metrics.items())
+    metrics = {}
+    for (name, outcome), count in items:
+        metrics.setdefault(name, {})[outcome] = count
+    return metrics
+
+
+class _KeyLock:
+    """Process-local lock for one cache key, dropped when nobody uses it."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        with _key_locks_lock:
+            entry = _key_locks.setdefault(self.key, [threading.Lock(), 0])
+            entry[1] += 1
+        self.entry = entry
+        entry[0].acquire()
+
+    def __exit__(self, *exc):
+        self.entry[0].release()
+        with _key_locks_lock:
+            self.entry[1] -= 1
+            if not self.entry[1]:
+                _key_locks.pop(self.key, None)
+
+
+def _acquire(key, timeout):
+    return cache.add(f'{key}:lock', True, timeout)
+
+
+def _release(key):
+    cache.delete(f'{key}:lock')
+
+
+def _store(key, version, compute, ttl, stale_ttl):
+    value = compute()
+    current = cache.get(key)
+    if current is None or current[0] <= version:
+        cache.set(key, (version, time.time() + ttl, value), ttl + stale_ttl)
+    return value
+
+
+def get_or_compute(key, version, compute, ttl=None, stale_ttl=None, name='default'):
+    """
+    Return (value, outcome) for `key`, calling compute() at most once across
+    concurrent callers. `version` identifies the content the value was built
+    from and must increase with every change; a cached value of an older
+    version is treated as stale, one of a newer version as current.
+    """
+    ttl = settings.API_CACHE_TTL if ttl is None else ttl
+    stale_ttl = settings.API_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+    lock_timeout = settings.API_CACHE_LOCK_TIMEOUT
+
+    entry = cache.get(key)
+    if entry is not None:
+        entry_version, fresh_until, value = entry
+        if entry_version > version or (entry_version == version and time.time() < fresh_until):
+            # A newer entry is served even if expired: this worker can only rebuild older content
+            _record(name, 'hit')
+            return value, 'hit'
+        if not _acquire(key, lock_timeout):
+            _record(name, 'stale')
+            return value, 'stale'
+        _record(name, 'revalidate')
+        try:
+            return _store(key, version, compute, ttl, stale_ttl), 'revalidate'
+        finally:
+            _release(key)
+
+    with _KeyLock(key):
+        deadline = time.monotonic() + lock_timeout
+        while True:
+            entry = cache.get(key)
+            if entry is not None and entry[0] >= version:
+                _record(name, 'coalesced')
+                return entry[2], 'coalesced'
+            if _acquire(key, lock_timeout):
+                _record(name, 'miss')
+                try:
+                    return _store(key, version, compute, ttl, stale_ttl), 'miss'
+                finally:
+                    _release(key)
+            if time.monotonic() >= deadline:
+                # The other process is taking too long; don't keep the client waiting
+                _record(name, 'miss')
+                return compute(), 'miss'
+            time.sleep(POLL_INTERVAL)
+
+
+# -----------------------------
+# Content generations
+# -----------------------------
+def _generation_seed():
+    # Microseconds: a counter recreated after an eviction starts above every
+    # value it had before, so versions keep growing
+    return time.time_ns() // 1000
+
+
+def generation(name):
+    """Counter for content without its own version stamp (e.g. the jobs board)."""
+    key = f'generation:{name}'
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _generation_seed(), None)
+        value = cache.get(key, 0)
+    return value
+
+
+def bump_generation(name):
+    """Advance the counter once the current transaction commits."""
+    def bump():
+        key = f'generation:{name}'
+        if not cache.add(key, _generation_seed(), None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Evicted between add() and incr()
+                cache.add(key, _generation_seed(), None)
+    transaction.on_commit(bump)
+
+
+def cached_response(name, version, ttl=None, stale_ttl=None):
+    """
+    Decorator for DRF view get() methods: cache the rendered JSON of the response.
+
+    `version(request)` returns the version of the content the response is built
+    from. The cache key is the full request path, so the response must not vary
+    by user.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not settings.API_CACHE_ENABLED or request.accepted_renderer.format != 'json':
+                return method(view, request, *args, **kwargs)
+
+            def compute():
+                response = method(view, request, *args, **kwargs)
+                return response.status_code, JSONRenderer().render(response.data)
+
+            (status_code, body), outcome = get_or_compute(
+                f'api-response:{name}:{request.get_full_path()}',
+                version(request),
+                compute,
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                name=name,
+            )
+            response = HttpResponse(body, status=status_code, content_type='application/json')
+            response['X-Cache'] = outcome.upper()
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Backends whose entries live in one worker process only
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The API response cache (javify/caching.py) coalesces recomputation across
+    workers with a lock taken in the cache, so in production it needs a
+    backend all workers share (Redis, Memcached, the database).
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if not settings.API_CACHE_ENABLED or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"{backend} is private to each worker, so every worker recomputes cached API responses on its own.",
+            hint="Point CACHE_BACKEND/CACHE_LOCATION at a shared cache, or set API_CACHE_ENABLED=False.",
+            id='javify.E001',
+        )
+    ]
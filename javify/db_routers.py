@@ -0,0 +1,113 @@
+"""
+Primary/replica database routing with read-your-writes stickiness.
+
+Writes always go to the primary ("default"). Views that opt in with
+ReplicaReadMixin run their GET queries against the "replica" alias, unless
+the requesting user wrote something in the last REPLICA_PIN_SECONDS, in which
+case they stay on the primary so they never see their own changes missing
+because of replication lag.
+
+The pin travels with the client as a signed, short-lived cookie naming the
+user, so it holds whichever worker or host serves the next request and needs
+no shared server-side store.
+"""
+import contextvars
+
+from django.conf import settings
+from django.core.signing import BadSignature
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Alias used for reads during the current request (None = primary)
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+PIN_COOKIE = 'db_primary_pin'
+_PIN_SALT = 'javify.db_routers.pin'
+
+
+def pin_to_primary(response, user_id):
+    """Keep this user's reads on the primary for REPLICA_PIN_SECONDS."""
+    response.set_signed_cookie(
+        PIN_COOKIE,
+        str(user_id),
+        salt=_PIN_SALT,
+        max_age=settings.REPLICA_PIN_SECONDS,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+def is_pinned_to_primary(request, user_id):
+    try:
+        pinned = request.get_signed_cookie(PIN_COOKIE, salt=_PIN_SALT, max_age=settings.REPLICA_PIN_SECONDS)
+    except (KeyError, BadSignature):
+        return False
+    return pinned == str(user_id)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, otherwise Django would save replica-loaded instances back to the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: serve safe requests from the replica.
+    The switch happens after authentication, so the user lookup itself and
+    the pin check see the primary; it is undone when dispatch() returns or
+    raises.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self._read_alias_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._read_alias_token is not None:
+                _read_alias.reset(self._read_alias_token)
+                self._read_alias_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_configured():
+            user_id = getattr(request.user, 'pk', None)
+            if user_id is None or not is_pinned_to_primary(request, user_id):
+                self._read_alias_token = _read_alias.set(REPLICA_ALIAS)
+
+
+class ReadYourWritesMiddleware:
+    """Pin users to the primary after any successful write request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and replica_configured()
+        ):
+            # DRF copies the JWT-authenticated user onto the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(response, user.pk)
+        return response
@@ -0,0 +1,105 @@
+"""
+Binary deltas between two versions of a file (offline bundle patches).
+
+    header   magic, source size, target size, sha256 of the target
+    ops      COPY offset length     bytes taken from the source
+             DATA length bytes      literal bytes
+             (the op stream after the header is zlib-compressed)
+
+make_delta() matches BLOCK_SIZE blocks at block-aligned offsets of the
+source and the target. Members of a tar archive start on 512-byte
+boundaries, so every unchanged member of a rebuilt archive is found with one
+dict lookup per block, wherever it moved to; building a delta costs about as
+much as reading both files. Edited members travel as DATA, which compresses
+well since it is mostly text.
+"""
+import hashlib
+import struct
+import zlib
+
+MAGIC = b'JVDELTA1'
+BLOCK_SIZE = 512
+
+_HEADER = struct.Struct('<8sQQ32s')  # magic, source size, target size, target sha256
+_COPY = struct.Struct('<BQI')        # op, source offset, length
+_DATA = struct.Struct('<BI')         # op, length
+
+OP_COPY = 1
+OP_DATA = 2
+
+
+class DeltaError(ValueError):
+    pass
+
+
+def make_delta(source, target, block_size=BLOCK_SIZE):
+    """Delta that turns `source` into `target` (both bytes)."""
+    blocks = {}
+    for offset in range(0, len(source) - block_size + 1, block_size):
+        blocks.setdefault(source[offset:offset + block_size], offset)
+
+    ops = []  # [OP_COPY, offset, length] / [OP_DATA, start, end] into target
+    for offset in range(0, len(target), block_size):
+        block = target[offset:offset + block_size]
+        last = ops[-1] if ops else None
+        if len(block) == block_size:
+            # Prefer continuing the previous copy (runs of identical blocks, e.g. padding)
+            if last and last[0] == OP_COPY and source[last[1] + last[2]:last[1] + last[2] + block_size] == block:
+                last[2] += block_size
+                continue
+            source_offset = blocks.get(block)
+            if source_offset is not None:
+                ops.append([OP_COPY, source_offset, block_size])
+                continue
+        if last and last[0] == OP_DATA:
+            last[2] = offset + len(block)
+        else:
+            ops.append([OP_DATA, offset, offset + len(block)])
+
+    encoded = bytearray()
+    for op, a, b in ops:
+        if op == OP_COPY:
+            encoded += _COPY.pack(OP_COPY, a, b)
+        else:
+            encoded += _DATA.pack(OP_DATA, b - a)
+            encoded += target[a:b]
+    header = _HEADER.pack(MAGIC, len(source), len(target), hashlib.sha256(target).digest())
+    return header + zlib.compress(bytes(encoded), 9)
+
+
+def apply_delta(source, delta):
+    """Rebuild the target from `source` and a delta made by make_delta()."""
+    if len(delta) < _HEADER.size:
+        raise DeltaError("Truncated delta")
+    magic, source_size, target_size, digest = _HEADER.unpack_from(delta)
+    if magic != MAGIC:
+        raise DeltaError("Not a delta")
+    if len(source) != source_size:
+        raise DeltaError("Delta was made for a different source")
+    try:
+        ops = zlib.decompress(delta[_HEADER.size:])
+    except zlib.error as exc:
+        raise DeltaError(f"Corrupt delta: {exc}") from None
+
+    target = bytearray()
+    position = 0
+    try:
+        while position < len(ops):
+            op = ops[position]
+            if op == OP_COPY:
+                _, offset, length = _COPY.unpack_from(ops, position)
+                position += _COPY.size
+                target += source[offset:offset + length]
+            elif op == OP_DATA:
+                _, length = _DATA.unpack_from(ops, position)
+                position += _DATA.size
+                target += ops[position:position + length]
+                position += length
+            else:
+                raise DeltaError(f"Unknown op {op}")
+    except struct.error:
+        raise DeltaError("Truncated delta") from None
+
+    if len(target) != target_size or hashlib.sha256(target).digest() != digest:
+        raise DeltaError("Patched file doesn't match the target checksum")
+    return bytes(target)
@@ -0,0 +1,87 @@
+"""
+Compiled read-only serializers for hot list endpoints.
+
+compile_serializer(SomeModelSerializer) inspects the serializer's fields once
+and turns them into a plan of database columns plus per-field converters.
+Serializing then fetches plain tuples with .values_list() and builds each
+output dict directly, skipping model instances, serializer instances and the
+per-field to_representation dispatch. Output is the same as
+SomeModelSerializer(queryset, many=True).data.
+
+Supported fields: concrete model fields (including FK ids) and
+"<relation>.count" sources, which become a COUNT annotation. Anything else
+(method fields, nested or string-related fields) raises TypeError at compile
+time, so a serializer change can't silently produce different output.
+"""
+from django.db.models import Count
+from rest_framework import serializers
+
+# Fields whose to_representation() returns database values unchanged
+_PASSTHROUGH = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+)
+
+
+class CompiledSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        model = serializer_class.Meta.model
+        self.annotations = {}
+        self.columns = []
+        self.plan = []  # (output name, column position, converter or None)
+
+        for name, field in serializer_class().fields.items():
+            source = field.source
+            if source.endswith('.count') and source.count('.') == 1:
+                relation = source[:-len('.count')]
+                alias = f'_count_{relation}'
+                self.annotations[alias] = Count(relation)
+                column = alias
+            elif '.' not in source and source != '*' and not isinstance(
+                field, (serializers.RelatedField, serializers.Serializer, serializers.SerializerMethodField)
+            ):
+                model_field = model._meta.get_field(source)
+                column = model_field.attname if model_field.is_relation else source
+            else:
+                raise TypeError(
+                    f"{serializer_class.__name__}.{name} ({type(field).__name__}, source={source!r}) "
+                    "can't be compiled"
+                )
+
+            converter = None if type(field) in _PASSTHROUGH else field.to_representation
+            self.plan.append((name, len(self.columns), converter))
+            self.columns.append(column)
+
+    def rows(self, queryset):
+        """The value tuples serialize_rows() expects."""
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset.values_list(*self.columns)
+
+    def serialize_rows(self, rows):
+        plan = self.plan
+        data = []
+        for row in rows:
+            item = {}
+            for name, position, converter in plan:
+                value = row[position]
+                item[name] = value if converter is None or value is None else converter(value)
+            data.append(item)
+        return data
+
+    def serialize(self, queryset):
+        """Equivalent of serializer_class(queryset, many=True).data."""
+        return self.serialize_rows(self.rows(queryset))
+
+
+_compiled = {}
+
+
+def compile_serializer(serializer_class):
+    """Compiled (and cached) read-only version of a ModelSerializer class."""
+    compiled = _compiled.get(serializer_class)
+    if compiled is None:
+        compiled = _compiled[serializer_class] = CompiledSerializer(serializer_class)
+    return compiled
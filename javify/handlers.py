@@ -0,0 +1,91 @@
+"""
+WSGI handler with a lean middleware chain for token-authenticated API views.
+
+settings.MIDDLEWARE stays the full stack (admin and allauth check for it).
+RoutedWSGIHandler additionally builds a second chain without the
+LEAN_API_SKIPPED_MIDDLEWARE entries (sessions, CSRF, auth, messages,
+allauth) and sends a request through it when its URL resolves to a DRF view
+none of whose authentication classes use the session. Those views
+authenticate from the Authorization header, are CSRF-exempt and never touch
+messages, so the skipped middleware only cost time for them: loading the
+session, the lazy request.user, the CSRF cookie checks. /admin/, /accounts/
+and anything else that isn't such a view keeps the full stack.
+"""
+import functools
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import Resolver404, get_resolver, set_urlconf
+from django.utils.module_loading import import_string
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.views import APIView
+
+
+def uses_session(view_class):
+    return any(issubclass(auth, SessionAuthentication) for auth in view_class.authentication_classes)
+
+
+class LeanHandler(BaseHandler):
+    """Synchronous handler whose chain is MIDDLEWARE minus the skipped entries."""
+
+    def load_middleware(self, is_async=False):
+        skipped = set(settings.LEAN_API_SKIPPED_MIDDLEWARE)
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        handler = convert_exception_to_response(self._get_response)
+        for middleware_path in reversed(settings.MIDDLEWARE):
+            if middleware_path in skipped:
+                continue
+            try:
+                mw_instance = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if mw_instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+            if hasattr(mw_instance, 'process_view'):
+                self._view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, 'process_template_response'):
+                self._template_response_middleware.append(mw_instance.process_template_response)
+            if hasattr(mw_instance, 'process_exception'):
+                self._exception_middleware.append(mw_instance.process_exception)
+            handler = convert_exception_to_response(mw_instance)
+        self._middleware_chain = handler
+
+
+class RoutedWSGIHandler(WSGIHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lean_handler = LeanHandler()
+        self.lean_handler.load_middleware()
+        self._lean_views = {}  # view function -> bool
+        # Resolving a URL costs about as much as a skipped middleware; remember the answer per path
+        self._is_lean_path = functools.lru_cache(maxsize=4096)(self._resolve_is_lean)
+
+    def is_lean(self, request):
+        """True when the request's view is a DRF view that doesn't authenticate via the session."""
+        return self._is_lean_path(request.path_info)
+
+    def _resolve_is_lean(self, path_info):
+        try:
+            match = get_resolver().resolve(path_info)
+        except Resolver404:
+            return False
+        func = match.func
+        lean = self._lean_views.get(func)
+        if lean is None:
+            view_class = getattr(func, 'cls', None)
+            lean = self._lean_views[func] = (
+                isinstance(view_class, type) and issubclass(view_class, APIView) and not uses_session(view_class)
+            )
+        return lean
+
+    def get_response(self, request):
+        set_urlconf(settings.ROOT_URLCONF)
+        if self.is_lean(request):
+            return self.lean_handler.get_response(request)
+        return super().get_response(request)
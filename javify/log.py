@@ -0,0 +1,203 @@
+"""
+Non-blocking JSON logging.
+
+QueueingHandler is the only handler request threads touch: it stamps the
+record with the current request id, resolves the %-style message and puts
+the record on a bounded in-memory queue. A listener thread takes records off
+the queue, formats them as one JSON object per line (JSONFormatter) and
+writes them, so a slow terminal, pipe or log shipper never holds up a
+request.
+
+Under overload the queue degrades instead of blocking: above
+LOG_QUEUE_HIGH_WATER of its capacity only one in LOG_OVERLOAD_SAMPLE_RATE
+records below WARNING is kept, and when it is full new records are dropped.
+Dropped records are counted and reported by the listener once it catches up.
+
+RequestLogMiddleware gives every request an id (X-Request-ID, taken from the
+request when a proxy already set a sane one) and logs one access record per
+request with its method, path, status and duration_ms.
+"""
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import traceback
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+access_logger = logging.getLogger('javify.request')
+
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = ''.join(traceback.format_exception(*record.exc_info))
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueingHandler(QueueHandler):
+    """
+    Enqueue records for a background listener that writes them to `stream`.
+    The formatter configured for this handler is used by the listener.
+    """
+
+    def __init__(self, stream=None, queue_size=10000, high_water=0.8, sample_rate=10):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.high_water = int(queue_size * high_water)
+        self.sample_rate = max(1, sample_rate)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.target = logging.StreamHandler(stream)
+        self.target.setFormatter(JSONFormatter())
+        self.listener = None
+        self._closed = False
+        self.start()
+        atexit.register(self.stop)
+        # A forked worker inherits the queue but not the listener thread
+        os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def start(self):
+        self.listener = QueueListener(self.queue, _Writer(self))
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()  # drains the queue first
+            self.listener = None
+
+    def close(self):
+        self._closed = True
+        self.stop()
+        super().close()
+
+    def _restart_in_child(self):
+        if self._closed:
+            return
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self._dropped_lock = threading.Lock()
+        self.dropped = 0
+        self.start()
+
+    def prepare(self, record):
+        # Runs in the request thread: resolve the message and copy what is
+        # only reachable from here, but leave JSON and tracebacks to the listener.
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if getattr(record, 'request_id', None) is None:
+            # django.request logs after the middleware chain has returned
+            request = getattr(record, 'request', None)
+            record.request_id = request_id_var.get() or getattr(request, 'request_id', None)
+        return record
+
+    def emit(self, record):
+        if (
+            record.levelno < logging.WARNING
+            and self.queue.qsize() >= self.high_water
+            and random.randrange(self.sample_rate)
+        ):
+            self._drop()
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+    def _drop(self):
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def take_dropped(self):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class _Writer:
+    """Listener-side handler: writes records and reports drops."""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.level = logging.NOTSET
+
+    def handle(self, record):
+        target = self.owner.target
+        dropped = self.owner.take_dropped()
+        if dropped:
+            target.handle(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "Log queue overloaded, dropped %s records",
+                "args": (dropped,),
+                "dropped": dropped,
+            }))
+        target.handle(record)
+
+
+class RequestLogMiddleware:
+    """Tag the request with an id and log one access record when it finishes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request_id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        request.request_id = request_id
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            response['X-Request-ID'] = request_id
+            access_logger.info(
+                "%s %s %s",
+                request.method,
+                request.path,
+                response.status_code,
+                extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                },
+            )
+            return response
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,15 @@
+"""Periodic jobs for the project itself (see javify/scheduler.py)."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ScheduledJobRun
+from .scheduler import delete_in_batches, periodic
+
+
+@periodic(every=timedelta(days=1))
+def prune_job_runs():
+    """Drop run records older than SCHEDULER_RUN_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.SCHEDULER_RUN_RETENTION_DAYS)
+    return delete_in_batches(ScheduledJobRun.objects.filter(started_at__lt=cutoff))
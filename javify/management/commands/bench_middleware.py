@@ -0,0 +1,76 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from javify.handlers import RoutedWSGIHandler
+
+DEFAULT_PATHS = ['/levels/', '/profile/', '/jobs/', '/user/progress/']
+
+
+def _per_call(number, func):
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - started) / number
+
+
+def _best_of(repeat, number, variants):
+    """Best time per call of each variant; runs are interleaved so drift hits all alike."""
+    for func in variants.values():
+        _per_call(number, func)  # warm up
+    best = dict.fromkeys(variants, float('inf'))
+    for _ in range(repeat):
+        for label, func in variants.items():
+            best[label] = min(best[label], _per_call(number, func))
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Time API requests through the full middleware stack and through the "
+        "lean chain RoutedWSGIHandler uses for token-authenticated DRF views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f"GET paths (default: {' '.join(DEFAULT_PATHS)}).")
+        parser.add_argument('--user', help="Username to send a bearer token for (default: first user).")
+        parser.add_argument('--number', type=int, default=200, help="Requests per run.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per variant; the best one counts.")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        user = users.filter(username=options['user']).first() if options['user'] else users.first()
+        if options['user'] and user is None:
+            raise CommandError(f"No user named {options['user']!r}")
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'} if user else {}
+
+        handler = RoutedWSGIHandler()
+        factory = RequestFactory()
+        full = super(RoutedWSGIHandler, handler).get_response
+        lean = handler.lean_handler.get_response
+
+        for path in options['paths'] or DEFAULT_PATHS:
+            def request():
+                return factory.get(path, **headers)
+
+            probe = request()
+            if not handler.is_lean(probe):
+                self.stdout.write(f"{path}: not a token-authenticated API view, always uses the full stack")
+                continue
+            full_response, lean_response = full(request()), lean(request())
+            if (full_response.status_code, full_response.content) != (lean_response.status_code, lean_response.content):
+                raise CommandError(f"{path}: the lean chain returned a different response")
+
+            timings = _best_of(options['repeat'], options['number'], {
+                'full stack': lambda: full(request()),
+                'lean chain': lambda: lean(request()),
+                'routing check': lambda: handler.is_lean(probe),
+            })
+            self.stdout.write(f"{path} ({full_response.status_code}, identical body)")
+            for label, seconds in timings.items():
+                self.stdout.write(f"  {label:<16} {seconds * 1e6:8.1f} µs/request")
+            saved = timings['full stack'] - timings['lean chain'] - timings['routing check']
+            self.stdout.write(self.style.SUCCESS(f"  saved {saved * 1e6:.1f} µs/request net of routing"))
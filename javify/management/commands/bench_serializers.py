@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from rest_framework.renderers import JSONRenderer
+
+from javify.fast_serializers import compile_serializer
+
+DEFAULT_SERIALIZERS = [
+    'tutorials.serializers.LevelSerializer',
+    'tutorials.serializers.CodingTopicSerializer',
+    'tutorials.serializers.CodingProblemListSerializer',
+    'jobs.serializers.JobNotificationListSerializer',
+]
+
+
+def _best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-row cost of ModelSerializer(many=True) with the compiled "
+        "read-only path on existing rows, and check both render the same JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('serializers', nargs='*', help="Dotted paths (default: the hot list serializers).")
+        parser.add_argument('--rows', type=int, default=5000, help="Rows to read per serializer.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per variant; the best one counts.")
+
+    def handle(self, *args, **options):
+        render = JSONRenderer().render
+        for path in options['serializers'] or DEFAULT_SERIALIZERS:
+            serializer_class = import_string(path)
+            model = serializer_class.Meta.model
+            queryset = model._default_manager.all()[:options['rows']]
+            compiled = compile_serializer(serializer_class)
+
+            expected = render(serializer_class(queryset, many=True).data)
+            if render(compiled.serialize(queryset)) != expected:
+                raise CommandError(f"{path}: compiled output differs from the serializer")
+            count = len(queryset)
+            if not count:
+                self.stdout.write(f"{path}: no {model.__name__} rows, skipped")
+                continue
+
+            # Fetch once for the serialization-only comparison
+            instances = list(queryset)
+            rows = list(compiled.rows(queryset))
+            timings = {
+                'model serializer': _best_of(
+                    options['repeat'], lambda: serializer_class(queryset.all(), many=True).data
+                ),
+                'compiled': _best_of(options['repeat'], lambda: compiled.serialize(queryset.all())),
+                'model serializer (no fetch)': _best_of(
+                    options['repeat'], lambda: serializer_class(instances, many=True).data
+                ),
+                'compiled (no fetch)': _best_of(options['repeat'], lambda: compiled.serialize_rows(rows)),
+            }
+
+            self.stdout.write(f"{path} ({count} rows, identical JSON)")
+            for label, seconds in timings.items():
+                self.stdout.write(f"  {label:<30} {seconds / count * 1e6:8.2f} µs/row")
+            speedup = timings['model serializer'] / timings['compiled']
+            self.stdout.write(self.style.SUCCESS(f"  compiled path is {speedup:.1f}x faster end to end"))
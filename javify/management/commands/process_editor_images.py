@@ -0,0 +1,46 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from javify.uploads import EditorImageStorage, build_variants, is_content_hashed, rewrite_references
+
+
+class Command(BaseCommand):
+    help = (
+        "Build missing resized variants of CKEditor uploads (e.g. after a crash "
+        "or for files uploaded before the pipeline existed) and rewrite the "
+        "rich-text fields that show them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild variants that already exist.")
+
+    def handle(self, *args, **options):
+        storage = EditorImageStorage()
+        if not os.path.isdir(storage.location):
+            self.stdout.write("No uploads yet.")
+            return
+
+        built = skipped = rows = 0
+        for directory in sorted(storage.listdir('')[0]):
+            for filename in sorted(storage.listdir(directory)[1]):
+                name = f'{directory}/{filename}'
+                base, extension = os.path.splitext(filename)
+                # Originals only: not variants, manifests or half-written temp files
+                if extension == '.json' or '-' in base or '.tmp' in filename or not is_content_hashed(name):
+                    continue
+                if storage.exists(f'{directory}/{base}.json') and not options['force']:
+                    skipped += 1
+                    continue
+                try:
+                    manifest = build_variants(name, storage)
+                except Exception as exc:
+                    self.stderr.write(f"{name}: {exc}")
+                    continue
+                if manifest:
+                    built += 1
+                    rows += rewrite_references(name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {built} uploads ({skipped} already done), updated {rows} rows."
+        ))
@@ -0,0 +1,109 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: what a new worker does before serving its first request
+BOOT_SCRIPT = """
+import os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+import {module}
+if {load_urls!r}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+"""
+
+
+def _boot(module, load_urls, importtime=False):
+    script = BOOT_SCRIPT.format(
+        settings_module=os.environ.get('DJANGO_SETTINGS_MODULE', 'javify.settings'),
+        module=module,
+        load_urls=load_urls,
+    )
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', script]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=settings.BASE_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise CommandError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+
+def _parse_importtime(output):
+    """[(module, self µs, cumulative µs, depth)] from python -X importtime output."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile worker cold start: per-module import cost of javify.wsgi or "
+        "javify.asgi (plus the URLconf the first request loads) and boot time "
+        "over several fresh interpreters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entrypoint', choices=['wsgi', 'asgi'], default='wsgi')
+        parser.add_argument('--no-urls', action='store_true', help="Don't import the URLconf.")
+        parser.add_argument('--top', type=int, default=25, help="Modules and packages to list.")
+        parser.add_argument('--repeat', type=int, default=5, help="Boots to time.")
+        parser.add_argument(
+            '--record', metavar='PATH',
+            help="Append the boot timings as a JSON line to PATH to track them over time.",
+        )
+
+    def handle(self, *args, **options):
+        module = f"javify.{options['entrypoint']}"
+        load_urls = not options['no_urls']
+        top = options['top']
+
+        _, output = _boot(module, load_urls, importtime=True)
+        modules = _parse_importtime(output)
+        total_us = sum(self_us for _, self_us, _, _ in modules)
+
+        self.stdout.write(f"{module}: {len(modules)} modules imported, {total_us / 1000:.0f} ms of import time")
+        self.stdout.write("\nSlowest modules (own time, cumulative time):")
+        for name, self_us, cumulative_us, _ in sorted(modules, key=lambda m: -m[1])[:top]:
+            self.stdout.write(f"  {self_us / 1000:7.1f} ms {cumulative_us / 1000:8.1f} ms  {name}")
+
+        packages = defaultdict(int)
+        for name, self_us, _, _ in modules:
+            packages[name.split('.')[0]] += self_us
+        self.stdout.write("\nCost per top-level package:")
+        for package, self_us in sorted(packages.items(), key=lambda p: -p[1])[:top]:
+            self.stdout.write(f"  {self_us / 1000:7.1f} ms  {package} ({self_us * 100 / total_us:.0f}%)")
+
+        boots = [_boot(module, load_urls)[0] for _ in range(options['repeat'])]
+        summary = {
+            'entrypoint': options['entrypoint'],
+            'urls': load_urls,
+            'modules': len(modules),
+            'boot_ms_min': round(min(boots) * 1000, 1),
+            'boot_ms_median': round(statistics.median(boots) * 1000, 1),
+        }
+        self.stdout.write(self.style.SUCCESS(
+            f"\nBoot time over {len(boots)} runs: min {summary['boot_ms_min']} ms, "
+            f"median {summary['boot_ms_median']} ms"
+        ))
+
+        if options['record']:
+            summary['recorded_at'] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+            summary['packages_ms'] = {
+                package: round(self_us / 1000, 1)
+                for package, self_us in sorted(packages.items(), key=lambda p: -p[1])[:top]
+            }
+            with open(options['record'], 'a') as fh:
+                fh.write(json.dumps(summary) + '\n')
+            self.stdout.write(f"Recorded to {options['record']}")
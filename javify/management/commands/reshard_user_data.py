@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from javify.sharding import SHARDED_MODELS, shard_for_user_id, user_shards
+
+
+@contextmanager
+def preserve_auto_dates(model):
+    """Stop auto_now/auto_now_add from overwriting copied timestamps."""
+    fields = [
+        f for f in model._meta.concrete_fields
+        if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Move per-user rows to the shard their user_id hashes to under the "
+        "current USER_SHARDS. Safe to re-run: copies skip rows already present "
+        "on the target and sources are only deleted after the copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from', dest='sources', nargs='+',
+            help="Aliases to scan (default: USER_SHARDS). Include an old shard being retired here.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        sources = options['sources'] or user_shards()
+        for label in sorted(SHARDED_MODELS):
+            model = apps.get_model(label)
+            for source in sources:
+                moved = self.move_rows(model, source, options['batch_size'], options['dry_run'])
+                if moved:
+                    verb = "Would move" if options['dry_run'] else "Moved"
+                    self.stdout.write(f"{verb} {moved} {model._meta.label} rows off {source}")
+        self.stdout.write(self.style.SUCCESS("Resharding complete."))
+
+    def move_rows(self, model, source, batch_size, dry_run):
+        moved = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.using(source).filter(pk__gt=last_pk).order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return moved
+            last_pk = batch[-1].pk
+
+            by_target = {}
+            for obj in batch:
+                target = shard_for_user_id(obj.user_id)
+                if target != source:
+                    by_target.setdefault(target, []).append(obj)
+
+            for target, objs in by_target.items():
+                moved += len(objs)
+                if dry_run:
+                    continue
+                # Primary keys are per-database sequences, so rows get new ids on the target
+                copies = []
+                for obj in objs:
+                    copy = model(**{
+                        f.attname: getattr(obj, f.attname)
+                        for f in model._meta.concrete_fields if not f.primary_key
+                    })
+                    copies.append(copy)
+                with transaction.atomic(using=target), preserve_auto_dates(model):
+                    model.objects.using(target).bulk_create(copies, ignore_conflicts=True)
+                with transaction.atomic(using=source):
+                    model.objects.using(source).filter(pk__in=[o.pk for o in objs]).delete()
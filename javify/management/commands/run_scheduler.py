@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from javify.models import ScheduledJob, ScheduledJobRun
+from javify.scheduler import get_jobs, node_name, run_due_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the periodic maintenance jobs registered in the apps' maintenance "
+        "modules. Safe to run on several nodes: each job is leased to one node "
+        "per run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the jobs that are due, then exit.")
+        parser.add_argument('--job', action='append', metavar='NAME', help="Only this job (repeatable).")
+        parser.add_argument('--force', action='store_true', help="Run the selected jobs now even if not due.")
+        parser.add_argument('--list', action='store_true', help="Show the jobs and their last runs.")
+        parser.add_argument('--tick', type=float, default=settings.SCHEDULER_TICK, help="Seconds between checks.")
+
+    def handle(self, *args, **options):
+        jobs = get_jobs()
+        unknown = set(options['job'] or ()) - set(jobs)
+        if unknown:
+            raise CommandError(f"Unknown jobs: {', '.join(sorted(unknown))}. Known: {', '.join(jobs)}")
+
+        if options['list']:
+            self.list_jobs(jobs)
+            return
+
+        node = node_name()
+        self.stdout.write(f"Scheduler {node}: {len(jobs)} jobs")
+        force = options['force']
+        try:
+            while True:
+                for name in run_due_jobs(node, only=options['job'], force=force):
+                    run = ScheduledJobRun.objects.filter(name=name, node=node).first()
+                    outcome = f"{run.rows} rows in {run.duration_ms} ms" if run.succeeded else "failed"
+                    self.stdout.write(f"  {name}: {outcome}")
+                if options['once'] or force:
+                    break
+                time.sleep(options['tick'])
+        except KeyboardInterrupt:
+            pass
+
+    def list_jobs(self, jobs):
+        schedules = {job.name: job for job in ScheduledJob.objects.filter(name__in=jobs)}
+        last_runs = dict(
+            ScheduledJobRun.objects.filter(name__in=jobs).values_list('name').annotate(at=Max('started_at'))
+        )
+        for name, job in jobs.items():
+            schedule = schedules.get(name)
+            run = ScheduledJobRun.objects.filter(name=name, started_at=last_runs[name]).first() if name in last_runs else None
+            self.stdout.write(f"{name} (every {job.every})")
+            if schedule is not None:
+                lease = f", leased by {schedule.locked_by} until {schedule.locked_until:%H:%M:%S}" if schedule.locked_by else ""
+                self.stdout.write(f"  next run {schedule.next_run_at:%Y-%m-%d %H:%M:%S}{lease}")
+            if run is not None:
+                outcome = f"{run.rows} rows" if run.succeeded else "FAILED"
+                self.stdout.write(f"  last run {run.started_at:%Y-%m-%d %H:%M:%S} on {run.node}: {outcome} in {run.duration_ms} ms")
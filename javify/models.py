@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ScheduledJob(models.Model):
+    """
+    Schedule and lease of one periodic job (javify/scheduler.py). A node may
+    run the job only while it holds the lease: locked_by set and
+    locked_until in the future.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ScheduledJobRun(models.Model):
+    """One run of a periodic job, for monitoring."""
+    name = models.CharField(max_length=100)
+    node = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    rows = models.IntegerField(default=0)
+    succeeded = models.BooleanField(default=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['name', '-started_at']),
+            models.Index(fields=['started_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} @ {self.started_at:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,125 @@
+"""
+Streaming JSON rendering for large responses.
+
+Views opt in with StreamingJSONMixin. Their Response data may hold lazy
+values (generators, iterators, querysets) at the top level or as direct
+values of a top-level dict; those are encoded item by item and sent as a
+StreamingHttpResponse in chunks of about STREAM_CHUNK_SIZE bytes, so a large
+list is never held in memory as Python objects or as one JSON document.
+
+Items are encoded with orjson when it is installed and with the stdlib json
+module otherwise. Both go through DRF's JSONEncoder for values JSON can't
+represent natively, so datetimes, dates, Decimals, UUIDs and lazy strings
+come out as they would from JSONRenderer.
+"""
+from collections.abc import Iterator
+
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_default = JSONEncoder().default
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def encode(value):
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+else:
+    _stdlib_encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+
+    def encode(value):
+        return _stdlib_encoder.encode(value).encode()
+
+
+def _escape(chunk):
+    # Same as JSONRenderer: these are valid JSON but not valid JavaScript
+    return chunk.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def _is_lazy(value):
+    return isinstance(value, (Iterator, QuerySet, range))
+
+
+def _parts(data):
+    if isinstance(data, dict):
+        yield b'{'
+        for i, (key, value) in enumerate(data.items()):
+            yield (b',' if i else b'') + encode(str(key)) + b':'
+            if _is_lazy(value) or isinstance(value, (list, tuple)):
+                yield from _array_parts(value)
+            else:
+                yield encode(value)
+        yield b'}'
+    elif _is_lazy(data) or isinstance(data, (list, tuple)):
+        yield from _array_parts(data)
+    else:
+        yield encode(data)
+
+
+def _array_parts(items):
+    if isinstance(items, QuerySet):
+        items = items.iterator()
+    yield b'['
+    first = True
+    for item in items:
+        yield encode(item) if first else b',' + encode(item)
+        first = False
+    yield b']'
+
+
+def iter_json(data, chunk_size=STREAM_CHUNK_SIZE):
+    """Encode `data` as JSON, yielding byte chunks of roughly `chunk_size`."""
+    buffer = []
+    size = 0
+    for part in _parts(data):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield _escape(b''.join(buffer))
+            buffer = []
+            size = 0
+    if buffer:
+        yield _escape(b''.join(buffer))
+
+
+class StreamingJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Non-streamed use, e.g. inside the browsable API
+        if data is None:
+            return b''
+        return b''.join(iter_json(data))
+
+
+class StreamingJSONMixin:
+    """DRF view mixin: stream JSON responses with StreamingJSONRenderer."""
+    renderer_classes = [StreamingJSONRenderer, BrowsableAPIRenderer]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        renderer = getattr(response, 'accepted_renderer', None)
+        if not isinstance(response, Response) or not isinstance(renderer, StreamingJSONRenderer):
+            return response
+        if response.data is None:
+            return response
+
+        streaming = StreamingHttpResponse(
+            iter_json(response.data), status=response.status_code, content_type=renderer.media_type
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                streaming[header] = value
+        return streaming
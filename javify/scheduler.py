@@ -0,0 +1,150 @@
+"""
+Periodic maintenance jobs, run by `manage.py run_scheduler`.
+
+Apps register jobs in a `maintenance` module, which the scheduler imports
+from every installed app:
+
+    @periodic(every=timedelta(hours=1))
+    def clear_expired_sessions():
+        return delete_in_batches(Session.objects.filter(expire_date__lt=timezone.now()))
+
+A job does a bounded amount of work per run (delete_in_batches stops after
+SCHEDULER_MAX_BATCHES batches) and returns the number of rows it handled;
+anything left over is picked up by its next run.
+
+The command can run on every node. Before running a job a node takes its
+lease on the ScheduledJob row with a conditional UPDATE, so a job runs on one
+node at a time and once per interval across the cluster; the lease of a node
+that dies mid-run expires after the job's `timeout`. Every run is recorded
+as a ScheduledJobRun with its duration, row count and error.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import ScheduledJob, ScheduledJobRun
+
+logger = logging.getLogger(__name__)
+
+
+class Job(NamedTuple):
+    name: str
+    func: Callable[[], int]
+    every: timedelta
+    timeout: timedelta  # lease length: longest a run may take
+
+
+_jobs = {}
+
+
+def periodic(every, name=None, timeout=timedelta(minutes=15)):
+    """Register the decorated function as a job run every `every`."""
+    def register(func):
+        job_name = name or f"{func.__module__.rsplit('.', 1)[0]}.{func.__name__}"
+        _jobs[job_name] = Job(job_name, func, every, timeout)
+        return func
+    return register
+
+
+def get_jobs():
+    autodiscover_modules('maintenance')
+    return dict(sorted(_jobs.items()))
+
+
+def delete_in_batches(queryset, batch_size=None, max_batches=None):
+    """Delete the rows of `queryset` by primary key, a batch at a time; returns the count."""
+    batch_size = batch_size or settings.SCHEDULER_BATCH_SIZE
+    max_batches = max_batches or settings.SCHEDULER_MAX_BATCHES
+    deleted = 0
+    for _ in range(max_batches):
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        queryset.model._base_manager.using(queryset._db).filter(pk__in=ids).delete()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+def node_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# -----------------------------
+# Leases
+# -----------------------------
+def acquire(job, node, force=False):
+    """Take the job's lease if it is due (or `force`) and nobody else holds it."""
+    now = timezone.now()
+    ScheduledJob.objects.get_or_create(name=job.name, defaults={'next_run_at': now})
+    rows = ScheduledJob.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        name=job.name,
+    )
+    if not force:
+        rows = rows.filter(next_run_at__lte=now)
+    return bool(rows.update(locked_by=node, locked_until=now + job.timeout))
+
+
+def release(job, node, started_at):
+    ScheduledJob.objects.filter(name=job.name, locked_by=node).update(
+        locked_by='', locked_until=None, next_run_at=started_at + job.every
+    )
+
+
+# -----------------------------
+# Running
+# -----------------------------
+def run_job(job, node):
+    started_at = timezone.now()
+    started = time.perf_counter()
+    rows, error = 0, ''
+    try:
+        rows = job.func() or 0
+    except Exception:
+        logger.exception("Scheduled job %s failed", job.name)
+        error = traceback.format_exc()[-4000:]
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    try:
+        ScheduledJobRun.objects.create(
+            name=job.name,
+            node=node,
+            started_at=started_at,
+            duration_ms=duration_ms,
+            rows=rows,
+            succeeded=not error,
+            error=error,
+        )
+    finally:
+        release(job, node, started_at)
+    logger.info(
+        "Scheduled job %s: %s rows in %s ms",
+        job.name, rows, duration_ms,
+        extra={"job": job.name, "rows": rows, "duration_ms": duration_ms, "succeeded": not error},
+    )
+    return rows, error
+
+
+def run_due_jobs(node, only=None, force=False):
+    """Run every registered job that is due and not leased elsewhere; returns the names run."""
+    ran = []
+    for job in get_jobs().values():
+        if only and job.name not in only:
+            continue
+        close_old_connections()
+        if acquire(job, node, force=force):
+            run_job(job, node)
+            ran.append(job.name)
+    return ran
+
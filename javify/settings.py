@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from datetime import timedelta
 
 from decouple import config, Csv
@@ -56,6 +58,7 @@ INSTALLED_APPS = [
     "tutorials",
     'django_ckeditor_5',
     "jobs",
+    "judge",
 ]
 
 # CORS_ALLOWED_ORIGINS = [
@@ -69,6 +72,7 @@ CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', cast=Csv())
 CORS_ALLOW_CREDENTIALS = True
 
 MIDDLEWARE = [
+    'javify.log.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,6 +82,16 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "allauth.account.middleware.AccountMiddleware",
+    'javify.db_routers.ReadYourWritesMiddleware',
+]
+
+# Not run for DRF views that don't authenticate via the session (javify/handlers.py)
+LEAN_API_SKIPPED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'allauth.account.middleware.AccountMiddleware',
 ]
 
 ROOT_URLCONF = 'javify.urls'
@@ -141,6 +155,84 @@ DATABASES = {
     }
 }
 
+# Optional read replica (see javify/db_routers.py). Unset fields fall back to
+# the primary's, so two local SQLite files only need DB_REPLICA_NAME.
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': DB_REPLICA_NAME,
+        'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'HOST': config('DB_REPLICA_HOST', default=DATABASES['default']['HOST']),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT'], cast=int),
+    }
+
+# Optional sharding of per-user tables (see javify/sharding.py). Each entry is
+# "default" or a database NAME on the primary's server, e.g. for local SQLite:
+# DB_USER_SHARDS=default,/tmp/shard1.sqlite3,/tmp/shard2.sqlite3
+USER_SHARDS = []
+for index, shard_name in enumerate(config('DB_USER_SHARDS', default='default', cast=Csv())):
+    if shard_name == 'default':
+        USER_SHARDS.append('default')
+        continue
+    alias = f'user_shard_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': shard_name}
+    USER_SHARDS.append(alias)
+USER_SHARDS = USER_SHARDS or ['default']
+
+# `manage.py test` reads from the primary, since a replica can't see what a
+# TestCase writes inside its transaction (the routing tests fake one). It
+# gets one spare database, so the sharding tests can put a dedicated shard
+# in USER_SHARDS (with override_settings) without any setup.
+if sys.argv[1:2] == ['test']:
+    DATABASES.pop('replica', None)
+    DATABASES['test_shard'] = {**DATABASES['default'], 'NAME': f"{DATABASES['default']['NAME']}_shard"}
+
+DATABASE_ROUTERS = [
+    'javify.sharding.UserShardRouter',
+    'javify.db_routers.PrimaryReplicaRouter',
+]
+
+# How long a user's reads stay on the primary after they write
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Seconds between checks of the catalog version stamp (see tutorials/catalog.py)
+CATALOG_CHECK_INTERVAL = config('CATALOG_CHECK_INTERVAL', default=2, cast=float)
+
+# Compiled catalog file mapped by every worker instead of per-process copies
+# (see tutorials/catalog_file.py); empty keeps the in-memory snapshot.
+CATALOG_FILE = config('CATALOG_FILE', default='')
+CATALOG_FILE_AUTO_COMPILE = config('CATALOG_FILE_AUTO_COMPILE', default=True, cast=bool)
+
+# Quiz attempts younger than this wait for the next analytics rollup, so the
+# rollup cursor never passes a row whose transaction hasn't committed yet
+# (see tutorials/analytics.py). Must exceed the longest submit transaction.
+ROLLUP_SETTLE_SECONDS = config('ROLLUP_SETTLE_SECONDS', default=120, cast=int)
+
+# Cache (must be shared between workers for the API response cache, see javify/checks.py)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Largest CSV accepted by the bulk provisioning API (see userauth/provisioning.py)
+PROVISIONING_API_MAX_ROWS = config('PROVISIONING_API_MAX_ROWS', default=500, cast=int)
+
+# Seconds a delta sync token is moved back to cover in-flight writes (see tutorials/sync.py)
+SYNC_TOKEN_SKEW = config('SYNC_TOKEN_SKEW', default=5, cast=int)
+# Days deletions are remembered for delta syncs; older tokens get a full sync
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# Stale-while-revalidate API response cache (see javify/caching.py). In
+# production it needs a cache shared by all workers (check --deploy fails otherwise).
+API_CACHE_ENABLED = config('API_CACHE_ENABLED', default=True, cast=bool)
+API_CACHE_TTL = config('API_CACHE_TTL', default=60, cast=int)
+API_CACHE_STALE_TTL = config('API_CACHE_STALE_TTL', default=600, cast=int)
+API_CACHE_LOCK_TIMEOUT = config('API_CACHE_LOCK_TIMEOUT', default=10, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -184,6 +276,79 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# collectstatic writes content-hashed copies plus .gz/.br siblings (javify/storage.py)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": config(
+            'STATICFILES_BACKEND', default='javify.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# User uploads (CKEditor images, see javify/uploads.py)
+MEDIA_URL = config('MEDIA_URL', default='/media/')
+MEDIA_ROOT = config('MEDIA_ROOT', default=os.path.join(BASE_DIR, 'media'))
+EDITOR_IMAGE_WIDTHS = (480, 960, 1600)
+EDITOR_IMAGE_QUALITY = config('EDITOR_IMAGE_QUALITY', default=80, cast=int)
+EDITOR_IMAGE_WORKERS = config('EDITOR_IMAGE_WORKERS', default=2, cast=int)
+
+# Offline level bundles and their patches (see tutorials/bundles.py); shared
+# by all web nodes like MEDIA_ROOT
+BUNDLE_ROOT = config('BUNDLE_ROOT', default=os.path.join(BASE_DIR, 'bundles'))
+BUNDLE_KEEP_VERSIONS = config('BUNDLE_KEEP_VERSIONS', default=5, cast=int)
+BUNDLE_IMAGE_WIDTH = config('BUNDLE_IMAGE_WIDTH', default=960, cast=int)
+
+# Static JSON snapshot of the public jobs feed (see jobs/publisher.py)
+JOBS_FEED_ROOT = config('JOBS_FEED_ROOT', default=os.path.join(STATIC_ROOT, 'feeds', 'jobs'))
+JOBS_FEED_PAGE_SIZE = config('JOBS_FEED_PAGE_SIZE', default=50, cast=int)
+JOBS_FEED_KEEP_VERSIONS = config('JOBS_FEED_KEEP_VERSIONS', default=3, cast=int)
+JOBS_FEED_AUTO_PUBLISH = config('JOBS_FEED_AUTO_PUBLISH', default=True, cast=bool)
+
+# Periodic maintenance (javify/scheduler.py, run_scheduler). Jobs delete or
+# process at most SCHEDULER_MAX_BATCHES batches per run.
+SCHEDULER_TICK = config('SCHEDULER_TICK', default=30, cast=float)
+SCHEDULER_BATCH_SIZE = config('SCHEDULER_BATCH_SIZE', default=1000, cast=int)
+SCHEDULER_MAX_BATCHES = config('SCHEDULER_MAX_BATCHES', default=50, cast=int)
+SCHEDULER_RUN_RETENTION_DAYS = config('SCHEDULER_RUN_RETENTION_DAYS', default=30, cast=int)
+
+# Live user events over SSE (userauth/events.py)
+EVENTS_POLL_INTERVAL = config('EVENTS_POLL_INTERVAL', default=1.0, cast=float)  # outbox poll per process
+EVENTS_HEARTBEAT = config('EVENTS_HEARTBEAT', default=15, cast=int)  # seconds between keep-alive comments
+EVENTS_RETENTION = config('EVENTS_RETENTION', default=60 * 60, cast=int)  # replayable with Last-Event-ID
+EVENTS_REPLAY_LIMIT = config('EVENTS_REPLAY_LIMIT', default=200, cast=int)
+EVENTS_CONNECTION_BUFFER = config('EVENTS_CONNECTION_BUFFER', default=64, cast=int)  # then the client reconnects
+
+# Code judge (judge/pipeline.py). JUDGE_RUNNERS maps submission languages to
+# runners; the Python reference runner is for hosts without a JDK.
+JUDGE_RUNNERS = {
+    'java': 'judge.runners.JavaRunner',
+}
+if config('JUDGE_REFERENCE_RUNNER', default=False, cast=bool):
+    JUDGE_RUNNERS['python'] = 'judge.runners.PythonRunner'
+JUDGE_WORKERS = config('JUDGE_WORKERS', default=os.cpu_count() or 1, cast=int)
+# Submissions are untrusted code: judge them with `manage.py run_judge` on
+# dedicated hosts or containers with no network access, no secrets and no
+# database socket, never on web hosts. JUDGE_IN_PROCESS judges in the web
+# process itself and is only for local development. JUDGE_SANDBOX_USER is an
+# unprivileged account the programs run as (the judge needs root to switch).
+JUDGE_IN_PROCESS = config('JUDGE_IN_PROCESS', default=False, cast=bool)
+JUDGE_SANDBOX_USER = config('JUDGE_SANDBOX_USER', default='')
+JUDGE_CACHE_DIR = config('JUDGE_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'javify-judge'))
+JUDGE_BUILD_CACHE_SIZE = config('JUDGE_BUILD_CACHE_SIZE', default=500, cast=int)
+JUDGE_RESULT_CACHE_TTL = config('JUDGE_RESULT_CACHE_TTL', default=24 * 60 * 60, cast=int)
+JUDGE_TIME_LIMIT = config('JUDGE_TIME_LIMIT', default=2.0, cast=float)  # CPU seconds per test
+JUDGE_COMPILE_TIME_LIMIT = config('JUDGE_COMPILE_TIME_LIMIT', default=20.0, cast=float)
+JUDGE_MEMORY_MB = config('JUDGE_MEMORY_MB', default=256, cast=int)
+JUDGE_OUTPUT_LIMIT = config('JUDGE_OUTPUT_LIMIT', default=64 * 1024, cast=int)
+JUDGE_MAX_SOURCE_BYTES = config('JUDGE_MAX_SOURCE_BYTES', default=64 * 1024, cast=int)
+JUDGE_MAX_PENDING_PER_USER = config('JUDGE_MAX_PENDING_PER_USER', default=3, cast=int)
+JUDGE_MAX_PROCESSES = config('JUDGE_MAX_PROCESSES', default=64, cast=int)  # RLIMIT_NPROC; JVM threads count
+JUDGE_STALE_AFTER = config('JUDGE_STALE_AFTER', default=300, cast=int)  # seconds running before requeued
+JUDGE_QUEUE_TIMEOUT = config('JUDGE_QUEUE_TIMEOUT', default=15 * 60, cast=int)  # seconds queued before given up
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -225,12 +390,29 @@ SIMPLE_JWT = {
 }
 
 
+# Request threads only enqueue records; a listener thread writes them as
+# JSON lines (javify/log.py). Below WARNING, records are sampled once the
+# queue passes LOG_QUEUE_HIGH_WATER and dropped when it is full.
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+LOG_QUEUE_HIGH_WATER = config('LOG_QUEUE_HIGH_WATER', default=0.8, cast=float)
+LOG_OVERLOAD_SAMPLE_RATE = config('LOG_OVERLOAD_SAMPLE_RATE', default=10, cast=int)  # keep 1 in N
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'javify.log.JSONFormatter',
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            '()': 'javify.log.QueueingHandler',
+            'formatter': 'json',
+            'stream': 'ext://sys.stderr',
+            'queue_size': LOG_QUEUE_SIZE,
+            'high_water': LOG_QUEUE_HIGH_WATER,
+            'sample_rate': LOG_OVERLOAD_SAMPLE_RATE,
         },
     },
     'loggers': {
@@ -243,6 +425,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'javify.request': {  # one access record per request (RequestLogMiddleware)
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -277,7 +464,7 @@ customColorPalette = [
     ]
 
 CKEDITOR_5_CUSTOM_CSS = 'path_to.css' # optional
-CKEDITOR_5_FILE_STORAGE = "path_to_storage.CustomStorage" # optional
+CKEDITOR_5_FILE_STORAGE = "javify.uploads.EditorImageStorage"  # content-hashed, resized in the background
 CKEDITOR_5_CONFIGS = {
     'default': {
         'toolbar': {
@@ -0,0 +1,103 @@
+"""
+Optional horizontal sharding of per-user tables by user id.
+
+Profile, UserStateVersion, UserProgress, UserLevelCompletion and SyncTombstone rows live on
+the database alias picked by a stable hash of their user_id (USER_SHARDS).
+Everything else, including auth users and the tutorial catalog, stays on
+"default".
+
+How queries find their shard:
+  * Model.objects.for_user(user) pins a queryset to the user's shard.
+  * Saving an instance routes by its user_id.
+  * Related access such as user.profile routes by the User passed as hint.
+
+Per-user tables never join catalog or auth tables in SQL (their foreign keys
+are created with db_constraint=False), because those tables aren't on the
+shards. Moving rows after USER_SHARDS changes is done by the
+reshard_user_data management command.
+"""
+import zlib
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models
+
+SHARDED_MODELS = {
+    'userauth.profile',
+    'userauth.userstateversion',
+    'tutorials.userprogress',
+    'tutorials.userlevelcompletion',
+    'tutorials.synctombstone',
+}
+
+
+def user_shards():
+    return settings.USER_SHARDS
+
+
+def sharding_enabled():
+    return user_shards() != [DEFAULT_DB_ALIAS]
+
+
+def shard_for_user_id(user_id, shards=None):
+    """Stable user id -> alias mapping (crc32, so it's the same in every process)."""
+    shards = shards or user_shards()
+    if len(shards) == 1:
+        return shards[0]
+    return shards[zlib.crc32(str(user_id).encode()) % len(shards)]
+
+
+def shard_for_user(user):
+    return shard_for_user_id(getattr(user, 'pk', user))
+
+
+def dedicated_shards():
+    """Shard aliases other than "default"."""
+    return [alias for alias in user_shards() if alias != DEFAULT_DB_ALIAS]
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+class UserShardedManager(models.Manager):
+    def for_user(self, user):
+        """Queryset on the shard holding `user`'s rows (a User or a user id)."""
+        if not sharding_enabled():
+            # Leave the choice to the other routers (e.g. the read replica)
+            return self.get_queryset()
+        return self.get_queryset().using(shard_for_user(user))
+
+
+class UserShardRouter:
+    """Routes sharded models; returns None for everything else."""
+
+    def _shard_from_hints(self, model, hints):
+        if not is_sharded(model) or not sharding_enabled():
+            return None
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        if is_sharded(type(instance)):
+            user_id = instance.user_id
+        elif instance._meta.label_lower == settings.AUTH_USER_MODEL.lower():
+            user_id = instance.pk
+        else:
+            return None
+        return shard_for_user_id(user_id) if user_id is not None else None
+
+    def db_for_read(self, model, **hints):
+        return self._shard_from_hints(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard_from_hints(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_sharded(type(obj1)) or is_sharded(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Dedicated shard databases only hold the per-user tables
+        if db != DEFAULT_DB_ALIAS and db in user_shards():
+            return f'{app_label}.{model_name}' in SHARDED_MODELS if model_name else False
+        return None
@@ -0,0 +1,98 @@
+"""
+Static files storage: content-hashed names plus precompressed siblings.
+
+collectstatic with CompressedManifestStaticFilesStorage stores every file
+twice, under its own name and under a content-hashed one
+(ckeditor.js -> ckeditor.3f2a9c1b7d4e.js), rewrites url() references in CSS
+and writes staticfiles.json mapping one to the other, so {% static %} links
+to the hashed copy. Each text asset then gets a gzip (.gz) sibling and, when
+the brotli package is installed, a brotli (.br) one, compressed once at
+deploy time instead of on every response.
+
+javify.views.serve_static serves STATIC_ROOT from these files: it picks the
+smallest encoding the client accepts and marks hashed names as immutable.
+"""
+import gzip
+import logging
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional; gzip siblings are always written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.txt', '.xml',
+    '.ico', '.ttf', '.otf', '.eot', '.md',
+)
+COMPRESS_MIN_SIZE = 256
+
+# Content-Encoding -> file suffix, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressors():
+    compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected (e.g. referenced from a third-party template):
+            # link the plain name, which 404s, instead of failing the page
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        stored = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if not isinstance(processed, Exception):
+                stored.extend((name, hashed_name))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+
+        written = sum(self.compress(name) for name in set(stored) if name)
+        logger.info("Wrote %s precompressed static files", written)
+
+    def compress(self, name):
+        """Write the .gz (and .br) siblings of `name`; returns how many were written."""
+        if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            return 0
+        path = self.path(name)
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return 0
+
+        written = 0
+        mtime = os.stat(path).st_mtime_ns
+        for suffix, compress in _compressors():
+            target = path + suffix
+            try:
+                if os.stat(target).st_mtime_ns >= mtime:
+                    continue  # unchanged since the last collectstatic
+            except FileNotFoundError:
+                pass
+            compressed = compress(data)
+            if len(compressed) >= len(data) * 0.95:
+                # Not worth a Content-Encoding; drop any stale sibling
+                if os.path.exists(target):
+                    os.unlink(target)
+                continue
+            tmp_path = f'{target}.tmp{os.getpid()}'
+            with open(tmp_path, 'wb') as fh:
+                fh.write(compressed)
+            os.replace(tmp_path, target)
+            written += 1
+        return written
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import ScheduledJob, ScheduledJobRun
+from .scheduler import Job, acquire, release, run_job
+
+
+def failing_job():
+    raise RuntimeError("boom")
+
+
+# -----------------------------
+# Scheduler leases
+# -----------------------------
+class LeaseTests(TestCase):
+    job = Job('tests.job', lambda: 3, timedelta(hours=1), timedelta(minutes=5))
+
+    def test_one_node_at_a_time(self):
+        self.assertTrue(acquire(self.job, 'node-a'))
+        self.assertFalse(acquire(self.job, 'node-b'))
+        self.assertFalse(acquire(self.job, 'node-b', force=True))
+
+    def test_release_schedules_the_next_run(self):
+        started_at = timezone.now()
+        acquire(self.job, 'node-a')
+        release(self.job, 'node-a', started_at)
+
+        row = ScheduledJob.objects.get(name=self.job.name)
+        self.assertEqual(row.next_run_at, started_at + self.job.every)
+        self.assertEqual((row.locked_by, row.locked_until), ('', None))
+        self.assertFalse(acquire(self.job, 'node-b'))
+        self.assertTrue(acquire(self.job, 'node-b', force=True))
+
+    def test_only_the_holder_releases(self):
+        acquire(self.job, 'node-a')
+        release(self.job, 'node-b', timezone.now())
+
+        self.assertEqual(ScheduledJob.objects.get(name=self.job.name).locked_by, 'node-a')
+
+    def test_lease_of_a_dead_node_expires(self):
+        acquire(self.job, 'node-a')
+        ScheduledJob.objects.filter(name=self.job.name).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertTrue(acquire(self.job, 'node-b'))
+        self.assertEqual(ScheduledJob.objects.get(name=self.job.name).locked_by, 'node-b')
+
+    def test_runs_are_recorded_and_release_the_lease(self):
+        acquire(self.job, 'node-a')
+        self.assertEqual(run_job(self.job, 'node-a'), (3, ''))
+
+        job = self.job._replace(func=failing_job)
+        acquire(job, 'node-a', force=True)
+        with self.assertLogs('javify.scheduler', 'ERROR'):
+            rows, error = run_job(job, 'node-a')
+        self.assertIn('RuntimeError: boom', error)
+
+        self.assertEqual(
+            list(ScheduledJobRun.objects.order_by('started_at').values_list('rows', 'succeeded')),
+            [(3, True), (0, False)],
+        )
+        self.assertEqual(ScheduledJob.objects.get(name=self.job.name).locked_by, '')
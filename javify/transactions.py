@@ -0,0 +1,23 @@
+"""
+Transaction helpers.
+
+on_commit_once() runs a callback after the current transaction commits,
+registering it at most once per transaction. Signal handlers use it for
+work that covers every change at once (republishing the jobs feed,
+recompiling the catalog file), so a bulk delete triggers it once, not once
+per row.
+
+The check is per connection: concurrent transactions on other threads or
+processes each get their own callback, so none of their changes is missed.
+Callbacks registered in a savepoint that is rolled back are dropped by
+Django, and the next change registers the callback again.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+def on_commit_once(func, using=None):
+    """transaction.on_commit(func), unless `func` is already waiting for this transaction's commit."""
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.in_atomic_block and any(registered is func for _, registered, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(func, using=using)
@@ -0,0 +1,272 @@
+"""
+Images uploaded through the CKEditor 5 upload view.
+
+EditorImageStorage (CKEDITOR_5_FILE_STORAGE) stores each upload under its
+content hash, so pasting the same screenshot twice keeps one file:
+
+    <MEDIA_ROOT>/uploads/ab/ab12...ef.png          the original upload
+    <MEDIA_ROOT>/uploads/ab/ab12...ef-960w.webp    resized variants
+    <MEDIA_ROOT>/uploads/ab/ab12...ef-960w.jpg
+    <MEDIA_ROOT>/uploads/ab/ab12...ef.json         variant list, written last
+
+The variants are produced by a small thread pool after the upload request
+has returned (Pillow releases the GIL while resizing and encoding). They are
+re-encoded from the pixels only, so EXIF/GPS and other metadata are dropped.
+
+Rich-text fields registered with register_editor_html() get their <img>
+tags rewritten on save: src points at the largest JPEG variant and srcset
+lists the WebP ones. When the variants finish after the row was saved, the
+worker re-saves the rows that reference the image.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections
+from django.db.models.signals import pre_save
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = 'uploads'
+
+# Formats worth recompressing; GIFs (often animated) and SVGs are left alone
+PROCESSED_FORMATS = {'PNG', 'JPEG', 'WEBP', 'BMP', 'TIFF'}
+
+_HASHED_NAME = re.compile(r'(?P<digest>[0-9a-f]{64})(?:-\d+w)?\.[a-z0-9]+$')
+_IMG_TAG = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'\s(?P<name>[a-zA-Z-]+)\s*=\s*"(?P<value>[^"]*)"')
+
+_executor = None
+_executor_lock = threading.Lock()
+_fields = []  # (model, field name) registered with register_editor_html()
+
+
+class EditorImageStorage(FileSystemStorage):
+    """File storage for editor uploads: content-hashed names, variants in the background."""
+
+    def __init__(self, location=None, base_url=None, **kwargs):
+        super().__init__(
+            location=location or os.path.join(settings.MEDIA_ROOT, UPLOADS_DIR),
+            base_url=base_url or f'{settings.MEDIA_URL}{UPLOADS_DIR}/',
+            **kwargs,
+        )
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        extension = os.path.splitext(name or '')[1].lower()
+        name = _upload_base(digest) + extension
+        if not self.exists(name):
+            content.seek(0)
+            name = super().save(name, content, max_length=max_length)
+        if not self.exists(_manifest_name(name)):
+            schedule_variants(name)
+        return name
+
+
+def get_storage():
+    return EditorImageStorage()
+
+
+def _upload_base(digest):
+    return f'{digest[:2]}/{digest}'
+
+
+def is_content_hashed(name):
+    return _HASHED_NAME.search(name) is not None
+
+
+def _manifest_name(name):
+    return os.path.splitext(name)[0] + '.json'
+
+
+# -----------------------------
+# Variants
+# -----------------------------
+def build_variants(name, storage=None):
+    """
+    Write the resized WebP/JPEG variants of the upload `name` and its JSON
+    manifest. Returns the manifest, or None for images that aren't processed.
+    """
+    storage = storage or get_storage()
+    base = os.path.splitext(name)[0]
+    with Image.open(storage.path(name)) as original:
+        if original.format not in PROCESSED_FORMATS or getattr(original, 'is_animated', False):
+            return None
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+    largest = min(width, max(settings.EDITOR_IMAGE_WIDTHS))
+    widths = sorted({w for w in settings.EDITOR_IMAGE_WIDTHS if w < largest} | {largest})
+    quality = settings.EDITOR_IMAGE_QUALITY
+
+    variants = []
+    for target in widths:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS
+        )
+        webp_name = f'{base}-{target}w.webp'
+        jpeg_name = f'{base}-{target}w.jpg'
+        # No exif/icc_profile arguments: the variants carry pixels only
+        _write(storage, webp_name, resized, 'WEBP', quality=quality, method=6)
+        flat = resized
+        if has_alpha:
+            flat = Image.new('RGB', resized.size, (255, 255, 255))
+            flat.paste(resized, mask=resized.getchannel('A'))
+        _write(storage, jpeg_name, flat, 'JPEG', quality=quality, optimize=True, progressive=True)
+        variants.append({"width": target, "height": resized.height, "webp": webp_name, "jpeg": jpeg_name})
+
+    manifest = {"width": width, "height": height, "variants": variants}
+    _write_bytes(storage.path(_manifest_name(name)), json.dumps(manifest).encode())
+    return manifest
+
+
+def _write(storage, name, image, image_format, **options):
+    path = storage.path(name)
+    tmp_path = f'{path}.tmp{os.getpid()}-{threading.get_ident()}'
+    image.save(tmp_path, image_format, **options)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def _write_bytes(path, data):
+    tmp_path = f'{path}.tmp{os.getpid()}-{threading.get_ident()}'
+    with open(tmp_path, 'wb') as fh:
+        fh.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(name, storage=None):
+    storage = storage or get_storage()
+    try:
+        with open(storage.path(_manifest_name(name)), 'rb') as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def _process(name):
+    try:
+        if build_variants(name):
+            rewrite_references(name)
+    except Exception:
+        logger.exception("Processing editor image %s failed", name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(name):
+    """Build the variants of `name` on the background pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EDITOR_IMAGE_WORKERS, thread_name_prefix='editor-images'
+            )
+    return _executor.submit(_process, name)
+
+
+# -----------------------------
+# HTML rewriting
+# -----------------------------
+def tag_attributes(tag):
+    return {m.group('name').lower(): m.group('value') for m in _ATTRIBUTE.finditer(tag)}
+
+
+def set_tag_attribute(tag, name, value):
+    pattern = re.compile(rf'\s{name}\s*=\s*"[^"]*"', re.IGNORECASE)
+    replacement = f' {name}="{value}"'
+    if pattern.search(tag):
+        return pattern.sub(lambda m: replacement, tag, count=1)
+    end = -2 if tag.endswith('/>') else -1
+    return tag[:end].rstrip() + replacement + tag[end:]
+
+
+def rewrite_img_tags(html, rewrite):
+    """`html` with every <img> tag replaced by rewrite(tag)."""
+    if not html or '<img' not in html.lower():
+        return html
+    return _IMG_TAG.sub(lambda match: rewrite(match.group(0)), html)
+
+
+def uploaded_image(src, storage=None):
+    """
+    (storage name, manifest) of the upload an <img> src shows, or None if it
+    isn't an upload. The manifest is None until the variants are built, and
+    for images that aren't processed.
+    """
+    storage = storage or get_storage()
+    found = _HASHED_NAME.search(src) if storage.base_url in src else None
+    if found is None:
+        return None
+    name = src[src.index(storage.base_url) + len(storage.base_url):]
+    return name, load_manifest(_upload_base(found.group('digest')), storage)
+
+
+def add_srcset(html, storage=None):
+    """
+    Point <img> tags that show processed uploads at their variants. Tags
+    whose variants aren't built yet are left unchanged. Idempotent.
+    """
+    if not html or '<img' not in html.lower():
+        return html
+    storage = storage or get_storage()
+
+    def rewrite(tag):
+        upload = uploaded_image(tag_attributes(tag).get('src', ''), storage)
+        manifest = upload[1] if upload else None
+        if not manifest or not manifest['variants']:
+            return tag
+
+        variants = manifest['variants']
+        largest = variants[-1]
+        tag = set_tag_attribute(tag, 'src', storage.url(largest['jpeg']))
+        tag = set_tag_attribute(tag, 'srcset', ', '.join(f"{storage.url(v['webp'])} {v['width']}w" for v in variants))
+        tag = set_tag_attribute(tag, 'sizes', f"(max-width: {largest['width']}px) 100vw, {largest['width']}px")
+        if 'width' not in tag_attributes(tag):
+            tag = set_tag_attribute(tag, 'width', str(largest['width']))
+            tag = set_tag_attribute(tag, 'height', str(largest['height']))
+        return tag
+
+    return rewrite_img_tags(html, rewrite)
+
+
+def register_editor_html(model, *field_names):
+    """Rewrite uploaded images in these rich-text fields of `model` on every save."""
+    for field_name in field_names:
+        _fields.append((model, field_name))
+
+    def rewrite_images(sender, instance, **kwargs):
+        for field_name in field_names:
+            html = getattr(instance, field_name)
+            rewritten = add_srcset(html)
+            if rewritten != html:
+                setattr(instance, field_name, rewritten)
+
+    pre_save.connect(rewrite_images, sender=model, weak=False, dispatch_uid=f'editor-html-{model._meta.label}')
+
+
+def rewrite_references(name):
+    """Re-save rows of registered fields that show the upload `name`."""
+    digest = _HASHED_NAME.search(name).group('digest')
+    updated = 0
+    for model, field_name in _fields:
+        for instance in model._default_manager.filter(**{f'{field_name}__contains': digest}):
+            html = getattr(instance, field_name)
+            if add_srcset(html) != html:
+                instance.save(update_fields=[f for m, f in _fields if m is model])
+                updated += 1
+    return updated
@@ -17,12 +17,18 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .views import CacheMetricsView, serve_media, serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('userauth.urls')),  # Include URLs from userauth app
     path("ckeditor5/", include('django_ckeditor_5.urls')),
-    path('jobs/',include("jobs.urls"))
-] + static(settings.STATIC_URL,document_root=settings.STATIC_ROOT)
+    path('jobs/',include("jobs.urls")),
+    path('judge/', include('judge.urls')),
+    path('cache/metrics/', CacheMetricsView.as_view(), name='cache-metrics'),
+    # Precompressed, content-hashed assets written by collectstatic (javify/storage.py)
+    path(f"{settings.STATIC_URL.strip('/')}/<path:path>", serve_static, name='static'),
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'),
+]
 
@@ -0,0 +1,104 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import serve, was_modified_since
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+
+from .caching import cache_metrics
+from .storage import ENCODINGS
+from .uploads import UPLOADS_DIR, is_content_hashed
+
+
+class CacheMetricsView(APIView):
+    """
+    API response cache outcomes (hit / stale / revalidate / miss / coalesced)
+    per cached view, counted by the worker process that answers.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "views": cache_metrics()})
+
+
+# -----------------------------
+# Static files
+# -----------------------------
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+_HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+_hashed_names = None
+
+
+def _is_hashed(name):
+    """True for the content-hashed copies listed in the collectstatic manifest."""
+    global _hashed_names
+    if not _HASHED_NAME.search(name):
+        return False
+    if _hashed_names is None:
+        _hashed_names = frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+    return name in _hashed_names
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q=') and params[2:] in ('0', '0.', '0.0', '0.00', '0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve_static(request, path):
+    """
+    Serve a file from STATIC_ROOT, using its precompressed .br / .gz sibling
+    when the client accepts it. Content-hashed names never change, so they
+    are cached for a year; everything else is revalidated on each use.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(settings.STATIC_ROOT, name)
+    if not os.path.isfile(fullpath):
+        raise Http404(f"“{name}” does not exist")
+
+    statobj = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), statobj.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, encoding = mimetypes.guess_type(fullpath)
+        serve_path = fullpath
+        if encoding is None:
+            accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            for coding, suffix in ENCODINGS:
+                if coding in accepted and os.path.isfile(fullpath + suffix):
+                    serve_path, encoding = fullpath + suffix, coding
+                    break
+        response = FileResponse(open(serve_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        response['Last-Modified'] = http_date(statobj.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    if any(os.path.exists(fullpath + suffix) for _, suffix in ENCODINGS):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if _is_hashed(name) else REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def serve_media(request, path):
+    """Serve MEDIA_ROOT; editor uploads are named by content hash and never change."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    name = posixpath.normpath(path).lstrip('/')
+    if name.startswith(f'{UPLOADS_DIR}/') and is_content_hashed(name):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
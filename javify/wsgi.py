@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'javify.settings')
 
-application = get_wsgi_application()
+django.setup(set_prefix=False)
+
+# Like get_wsgi_application(), but token-authenticated API views skip the
+# session/CSRF/auth/messages middleware (see javify/handlers.py)
+from javify.handlers import RoutedWSGIHandler  # noqa: E402
+
+application = RoutedWSGIHandler()
+
+# Build the in-memory tutorial catalog before the first request
+from tutorials.catalog import warm_catalog  # noqa: E402
+
+warm_catalog()
@@ -2,7 +2,7 @@
 from django.contrib import admin
 from django import forms
 from django_ckeditor_5.widgets import CKEditor5Widget
-from .models import JobNotification
+from .models import JobNotification, JobFacetCount
 
 # ------------------------------
 # Admin Form with CKEditor5
@@ -58,3 +58,12 @@ class JobNotificationAdmin(admin.ModelAdmin):
             'fields': ('description', 'requirements')
         }),
     )
+
+
+@admin.register(JobFacetCount)
+class JobFacetCountAdmin(admin.ModelAdmin):
+    list_display = ('experience_level', 'location', 'count')
+    list_filter = ('experience_level',)
+    search_fields = ('location',)
+    ordering = ('experience_level', 'location')
+    readonly_fields = ('experience_level', 'location', 'count')
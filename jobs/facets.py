@@ -0,0 +1,127 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import JobNotification, JobFacetCount
+
+ANY = JobFacetCount.ANY
+
+
+def facet_key(job):
+    """Return the (experience_level, location) pair a job is counted under."""
+    return job.experience_level, job.location or ''
+
+
+def _expand(experience_level, location):
+    """All facet rows a single job contributes to (exact pair + roll-ups)."""
+    return [
+        (experience_level, location),
+        (experience_level, ANY),
+        (ANY, location),
+        (ANY, ANY),
+    ]
+
+
+def apply_facet_delta(key, delta):
+    """
+    Add `delta` to every facet row touched by a job with the given key.
+    Uses F() updates so concurrent admin edits don't lose increments.
+    """
+    if key is None or not delta:
+        return
+
+    with transaction.atomic():
+        for experience_level, location in _expand(*key):
+            rows = JobFacetCount.objects.filter(
+                experience_level=experience_level, location=location
+            )
+            if rows.update(count=F('count') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    JobFacetCount.objects.create(
+                        experience_level=experience_level, location=location, count=delta
+                    )
+            except IntegrityError:
+                # Another writer created the row first
+                rows.update(count=F('count') + delta)
+
+
+def rebuild_facet_counts():
+    """Recompute all facet rows from scratch with a single GROUP BY."""
+    totals = {}
+    pairs = (
+        JobNotification.objects.filter(is_active=True)
+        .values('experience_level', 'location')
+        .annotate(n=Count('id'))
+    )
+    for row in pairs:
+        for key in _expand(row['experience_level'], row['location'] or ''):
+            totals[key] = totals.get(key, 0) + row['n']
+
+    with transaction.atomic():
+        JobFacetCount.objects.all().delete()
+        JobFacetCount.objects.bulk_create([
+            JobFacetCount(experience_level=el, location=loc, count=n)
+            for (el, loc), n in totals.items()
+        ])
+    return len(totals)
+
+
+def get_facets(experience_level=None, location=None):
+    """
+    Facet counts for the current filter combination.
+
+    Each facet is counted with the *other* filter applied, which is what the
+    frontend shows next to the filter options. Reads only the rows for the
+    selected values, so the cost doesn't depend on the number of jobs.
+    """
+    el = experience_level or ANY
+    loc = location or ANY
+
+    rows = JobFacetCount.objects.filter(
+        Q(location=loc) | Q(experience_level=el), count__gt=0
+    ).values_list('experience_level', 'location', 'count')
+
+    total = 0
+    experience_levels = []
+    locations = []
+    for row_el, row_loc, count in rows:
+        if row_el == el and row_loc == loc:
+            total = count
+        if row_loc == loc and row_el != ANY:
+            experience_levels.append({"value": row_el, "count": count})
+        if row_el == el and row_loc not in (ANY, ''):
+            locations.append({"value": row_loc, "count": count})
+
+    experience_levels.sort(key=lambda f: -f["count"])
+    locations.sort(key=lambda f: (-f["count"], f["value"]))
+    return {
+        "total": total,
+        "experience_level": experience_levels,
+        "location": locations,
+    }
+
+
+def expire_jobs(today=None, batch_size=100, max_batches=None):
+    """
+    Deactivate jobs whose last_date has passed.
+    Saves each job so the facet signals keep the counts in step; each batch
+    is one transaction, so the feed is republished once per batch.
+    """
+    today = today or timezone.localdate()
+    expired = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = list(
+            JobNotification.objects.filter(is_active=True, last_date__lt=today)[:batch_size]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            for job in batch:
+                job.is_active = False
+                job.save(update_fields=['is_active'])
+        expired += len(batch)
+        batches += 1
+    return expired
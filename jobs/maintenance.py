@@ -0,0 +1,19 @@
+"""Periodic jobs for job notifications (see javify/scheduler.py)."""
+from datetime import timedelta
+
+from django.conf import settings
+
+from javify.scheduler import periodic
+from .facets import expire_jobs as _expire_jobs, rebuild_facet_counts
+
+
+@periodic(every=timedelta(hours=1))
+def expire_jobs():
+    """Deactivate notifications past their last_date."""
+    return _expire_jobs(max_batches=settings.SCHEDULER_MAX_BATCHES)
+
+
+@periodic(every=timedelta(days=1))
+def rebuild_facets():
+    """Recount the facet rows the signals keep up to date, in case they drifted."""
+    return rebuild_facet_counts()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.facets import expire_jobs
+
+
+class Command(BaseCommand):
+    help = "Deactivate job notifications whose last date has passed."
+
+    def handle(self, *args, **options):
+        expired = expire_jobs()
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} job notifications."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jobs.publisher import publish_jobs_feed
+
+
+class Command(BaseCommand):
+    help = "Write the static JSON snapshot of the public jobs feed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rewrite the manifest even if nothing changed.")
+
+    def handle(self, *args, **options):
+        manifest = publish_jobs_feed(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Jobs feed version {manifest['version']} ({manifest['count']} jobs)."
+        ))
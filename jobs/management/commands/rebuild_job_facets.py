@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed job facet counts from JobNotification."
+
+    def handle(self, *args, **options):
+        rows = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} facet rows."))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+def populate_facet_counts(apps, schema_editor):
+    JobNotification = apps.get_model('jobs', 'JobNotification')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+    totals = {}
+    for job in JobNotification.objects.filter(is_active=True).only('experience_level', 'location'):
+        el, loc = job.experience_level, job.location or ''
+        for key in ((el, loc), (el, '*'), ('*', loc), ('*', '*')):
+            totals[key] = totals.get(key, 0) + 1
+    JobFacetCount.objects.bulk_create([
+        JobFacetCount(experience_level=el, location=loc, count=n)
+        for (el, loc), n in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('experience_level', models.CharField(max_length=20)),
+                ('location', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('experience_level', 'location')},
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
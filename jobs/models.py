@@ -24,3 +24,23 @@ class JobNotification(models.Model):
 
     def __str__(self):
         return f"{self.title} at {self.company}"
+
+
+class JobFacetCount(models.Model):
+    """
+    Denormalized count of active jobs per (experience_level, location) pair.
+    Rows using ANY for one of the dimensions hold the roll-up across it,
+    so any filter combination is answered by reading a handful of rows.
+    Maintained incrementally by jobs.signals; see jobs.facets.
+    """
+    ANY = '*'
+
+    experience_level = models.CharField(max_length=20)
+    location = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('experience_level', 'location')
+
+    def __str__(self):
+        return f"{self.experience_level} / {self.location}: {self.count}"
@@ -0,0 +1,164 @@
+"""
+Static JSON snapshots of the public jobs feed.
+
+Every change to a JobNotification republishes the feed as plain files so a
+web server or CDN can serve it without touching Django:
+
+    <JOBS_FEED_ROOT>/manifest.json               -> points at the live version
+    <JOBS_FEED_ROOT>/<version>/facets.json
+    <JOBS_FEED_ROOT>/<version>/jobs/page-<n>.json
+    <JOBS_FEED_ROOT>/<version>/jobs/<id>.json
+
+Each JSON file has a pre-compressed .gz sibling. Version directories are
+content-addressed and never modified, so they can be cached forever; only
+manifest.json needs a short cache lifetime.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from javify.fast_serializers import compile_serializer
+from javify.transactions import on_commit_once
+
+from .models import JobNotification
+from .serializers import JobNotificationListSerializer, JobNotificationDetailSerializer
+from .facets import get_facets
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def _render(data):
+    return JSONRenderer().render(data)
+
+
+def _build_files(page_size):
+    """Return {relative_path: json_bytes} for the whole feed."""
+    files = {}
+    jobs = JobNotification.objects.filter(is_active=True)
+
+    listing = compile_serializer(JobNotificationListSerializer).serialize(jobs)
+    count = len(listing)
+    pages = max(1, -(-count // page_size))
+    for page in range(1, pages + 1):
+        files[f'jobs/page-{page}.json'] = _render({
+            "count": count,
+            "page": page,
+            "pages": pages,
+            "results": listing[(page - 1) * page_size:page * page_size],
+        })
+
+    for job in jobs.iterator(chunk_size=200):
+        files[f'jobs/{job.id}.json'] = _render(JobNotificationDetailSerializer(job).data)
+
+    files['facets.json'] = _render(get_facets())
+    return files, count, pages
+
+
+def _version_of(files):
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(path.encode())
+        digest.update(files[path])
+    return digest.hexdigest()[:16]
+
+
+def _read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), 'rb') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def _prune(root, keep, live_version):
+    """Remove all but the `keep` most recently published version directories."""
+    versions = [
+        entry for entry in os.scandir(root)
+        if entry.is_dir() and not entry.name.startswith('.') and entry.name != live_version
+    ]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[max(keep - 1, 0):]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def publish_jobs_feed(force=False):
+    """
+    Write a new feed version (if the content changed) and switch the manifest to it.
+    Returns the manifest of the live version.
+    """
+    root = settings.JOBS_FEED_ROOT
+    os.makedirs(root, exist_ok=True)
+
+    files, count, pages = _build_files(settings.JOBS_FEED_PAGE_SIZE)
+    version = _version_of(files)
+
+    current = _read_manifest(root)
+    if current and current.get('version') == version and not force:
+        return current
+
+    version_dir = os.path.join(root, version)
+    if not os.path.isdir(version_dir):
+        staging = tempfile.mkdtemp(dir=root, prefix='.staging-')
+        for relative_path, data in files.items():
+            path = os.path.join(staging, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as fh:
+                fh.write(data)
+            with open(path + '.gz', 'wb') as fh:
+                fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+        try:
+            os.replace(staging, version_dir)
+        except OSError:
+            # Same content already published by another process
+            shutil.rmtree(staging, ignore_errors=True)
+    # Mark as most recently published so pruning keeps it
+    os.utime(version_dir)
+
+    manifest = {
+        "version": version,
+        "published_at": timezone.now().isoformat(),
+        "count": count,
+        "page_size": settings.JOBS_FEED_PAGE_SIZE,
+        "pages": [f'{version}/jobs/page-{page}.json' for page in range(1, pages + 1)],
+        "detail": f'{version}/jobs/{{id}}.json',
+        "facets": f'{version}/facets.json',
+    }
+    _write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+    _prune(root, settings.JOBS_FEED_KEEP_VERSIONS, version)
+
+    logger.info("Published jobs feed version %s (%s jobs)", version, count)
+    return manifest
+
+
+def _publish_after_commit():
+    try:
+        publish_jobs_feed()
+    except Exception:
+        logger.exception("Publishing the jobs feed failed")
+
+
+def schedule_publish():
+    """
+    Republish once the current transaction commits.
+    Several changes in one transaction (e.g. bulk delete) publish only once.
+    """
+    if not settings.JOBS_FEED_AUTO_PUBLISH:
+        return
+    on_commit_once(_publish_after_commit)
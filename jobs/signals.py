@@ -0,0 +1,61 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import JobNotification
+from .facets import facet_key, apply_facet_delta
+from .publisher import schedule_publish
+from javify.caching import bump_generation
+from javify.uploads import register_editor_html
+
+
+register_editor_html(JobNotification, 'description', 'requirements')
+
+
+# -----------------------------
+# Facet counts maintenance
+# -----------------------------
+@receiver(pre_save, sender=JobNotification)
+def remember_previous_facet(sender, instance, **kwargs):
+    """Stash the facet key the job was counted under before this save."""
+    instance._previous_facet_key = None
+    if instance.pk:
+        previous = (
+            sender.objects.filter(pk=instance.pk)
+            .only('experience_level', 'location', 'is_active')
+            .first()
+        )
+        if previous and previous.is_active:
+            instance._previous_facet_key = facet_key(previous)
+
+
+@receiver(post_save, sender=JobNotification)
+def update_facets_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_facet_key', None)
+    current = facet_key(instance) if instance.is_active else None
+    if previous != current:
+        apply_facet_delta(previous, -1)
+        apply_facet_delta(current, +1)
+
+
+@receiver(post_delete, sender=JobNotification)
+def update_facets_on_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        apply_facet_delta(facet_key(instance), -1)
+
+
+# -----------------------------
+# Static feed publishing
+# -----------------------------
+@receiver(post_save, sender=JobNotification)
+@receiver(post_delete, sender=JobNotification)
+def republish_jobs_feed(sender, instance, **kwargs):
+    schedule_publish()
+
+
+# -----------------------------
+# API response cache
+# -----------------------------
+@receiver(post_save, sender=JobNotification)
+@receiver(post_delete, sender=JobNotification)
+def expire_cached_job_responses(sender, instance, **kwargs):
+    bump_generation('jobs')
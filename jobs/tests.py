@@ -1,3 +1,126 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from javify.caching import bump_generation, generation, get_or_compute
+from .facets import expire_jobs, get_facets
+from .models import JobNotification
+from .serializers import JobNotificationListSerializer
+from .views import JobNotificationListAPIView
+
+
+def create_job(**fields):
+    return JobNotification.objects.create(
+        title='Java developer', company='Acme', description='-', requirements='-', **fields
+    )
+
+
+# -----------------------------
+# Expiry
+# -----------------------------
+class ExpireJobsTests(TransactionTestCase):
+    def test_expires_past_jobs_and_updates_facets(self):
+        create_job(location='Pune', last_date=date(2026, 1, 1))
+        create_job(location='Pune', last_date=date(2026, 3, 1))
+
+        with mock.patch('jobs.publisher._publish_after_commit'):
+            self.assertEqual(expire_jobs(today=date(2026, 2, 1)), 1)
+
+        self.assertEqual(JobNotification.objects.filter(is_active=True).count(), 1)
+        self.assertEqual(get_facets(location='Pune')['total'], 1)
+
+    def test_publishes_once_per_batch(self):
+        for _ in range(5):
+            create_job(last_date=date(2026, 1, 1))
+
+        with mock.patch('jobs.publisher._publish_after_commit') as publish:
+            expire_jobs(today=date(2026, 2, 1), batch_size=2)
+
+        self.assertEqual(publish.call_count, 3)
+
+
+# -----------------------------
+# Job list
+# -----------------------------
+class TwoPerPage(PageNumberPagination):
+    page_size = 2
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class JobListTests(TestCase):
+    def setUp(self):
+        for location in ('Pune', 'Pune', 'Delhi'):
+            create_job(location=location)
+        create_job(location='Pune', is_active=False)
+
+    def test_matches_the_serializer(self):
+        response = APIClient().get('/jobs/jobs/?location=Pune')
+
+        expected = JobNotificationListSerializer(
+            JobNotification.objects.filter(is_active=True, location='Pune'), many=True
+        ).data
+        self.assertEqual(response.json(), expected)
+
+    def test_pages_when_pagination_is_configured(self):
+        with mock.patch.object(JobNotificationListAPIView, 'pagination_class', TwoPerPage):
+            first = APIClient().get('/jobs/jobs/').json()
+            second = APIClient().get('/jobs/jobs/?page=2').json()
+
+        self.assertEqual(first['count'], 3)
+        self.assertEqual(len(first['results']), 2)
+        self.assertEqual(len(second['results']), 1)
+        self.assertEqual(
+            {job['id'] for job in first['results'] + second['results']},
+            set(JobNotification.objects.filter(is_active=True).values_list('id', flat=True)),
+        )
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+class GetOrComputeTests(SimpleTestCase):
+    key = 'test:get-or-compute'
+
+    def setUp(self):
+        cache.delete(self.key)
+        self.addCleanup(cache.delete, self.key)
+
+    def test_older_entries_are_recomputed(self):
+        get_or_compute(self.key, 1, lambda: 'v1')
+
+        self.assertEqual(get_or_compute(self.key, 2, lambda: 'v2'), ('v2', 'revalidate'))
+        self.assertEqual(get_or_compute(self.key, 2, lambda: 'v3'), ('v2', 'hit'))
+
+    def test_lagging_worker_keeps_the_newer_entry(self):
+        get_or_compute(self.key, 2, lambda: 'v2')
+        cache.set(self.key, (2, 0, 'v2'))  # expired
+
+        compute = mock.Mock(return_value='v1')
+        self.assertEqual(get_or_compute(self.key, 1, compute), ('v2', 'hit'))
+        compute.assert_not_called()
+
+    def test_store_never_replaces_a_newer_entry(self):
+        def compute():
+            # A newer worker stores its entry while this one computes
+            cache.set(self.key, (3, 0, 'v3'))
+            return 'v2'
+
+        cache.set(self.key, (1, 0, 'v1'))
+        self.assertEqual(get_or_compute(self.key, 2, compute), ('v2', 'revalidate'))
+        self.assertEqual(cache.get(self.key)[2], 'v3')
+
+
+class GenerationTests(TestCase):
+    def test_generation_grows_across_evictions(self):
+        first = generation('test')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('test')
+        bumped = generation('test')
+        self.assertGreater(bumped, first)
+
+        cache.delete('generation:test')
+        self.assertGreater(generation('test'), bumped)
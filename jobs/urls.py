@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import JobNotificationListAPIView, JobNotificationDetailAPIView
+from .views import JobNotificationListAPIView, JobNotificationDetailAPIView, JobFacetsAPIView
 
 urlpatterns = [
     path('jobs/', JobNotificationListAPIView.as_view(), name='job-list'),
+    path('jobs/facets/', JobFacetsAPIView.as_view(), name='job-facets'),
     path('jobs/<int:id>/', JobNotificationDetailAPIView.as_view(), name='job-detail'),
 ]
@@ -1,16 +1,50 @@
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
 from .models import JobNotification
 from .serializers import JobNotificationListSerializer, JobNotificationDetailSerializer
+from .facets import get_facets
 from rest_framework.permissions import AllowAny
+from javify.db_routers import ReplicaReadMixin
+from javify.caching import cached_response, generation
+from javify.fast_serializers import compile_serializer
 
-class JobNotificationListAPIView(generics.ListAPIView):
+
+def jobs_version(request):
+    return generation('jobs')
+
+
+class JobNotificationListAPIView(ReplicaReadMixin, generics.ListAPIView):
     """
     List all active job notifications.
+    Optional filters: ?experience_level=FRESHER&location=Hyderabad
     """
-    queryset = JobNotification.objects.filter(is_active=True)
     serializer_class = JobNotificationListSerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        queryset = JobNotification.objects.filter(is_active=True)
+        experience_level = self.request.query_params.get('experience_level')
+        location = self.request.query_params.get('location')
+        if experience_level:
+            queryset = queryset.filter(experience_level=experience_level)
+        if location:
+            queryset = queryset.filter(location=location)
+        return queryset
+
+    @cached_response('jobs', jobs_version)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = compile_serializer(self.get_serializer_class())
+        # Paginate the value tuples, so a page still skips model instances
+        page = self.paginate_queryset(serializer.rows(queryset))
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize_rows(page))
+        return Response(serializer.serialize(queryset))
+
 class JobNotificationDetailAPIView(generics.RetrieveAPIView):
     """
     Retrieve detailed info about a single job notification.
@@ -19,3 +53,22 @@ class JobNotificationDetailAPIView(generics.RetrieveAPIView):
     serializer_class = JobNotificationDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'id'
+
+    @cached_response('job', jobs_version)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+class JobFacetsAPIView(ReplicaReadMixin, APIView):
+    """
+    Job counts per experience level and location for the current filters.
+    Served from the precomputed JobFacetCount table.
+    """
+    permission_classes = [AllowAny]
+
+    @cached_response('job-facets', jobs_version)
+    def get(self, request):
+        facets = get_facets(
+            experience_level=request.query_params.get('experience_level'),
+            location=request.query_params.get('location'),
+        )
+        return Response(facets, status=status.HTTP_200_OK)
@@ -0,0 +1,36 @@
+from django.contrib import admin
+
+from tutorials.admin import CodingProblemAdmin
+from tutorials.models import CodingProblem
+from .models import ProblemTestCase, Submission
+
+
+# ---------------------------------
+# 🔹 INLINE: Test cases under a coding problem
+# ---------------------------------
+class ProblemTestCaseInline(admin.StackedInline):
+    model = ProblemTestCase
+    extra = 1
+    fields = ('order', 'is_sample', 'input', 'expected_output')
+    ordering = ('order',)
+
+
+# Same admin as the tutorials app, plus the judge's test cases
+class CodingProblemWithTestsAdmin(CodingProblemAdmin):
+    inlines = [*CodingProblemAdmin.inlines, ProblemTestCaseInline]
+
+
+admin.site.unregister(CodingProblem)
+admin.site.register(CodingProblem, CodingProblemWithTestsAdmin)
+
+
+# ---------------------------------
+# 🧪 SUBMISSIONS
+# ---------------------------------
+@admin.register(Submission)
+class SubmissionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'problem', 'language', 'status', 'passed', 'total', 'time_ms', 'cached', 'created_at')
+    list_filter = ('status', 'language', 'cached')
+    search_fields = ('user__email', 'problem__title', 'source_hash')
+    raw_id_fields = ('user', 'problem')
+    readonly_fields = ('source_hash', 'results', 'compile_output', 'created_at', 'started_at', 'finished_at')
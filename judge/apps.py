@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class JudgeConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'judge'
+
+    def ready(self):
+        from . import checks  # noqa: F401
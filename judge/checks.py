@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_in_process_judging(app_configs, **kwargs):
+    if not settings.JUDGE_IN_PROCESS:
+        return []
+    return [
+        Warning(
+            "JUDGE_IN_PROCESS runs submitted code inside the web process, with its user, files and network.",
+            hint="Set JUDGE_IN_PROCESS=False and run `manage.py run_judge` on isolated judge hosts.",
+            id='judge.W001',
+        )
+    ]
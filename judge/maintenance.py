@@ -0,0 +1,17 @@
+"""Periodic upkeep of the judge queue (see javify/scheduler.py)."""
+from datetime import timedelta
+
+from django.conf import settings
+
+from javify.scheduler import periodic
+from .pipeline import expire_queued, requeue_stale
+
+
+@periodic(every=timedelta(minutes=1))
+def recover_submissions():
+    """
+    Requeue submissions left running by a judge that died, and fail the ones
+    queued for longer than JUDGE_QUEUE_TIMEOUT so they stop blocking users.
+    """
+    requeued = requeue_stale(timedelta(seconds=settings.JUDGE_STALE_AFTER))
+    return requeued + expire_queued(timedelta(seconds=settings.JUDGE_QUEUE_TIMEOUT))
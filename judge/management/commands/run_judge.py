@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from judge.models import Submission
+from judge.pipeline import JudgePool, pool_stats, requeue_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Judge queued submissions on this host with a pool of sandboxed "
+        "workers. Run one per dedicated judge host (no network, no secrets); "
+        "the web workers only queue submissions and these commands do all the judging."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.JUDGE_WORKERS, help="Parallel submissions.")
+        parser.add_argument('--poll', type=float, default=1.0, help="Seconds between queue checks when idle.")
+        parser.add_argument('--once', action='store_true', help="Judge what is queued now, then exit.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        pool = JudgePool(workers)
+        in_flight = {}  # future -> submission id
+        stale_after = timedelta(seconds=settings.JUDGE_STALE_AFTER)
+        self.stdout.write(f"Judging with {workers} workers")
+        try:
+            while True:
+                requeued = requeue_stale(stale_after)
+                if requeued:
+                    self.stderr.write(f"Requeued {requeued} submissions left running by a dead worker")
+
+                in_flight = {future: pk for future, pk in in_flight.items() if not future.done()}
+                free = workers * 2 - len(in_flight)  # keep every worker busy without hoarding the queue
+                ids = list(
+                    Submission.objects.filter(status=Submission.QUEUED)
+                    .exclude(id__in=in_flight.values())
+                    .order_by('id')
+                    .values_list('id', flat=True)[:max(free, 0)]
+                )
+                in_flight.update((pool.submit(submission_id), submission_id) for submission_id in ids)
+
+                if options['once'] and not ids:
+                    for future in in_flight:
+                        future.result()
+                    break
+                if not ids:
+                    time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(f"Stopped: {pool_stats()['completed']} submissions judged"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tutorials', '0006_per_user_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemTestCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('input', models.TextField(blank=True)),
+                ('expected_output', models.TextField()),
+                ('is_sample', models.BooleanField(default=False, help_text='Shown to learners with the problem.')),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_cases', to='tutorials.codingproblem')),
+            ],
+            options={
+                'ordering': ['problem', 'order', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=20)),
+                ('source', models.TextField()),
+                ('source_hash', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('accepted', 'Accepted'), ('wrong_answer', 'Wrong answer'), ('compile_error', 'Compile error'), ('runtime_error', 'Runtime error'), ('time_limit', 'Time limit exceeded'), ('memory_limit', 'Memory limit exceeded'), ('output_limit', 'Output limit exceeded'), ('internal_error', 'Internal error')], default='queued', max_length=20)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('time_ms', models.PositiveIntegerField(default=0, help_text='Slowest test run.')),
+                ('compile_output', models.TextField(blank=True)),
+                ('results', models.JSONField(blank=True, default=list)),
+                ('cached', models.BooleanField(default=False, help_text='Verdict reused from an identical earlier submission.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='tutorials.codingproblem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'problem', '-created_at'], name='judge_submi_user_id_138dc8_idx'), models.Index(fields=['status', 'id'], name='judge_submi_status_38bcce_idx')],
+            },
+        ),
+    ]
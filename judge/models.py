@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+from tutorials.models import CodingProblem
+
+
+class ProblemTestCase(models.Model):
+    """One stdin/stdout pair a submission for the problem must reproduce."""
+    problem = models.ForeignKey(CodingProblem, on_delete=models.CASCADE, related_name='test_cases')
+    order = models.PositiveIntegerField(default=0)
+    input = models.TextField(blank=True)
+    expected_output = models.TextField()
+    is_sample = models.BooleanField(default=False, help_text="Shown to learners with the problem.")
+
+    class Meta:
+        ordering = ['problem', 'order', 'id']
+
+    def __str__(self):
+        return f"{self.problem_id} #{self.order}"
+
+
+class Submission(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    ACCEPTED = 'accepted'
+    WRONG_ANSWER = 'wrong_answer'
+    COMPILE_ERROR = 'compile_error'
+    RUNTIME_ERROR = 'runtime_error'
+    TIME_LIMIT = 'time_limit'
+    MEMORY_LIMIT = 'memory_limit'
+    OUTPUT_LIMIT = 'output_limit'
+    INTERNAL_ERROR = 'internal_error'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (ACCEPTED, 'Accepted'),
+        (WRONG_ANSWER, 'Wrong answer'),
+        (COMPILE_ERROR, 'Compile error'),
+        (RUNTIME_ERROR, 'Runtime error'),
+        (TIME_LIMIT, 'Time limit exceeded'),
+        (MEMORY_LIMIT, 'Memory limit exceeded'),
+        (OUTPUT_LIMIT, 'Output limit exceeded'),
+        (INTERNAL_ERROR, 'Internal error'),
+    ]
+    PENDING = (QUEUED, RUNNING)
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='submissions')
+    problem = models.ForeignKey(CodingProblem, on_delete=models.CASCADE, related_name='submissions')
+    language = models.CharField(max_length=20)
+    source = models.TextField()
+    source_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    passed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    time_ms = models.PositiveIntegerField(default=0, help_text="Slowest test run.")
+    compile_output = models.TextField(blank=True)
+    results = models.JSONField(default=list, blank=True)
+    cached = models.BooleanField(default=False, help_text="Verdict reused from an identical earlier submission.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'problem', '-created_at']),
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} / {self.problem_id}: {self.status}"
@@ -0,0 +1,326 @@
+"""
+Judging submissions: compile once, run every test in the sandbox, cache.
+
+    submit  -> Submission row (queued); a run_judge worker on a judge host
+               picks it up (or, with JUDGE_IN_PROCESS, a JudgePool in the
+               web process itself: for development only, since submissions
+               then run with the web server's user, files and network)
+    judge   -> claim (queued -> running), verdict from the result cache or
+               compile + run, save
+
+Builds are cached on disk under JUDGE_CACHE_DIR/<language>/<source hash>,
+so resubmitting the same code (or judging it against changed tests) skips
+the compiler. Verdicts are cached in the Django cache under the source hash
+plus a hash of the problem's tests, so an identical submission is answered
+without running anything; editing a test changes the key.
+
+Tests run one after another and stop at the first failure; submissions run
+in parallel, up to JUDGE_WORKERS at a time per pool.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import sandbox
+from .models import ProblemTestCase, Submission
+from .runners import get_runner
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_OUTPUT_CHARS = 1000
+
+
+def source_hash(language, source):
+    return hashlib.sha256(f'{language}\0{source}'.encode()).hexdigest()
+
+
+def _tests_of(problem_id):
+    return list(
+        ProblemTestCase.objects.filter(problem_id=problem_id)
+        .order_by('order', 'id')
+        .values_list('input', 'expected_output', 'is_sample')
+    )
+
+
+def _tests_hash(tests):
+    return hashlib.sha256(json.dumps(tests, separators=(',', ':')).encode()).hexdigest()
+
+
+def _normalize(output):
+    return '\n'.join(line.rstrip() for line in output.rstrip().splitlines())
+
+
+# -----------------------------
+# Builds
+# -----------------------------
+def _build(runner, source, digest):
+    """(ok, compiler output, build dir); reuses an earlier build of the same source."""
+    root = os.path.join(settings.JUDGE_CACHE_DIR, runner.language)
+    build_dir = os.path.join(root, digest)
+    status_path = os.path.join(build_dir, 'build.json')
+    try:
+        with open(status_path) as fh:
+            status = json.load(fh)
+        os.utime(build_dir)  # most recently used
+        return status['ok'], status['output'], build_dir
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=root, prefix='.build-')
+    os.chmod(staging, 0o755)  # the compiler may run as JUDGE_SANDBOX_USER
+    try:
+        ok, output = runner.compile(source, staging)
+        with open(os.path.join(staging, 'build.json'), 'w') as fh:
+            json.dump({'ok': ok, 'output': output}, fh)
+        try:
+            os.rename(staging, build_dir)
+        except OSError:
+            # Built concurrently by another worker; use theirs
+            shutil.rmtree(staging, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _prune_builds(root)
+    return ok, output, build_dir
+
+
+def _prune_builds(root):
+    """Keep the JUDGE_BUILD_CACHE_SIZE most recently used builds."""
+    entries = []
+    for name in os.listdir(root):
+        if name.startswith('.'):
+            continue
+        try:
+            entries.append((os.stat(os.path.join(root, name)).st_mtime, name))
+        except FileNotFoundError:
+            pass
+    entries.sort(reverse=True)
+    for _, name in entries[settings.JUDGE_BUILD_CACHE_SIZE:]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+# -----------------------------
+# Judging
+# -----------------------------
+def _run_tests(runner, build_dir, tests):
+    memory_mb = settings.JUDGE_MEMORY_MB
+    argv = runner.command(build_dir, memory_mb)
+    results = []
+    verdict = Submission.ACCEPTED
+    for number, (stdin, expected, is_sample) in enumerate(tests, start=1):
+        workdir = tempfile.mkdtemp(prefix='judge-run-')
+        try:
+            run = sandbox.run(
+                argv,
+                cwd=workdir,
+                stdin=stdin,
+                time_limit=settings.JUDGE_TIME_LIMIT,
+                memory_mb=memory_mb if runner.limit_address_space else None,
+                output_bytes=settings.JUDGE_OUTPUT_LIMIT,
+                max_open_files=runner.max_open_files,
+            )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if run.timed_out or run.exit_code in (-signal.SIGKILL, -signal.SIGXCPU):
+            status = Submission.TIME_LIMIT
+        elif run.output_truncated:
+            status = Submission.OUTPUT_LIMIT
+        elif run.exit_code != 0:
+            status = runner.classify(run) or Submission.RUNTIME_ERROR
+        elif _normalize(run.stdout) != _normalize(expected):
+            status = Submission.WRONG_ANSWER
+        else:
+            status = Submission.ACCEPTED
+
+        result = {"test": number, "status": status, "time_ms": run.wall_ms}
+        if is_sample:
+            # Samples are public, so show what went wrong
+            result.update(
+                input=stdin[:SAMPLE_OUTPUT_CHARS],
+                expected=expected[:SAMPLE_OUTPUT_CHARS],
+                output=run.stdout[:SAMPLE_OUTPUT_CHARS],
+                error=run.stderr[:SAMPLE_OUTPUT_CHARS],
+            )
+        results.append(result)
+        if status != Submission.ACCEPTED:
+            verdict = status
+            break
+    return verdict, results
+
+
+def judge(language, source, problem_id):
+    """
+    Verdict for `source` against the problem's current tests, as the dict of
+    Submission fields to store. Served from the result cache when possible.
+    """
+    tests = _tests_of(problem_id)
+    digest = source_hash(language, source)
+    key = f'judge:{digest}:{_tests_hash(tests)}'
+    verdict = cache.get(key)
+    if verdict is not None:
+        _pool_stats.record('cache_hits')
+        return {**verdict, "cached": True}
+
+    runner = get_runner(language)
+    if runner is None:
+        return {"status": Submission.INTERNAL_ERROR, "compile_output": f"No runner for {language} on this host"}
+    ok, compile_output, build_dir = _build(runner, source, digest)
+    if not ok:
+        verdict = {"status": Submission.COMPILE_ERROR, "compile_output": compile_output, "total": len(tests)}
+    else:
+        status, results = _run_tests(runner, build_dir, tests)
+        verdict = {
+            "status": status,
+            "compile_output": compile_output,
+            "passed": sum(r["status"] == Submission.ACCEPTED for r in results),
+            "total": len(tests),
+            "time_ms": max((r["time_ms"] for r in results), default=0),
+            "results": results,
+        }
+    cache.set(key, verdict, settings.JUDGE_RESULT_CACHE_TTL)
+    return {**verdict, "cached": False}
+
+
+def process_submission(submission_id):
+    """Judge one queued submission; a no-op if another worker already claimed it."""
+    claimed = Submission.objects.filter(pk=submission_id, status=Submission.QUEUED).update(
+        status=Submission.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    submission = Submission.objects.get(pk=submission_id)
+    try:
+        fields = judge(submission.language, submission.source, submission.problem_id)
+    except Exception:
+        logger.exception("Judging submission %s failed", submission_id)
+        fields = {"status": Submission.INTERNAL_ERROR}
+    for name, value in fields.items():
+        setattr(submission, name, value)
+    submission.finished_at = timezone.now()
+    submission.save(update_fields=[*fields, 'finished_at'])
+    return submission
+
+
+def requeue_stale(older_than):
+    """Put submissions whose worker died mid-run back in the queue."""
+    cutoff = timezone.now() - older_than
+    return Submission.objects.filter(status=Submission.RUNNING, started_at__lt=cutoff).update(
+        status=Submission.QUEUED, started_at=None
+    )
+
+
+def expire_queued(older_than):
+    """
+    Give up on submissions nobody picked up in time (no judge running), so
+    they stop counting against JUDGE_MAX_PENDING_PER_USER.
+    """
+    cutoff = timezone.now() - older_than
+    return Submission.objects.filter(status=Submission.QUEUED, created_at__lt=cutoff).update(
+        status=Submission.INTERNAL_ERROR,
+        compile_output="Not judged in time, please submit again",
+        finished_at=timezone.now(),
+    )
+
+
+# -----------------------------
+# Worker pool
+# -----------------------------
+class _PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"queued": 0, "running": 0, "completed": 0, "cache_hits": 0}
+
+    def record(self, name, delta=1):
+        with self._lock:
+            self.counts[name] += delta
+
+    def move(self, source, target):
+        with self._lock:
+            self.counts[source] -= 1
+            self.counts[target] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+_pool_stats = _PoolStats()
+
+
+class JudgePool:
+    """Runs submissions on up to `workers` threads, each driving one sandboxed process."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='judge')
+
+    def submit(self, submission_id):
+        _pool_stats.record('queued')
+        return self.executor.submit(self._run, submission_id)
+
+    def _run(self, submission_id):
+        _pool_stats.move('queued', 'running')
+        started = time.monotonic()
+        try:
+            submission = process_submission(submission_id)
+            if submission is not None:
+                logger.info(
+                    "Judged submission %s: %s in %.0f ms",
+                    submission_id, submission.status, (time.monotonic() - started) * 1000,
+                )
+            return submission
+        finally:
+            _pool_stats.move('running', 'completed')
+            close_old_connections()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _resume(pool):
+    """Pick up what a previous process left queued or running when it stopped."""
+    requeue_stale(timedelta(seconds=settings.JUDGE_STALE_AFTER))
+    for submission_id in Submission.objects.filter(status=Submission.QUEUED).order_by('id').values_list('id', flat=True):
+        pool.submit(submission_id)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JudgePool(settings.JUDGE_WORKERS)
+            _resume(_pool)
+        return _pool
+
+
+def pool_stats():
+    """Queue depth and throughput counters of this process's pool."""
+    return {"workers": settings.JUDGE_WORKERS, **_pool_stats.snapshot()}
+
+
+def schedule(submission):
+    """
+    Judge `submission` in this process once the current transaction commits,
+    if JUDGE_IN_PROCESS; otherwise it waits for a run_judge worker.
+    """
+    if settings.JUDGE_IN_PROCESS:
+        transaction.on_commit(lambda: get_pool().submit(submission.pk))
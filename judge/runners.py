@@ -0,0 +1,130 @@
+"""
+Language runners for the judge.
+
+A runner compiles a submission into a build directory once and then gives
+the command line that runs the build against one test. JUDGE_RUNNERS maps
+language names to runner classes; get_runner() returns None for languages
+that aren't configured or whose toolchain isn't installed on this host.
+
+JavaRunner uses the local JDK. PythonRunner is a reference runner that
+only needs the interpreter already running Django, so the whole pipeline can
+be exercised on hosts without a JDK (enable it with JUDGE_REFERENCE_RUNNER).
+"""
+import os
+import re
+import shutil
+import sys
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import sandbox
+from .models import Submission
+
+_runners = {}
+
+
+class Runner:
+    language = None
+    # False for runtimes that reserve much more address space than they use
+    limit_address_space = True
+    max_open_files = 64
+
+    def available(self):
+        return sandbox.available()
+
+    def compile(self, source, build_dir):
+        """Build `source` into `build_dir`. Returns (ok, compiler output)."""
+        raise NotImplementedError
+
+    def command(self, build_dir, memory_mb):
+        raise NotImplementedError
+
+    def classify(self, result):
+        """Status for a failed run the generic checks can't tell apart, or None."""
+        return None
+
+
+class JavaRunner(Runner):
+    language = 'java'
+    limit_address_space = False  # limited with -Xmx instead
+    max_open_files = 256
+
+    _PUBLIC_CLASS = re.compile(r'\bpublic\s+(?:final\s+)?class\s+([A-Za-z_$][\w$]*)')
+
+    def available(self):
+        return super().available() and bool(shutil.which('javac') and shutil.which('java'))
+
+    def compile(self, source, build_dir):
+        match = self._PUBLIC_CLASS.search(source)
+        main_class = match.group(1) if match else 'Main'
+        source_dir = os.path.join(build_dir, 'src')
+        os.makedirs(source_dir)
+        with open(os.path.join(source_dir, f'{main_class}.java'), 'w') as fh:
+            fh.write(source)
+        # Classes go next to the source: javac may run as JUDGE_SANDBOX_USER,
+        # which can only write to its working directory
+        result = sandbox.run(
+            ['javac', '-J-Xmx512m', '-encoding', 'UTF-8', '-nowarn', '-d', '.', f'{main_class}.java'],
+            cwd=source_dir,
+            time_limit=settings.JUDGE_COMPILE_TIME_LIMIT,
+            memory_mb=None,
+            max_open_files=self.max_open_files,
+        )
+        with open(os.path.join(build_dir, 'main-class'), 'w') as fh:
+            fh.write(main_class)
+        return result.exit_code == 0 and not result.timed_out, (result.stdout + result.stderr).strip()
+
+    def command(self, build_dir, memory_mb):
+        with open(os.path.join(build_dir, 'main-class')) as fh:
+            main_class = fh.read()
+        return [
+            'java',
+            f'-Xmx{memory_mb}m',
+            '-Xss64m',
+            '-XX:+UseSerialGC',
+            '-XX:TieredStopAtLevel=1',
+            '-XX:ActiveProcessorCount=1',
+            '-cp', os.path.join(build_dir, 'src'),
+            main_class,
+        ]
+
+    def classify(self, result):
+        if 'java.lang.OutOfMemoryError' in result.stderr:
+            return Submission.MEMORY_LIMIT
+        return None
+
+
+class PythonRunner(Runner):
+    """Reference runner: Python 3 with the judge's own interpreter."""
+    language = 'python'
+
+    def compile(self, source, build_dir):
+        try:
+            compile(source, 'main.py', 'exec')
+        except (SyntaxError, ValueError) as exc:
+            return False, f"{type(exc).__name__}: {exc}"
+        with open(os.path.join(build_dir, 'main.py'), 'w') as fh:
+            fh.write(source)
+        return True, ''
+
+    def command(self, build_dir, memory_mb):
+        return [sys.executable, '-I', '-S', os.path.join(build_dir, 'main.py')]
+
+    def classify(self, result):
+        if 'MemoryError' in result.stderr:
+            return Submission.MEMORY_LIMIT
+        return None
+
+
+def get_runner(language):
+    """Runner for `language`, or None if it isn't configured or installed here."""
+    if language not in _runners:
+        path = settings.JUDGE_RUNNERS.get(language)
+        runner = import_string(path)() if path else None
+        _runners[language] = runner if runner is not None and runner.available() else None
+    return _runners[language]
+
+
+def available_languages():
+    return sorted(language for language in settings.JUDGE_RUNNERS if get_runner(language) is not None)
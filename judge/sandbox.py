@@ -0,0 +1,151 @@
+"""
+Resource-limited subprocesses for compiling and running submissions.
+
+Each process gets its own session (so the whole group can be killed), a
+scrubbed environment, a throwaway working directory and rlimits on CPU
+time, address space, file size, open files, processes and core dumps.
+Output goes to files, so RLIMIT_FSIZE also caps how much a program can
+print. The limits are applied by exec'ing through util-linux `prlimit`, not
+a preexec_fn, which isn't safe in the judge's threaded workers. The process
+group is killed once the program exits, so nothing it backgrounded survives.
+
+This keeps a submission from hogging the judge host; it is NOT a security
+boundary. Without further isolation the program can read whatever the
+process user can and use the network. Never judge on web hosts: run
+`manage.py run_judge` on dedicated hosts (or containers) without network
+access or secrets, and set JUDGE_SANDBOX_USER to an unprivileged account
+used for nothing else (RLIMIT_NPROC counts every process of that user).
+"""
+import os
+import pwd
+import shutil
+import signal
+import subprocess
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+class SandboxError(RuntimeError):
+    pass
+
+
+class RunResult(NamedTuple):
+    exit_code: int          # negative: killed by that signal
+    stdout: str
+    stderr: str
+    wall_ms: int
+    timed_out: bool         # wall-clock limit hit
+    output_truncated: bool  # stdout reached the output limit
+
+
+def available():
+    return shutil.which('prlimit') is not None
+
+
+def _limits(cpu_seconds, memory_mb, output_bytes, max_open_files, max_processes):
+    """prlimit(1) command prefix applying the limits to the program it execs."""
+    prlimit = shutil.which('prlimit')
+    if prlimit is None:
+        raise SandboxError("util-linux prlimit is required to run submissions")
+    limits = [
+        prlimit,
+        f'--cpu={cpu_seconds}:{cpu_seconds + 1}',
+        f'--fsize={output_bytes}',
+        f'--nofile={max_open_files}',
+        f'--nproc={max_processes}',
+        '--core=0',
+    ]
+    if memory_mb:
+        limits.append(f'--as={memory_mb * 1024 * 1024}')
+    return [*limits, '--']
+
+
+def _sandbox_user():
+    """(uid, gid) of JUDGE_SANDBOX_USER, or None to run as the judge's own user."""
+    name = settings.JUDGE_SANDBOX_USER
+    if not name:
+        return None
+    try:
+        entry = pwd.getpwnam(name)
+    except KeyError:
+        raise SandboxError(f"JUDGE_SANDBOX_USER {name!r} does not exist") from None
+    return entry.pw_uid, entry.pw_gid
+
+
+def _read(path, limit):
+    try:
+        with open(path, 'rb') as fh:
+            data = fh.read(limit + 1)
+    except FileNotFoundError:
+        return '', False
+    # RLIMIT_FSIZE stops the file at exactly `limit` bytes, and runtimes that
+    # ignore SIGXFSZ (Python does) just see a failed write, so a full file
+    # counts as truncated
+    return data[:limit].decode('utf-8', errors='replace'), len(data) >= limit
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run(argv, cwd, stdin='', time_limit=2.0, memory_mb=256, output_bytes=64 * 1024, max_open_files=64,
+        max_processes=None, env=None):
+    """
+    Run `argv` in `cwd` with the given limits. CPU time is limited to
+    `time_limit` (rounded up to whole seconds by the kernel) and wall time
+    to twice that plus a second, which catches sleeping or blocked programs.
+    `memory_mb=None` leaves the address space unlimited (for the JVM, which
+    reserves far more than it uses and is limited with -Xmx instead).
+    """
+    cpu_seconds = max(1, int(time_limit + 0.999))
+    max_processes = max_processes or settings.JUDGE_MAX_PROCESSES
+    command = _limits(cpu_seconds, memory_mb, output_bytes, max_open_files, max_processes) + list(argv)
+    stdin_path = os.path.join(cwd, '.stdin')
+    stdout_path = os.path.join(cwd, '.stdout')
+    stderr_path = os.path.join(cwd, '.stderr')
+    with open(stdin_path, 'w') as fh:
+        fh.write(stdin)
+
+    user = _sandbox_user()
+    credentials = {}
+    if user is not None:
+        uid, gid = user
+        os.chown(cwd, uid, gid)
+        credentials = {'user': uid, 'group': gid, 'extra_groups': []}
+
+    base_env = {'PATH': os.environ.get('PATH', '/usr/bin:/bin'), 'LANG': 'C.UTF-8', 'HOME': cwd}
+    started = time.monotonic()
+    timed_out = False
+    with open(stdin_path, 'rb') as stdin_fh, open(stdout_path, 'wb') as stdout_fh, open(stderr_path, 'wb') as stderr_fh:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=stdin_fh,
+            stdout=stdout_fh,
+            stderr=stderr_fh,
+            env={**base_env, **(env or {})},
+            start_new_session=True,
+            close_fds=True,
+            **credentials,
+        )
+        try:
+            exit_code = process.wait(timeout=time_limit * 2 + 1)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            _kill_group(process.pid)
+            exit_code = process.wait()
+        finally:
+            # Whatever the program left running in the background goes too
+            _kill_group(process.pid)
+    wall_ms = int((time.monotonic() - started) * 1000)
+
+    stdout, truncated = _read(stdout_path, output_bytes)
+    stderr, _ = _read(stderr_path, 8 * 1024)
+    if exit_code == -signal.SIGXFSZ:
+        truncated = True
+    return RunResult(exit_code, stdout, stderr, wall_ms, timed_out, truncated)
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from .models import ProblemTestCase, Submission
+
+
+class SubmissionSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Submission
+        fields = ['id', 'problem', 'language', 'status', 'passed', 'total', 'time_ms', 'cached', 'created_at', 'finished_at']
+
+
+class SubmissionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Submission
+        fields = [
+            'id', 'problem', 'language', 'source', 'status', 'passed', 'total', 'time_ms',
+            'compile_output', 'results', 'cached', 'created_at', 'finished_at',
+        ]
+
+
+class SampleTestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProblemTestCase
+        fields = ['id', 'order', 'input', 'expected_output']
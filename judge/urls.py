@@ -0,0 +1,16 @@
+from django.urls import path
+from .views import (
+    JudgeLanguagesView,
+    SampleTestListView,
+    SubmissionListCreateView,
+    SubmissionDetailView,
+    JudgeStatsView,
+)
+
+urlpatterns = [
+    path('languages/', JudgeLanguagesView.as_view(), name='judge-languages'),
+    path('problems/<int:problem_id>/samples/', SampleTestListView.as_view(), name='judge-samples'),
+    path('problems/<int:problem_id>/submissions/', SubmissionListCreateView.as_view(), name='judge-submissions'),
+    path('submissions/<int:pk>/', SubmissionDetailView.as_view(), name='judge-submission-detail'),
+    path('stats/', JudgeStatsView.as_view(), name='judge-stats'),  # Staff only
+]
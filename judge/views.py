@@ -0,0 +1,118 @@
+import os
+
+from django.conf import settings
+from django.db.models import Count, Min
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from tutorials.catalog import get_catalog
+from .models import ProblemTestCase, Submission
+from .pipeline import pool_stats, schedule, source_hash
+from .runners import available_languages
+from .serializers import SampleTestSerializer, SubmissionSerializer, SubmissionSummarySerializer
+
+
+def _coding_problem_or_404(problem_id):
+    problem = get_catalog().coding_problem(problem_id)
+    if problem is None:
+        raise Http404("No CodingProblem matches the given query.")
+    return problem
+
+
+class JudgeLanguagesView(APIView):
+    """Languages this deployment can judge."""
+
+    def get(self, request):
+        return Response({"languages": available_languages()})
+
+
+class SampleTestListView(APIView):
+    """Public example tests of a coding problem."""
+
+    def get(self, request, problem_id):
+        _coding_problem_or_404(problem_id)
+        samples = ProblemTestCase.objects.filter(problem_id=problem_id, is_sample=True).order_by('order', 'id')
+        return Response(SampleTestSerializer(samples, many=True).data)
+
+
+class SubmissionListCreateView(APIView):
+    """
+    GET: the learner's recent submissions for a problem.
+    POST {"language": "java", "source": "..."}: queue a submission for judging;
+    poll the returned submission until its status is no longer queued/running.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, problem_id):
+        submissions = Submission.objects.filter(user=request.user, problem_id=problem_id)[:20]
+        return Response(SubmissionSummarySerializer(submissions, many=True).data)
+
+    def post(self, request, problem_id):
+        _coding_problem_or_404(problem_id)
+        language = request.data.get("language")
+        source = request.data.get("source")
+        if language not in available_languages():
+            return Response(
+                {"error": f"Unsupported language. Available: {', '.join(available_languages()) or 'none'}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not isinstance(source, str) or not source.strip():
+            return Response({"error": "Source code is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(source.encode()) > settings.JUDGE_MAX_SOURCE_BYTES:
+            return Response(
+                {"error": f"Source code is limited to {settings.JUDGE_MAX_SOURCE_BYTES} bytes."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        pending = Submission.objects.filter(user=request.user, status__in=Submission.PENDING).count()
+        if pending >= settings.JUDGE_MAX_PENDING_PER_USER:
+            return Response(
+                {"error": "Wait for your earlier submissions to finish."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
+        submission = Submission.objects.create(
+            user=request.user,
+            problem_id=problem_id,
+            language=language,
+            source=source,
+            source_hash=source_hash(language, source),
+        )
+        schedule(submission)
+        return Response(SubmissionSerializer(submission).data, status=status.HTTP_202_ACCEPTED)
+
+
+class SubmissionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        submission = Submission.objects.filter(pk=pk, user=request.user).first()
+        if submission is None:
+            raise Http404("No Submission matches the given query.")
+        return Response(SubmissionSerializer(submission).data)
+
+
+class JudgeStatsView(APIView):
+    """
+    Judge queue depth: submissions waiting or running across all workers
+    (from the database) and this process's pool counters.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        counts = dict(
+            Submission.objects.filter(status__in=Submission.PENDING)
+            .values_list('status')
+            .annotate(n=Count('id'))
+        )
+        oldest = Submission.objects.filter(status=Submission.QUEUED).aggregate(at=Min('created_at'))['at']
+        return Response({
+            "queued": counts.get(Submission.QUEUED, 0),
+            "running": counts.get(Submission.RUNNING, 0),
+            "oldest_queued_seconds": round((timezone.now() - oldest).total_seconds(), 1) if oldest else None,
+            "pid": os.getpid(),
+            "pool": pool_stats(),
+        })
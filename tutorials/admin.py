@@ -77,10 +77,11 @@ class TopicAdmin(admin.ModelAdmin):
 # ---------------------------------
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ('question_text', 'topic', 'question_type')
+    list_display = ('question_text', 'topic', 'question_type', 'difficulty', 'discrimination')
     list_filter = ('question_type', 'topic__level')
     search_fields = ('question_text',)
     ordering = ('topic__order',)
+    readonly_fields = ('difficulty', 'discrimination', 'difficulty_updated_at')
 
 
 # ---------------------------------
@@ -150,3 +151,27 @@ class CodingProblemAdmin(admin.ModelAdmin):
     formfield_overrides = {
         models.TextField: {'widget': CKEditor5Widget(config_name='extends')}
     }
+
+
+# ---------------------------------
+# 📝 QUIZ ATTEMPT LOG
+# ---------------------------------
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'topic', 'correct_answers', 'total_questions', 'passed', 'submitted_at')
+    list_filter = ('passed', 'topic__level')
+    search_fields = ('user__username', 'topic__title')
+    ordering = ('-submitted_at',)
+    readonly_fields = (
+        'user', 'topic', 'correct_answers', 'total_questions', 'passed', 'question_ids', 'result_mask', 'submitted_at',
+    )
+
+
+# ---------------------------------
+# 📦 OFFLINE LEVEL BUNDLES
+# ---------------------------------
+@admin.register(LevelBundle)
+class LevelBundleAdmin(admin.ModelAdmin):
+    list_display = ('level', 'version', 'size', 'compressed_size', 'catalog_version', 'created_at')
+    list_filter = ('level',)
+    readonly_fields = ('level', 'version', 'sha256', 'size', 'compressed_size', 'catalog_version', 'created_at')
@@ -0,0 +1,148 @@
+"""
+Incremental rollups of the quiz attempt log.
+
+rollup_quiz_attempts() folds QuizAttempt rows newer than the stored cursor
+into per topic/day and per question/day counters. The analytics API reads
+only those counters, so its cost depends on the date range, not on how many
+attempts were ever made.
+
+Ids are handed out on INSERT but rows become visible on COMMIT, so a row can
+appear after rows with higher ids. The cursor therefore stops short of
+attempts submitted in the last ROLLUP_SETTLE_SECONDS; by the time they are
+folded, every transaction that took a lower id has committed or rolled back.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import (
+    Question,
+    QuizAttempt,
+    TopicDailyStats,
+    QuestionDailyStats,
+    RollupCursor,
+)
+
+QUIZ_ATTEMPTS_CURSOR = 'quiz_attempts'
+
+
+def _increment(model, lookup, **counters):
+    """Add counters to the row matching `lookup`, creating it if needed."""
+    rows = model.objects.filter(**lookup)
+    updates = {name: F(name) + value for name, value in counters.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **counters)
+    except IntegrityError:
+        rows.update(**updates)
+
+
+def _existing_question_ids(topic_ids):
+    return set(Question.objects.filter(topic_id__in=topic_ids).values_list('id', flat=True))
+
+
+def _rollup_batch(batch_size):
+    """Fold one batch of new attempts. Returns the number of attempts processed."""
+    with transaction.atomic():
+        cursor, _ = RollupCursor.objects.get_or_create(name=QUIZ_ATTEMPTS_CURSOR)
+        cursor = RollupCursor.objects.select_for_update().get(pk=cursor.pk)
+
+        settled = timezone.now() - timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS)
+        attempts = QuizAttempt.objects.filter(id__gt=cursor.last_id).order_by('id').values_list(
+            'id', 'topic_id', 'submitted_at', 'passed', 'question_ids', 'result_mask'
+        )[:batch_size]
+        # Stop at the first recent attempt: a lower id may still be uncommitted
+        attempts = list(takewhile(lambda attempt: attempt[2] < settled, attempts))
+        if not attempts:
+            return 0
+
+        existing = _existing_question_ids({a[1] for a in attempts})
+        topic_stats = defaultdict(lambda: [0, 0])
+        question_stats = defaultdict(lambda: [0, 0])
+
+        for _, topic_id, submitted_at, passed, question_ids, mask in attempts:
+            day = timezone.localdate(submitted_at)
+            topic_stats[(topic_id, day)][0] += 1
+            topic_stats[(topic_id, day)][1] += int(passed)
+
+            # Bits belong to the questions graded then, whatever the topic
+            # holds now; questions deleted since are left out
+            for question_id, correct in zip(question_ids, QuizAttempt.decode_mask(mask, len(question_ids))):
+                if question_id in existing:
+                    question_stats[(question_id, day)][0] += 1
+                    question_stats[(question_id, day)][1] += int(not correct)
+
+        for (topic_id, day), (count, passes) in topic_stats.items():
+            _increment(TopicDailyStats, {'topic_id': topic_id, 'day': day}, attempts=count, passes=passes)
+        for (question_id, day), (count, misses) in question_stats.items():
+            _increment(QuestionDailyStats, {'question_id': question_id, 'day': day}, attempts=count, misses=misses)
+
+        cursor.last_id = attempts[-1][0]
+        cursor.save(update_fields=['last_id', 'updated_at'])
+        return len(attempts)
+
+
+def rollup_quiz_attempts(batch_size=5000, max_batches=None):
+    """Fold all pending attempts into the rollup tables, batch by batch."""
+    processed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = _rollup_batch(batch_size)
+        if not count:
+            break
+        processed += count
+        batches += 1
+    return processed
+
+
+def topic_analytics(topic, date_from, date_to):
+    """Pass rates and per-question miss rates for a topic, read from the rollups."""
+    daily = list(
+        TopicDailyStats.objects.filter(topic=topic, day__gte=date_from, day__lte=date_to)
+        .order_by('day')
+        .values('day', 'attempts', 'passes')
+    )
+    attempts = sum(d['attempts'] for d in daily)
+    passes = sum(d['passes'] for d in daily)
+
+    per_question = (
+        QuestionDailyStats.objects.filter(
+            question__topic=topic, day__gte=date_from, day__lte=date_to
+        )
+        .values('question_id', 'question__question_text')
+        .annotate(attempts=Sum('attempts'), misses=Sum('misses'))
+        .order_by('question_id')
+    )
+
+    return {
+        "attempts": attempts,
+        "passes": passes,
+        "pass_rate": round(passes / attempts, 4) if attempts else None,
+        "attempts_per_pass": round(attempts / passes, 2) if passes else None,
+        "daily": [
+            {
+                "day": d['day'],
+                "attempts": d['attempts'],
+                "passes": d['passes'],
+                "pass_rate": round(d['passes'] / d['attempts'], 4) if d['attempts'] else None,
+            }
+            for d in daily
+        ],
+        "questions": [
+            {
+                "question_id": q['question_id'],
+                "question_text": q['question__question_text'][:100],
+                "attempts": q['attempts'],
+                "misses": q['misses'],
+                "miss_rate": round(q['misses'] / q['attempts'], 4) if q['attempts'] else None,
+            }
+            for q in per_question
+        ],
+    }
@@ -0,0 +1,263 @@
+"""
+Versioned offline bundles: a whole Level in one archive.
+
+A bundle is an uncompressed tar with a fixed layout and no timestamps, so
+the same content always produces the same bytes:
+
+    level.json          level, topics (TopicListView shape) and each
+                        topic's questions (QuestionListView shape)
+    topics/<id>.html    explanation, images pointing into the bundle
+    images/<name>       uploaded images the explanations show, one variant
+                        each (the largest WebP up to BUNDLE_IMAGE_WIDTH)
+
+build_level_bundle() publishes a new version whenever the archive differs
+from the latest one. Each version is stored under BUNDLE_ROOT as
+
+    <level id>/<version>.tar.gz                      what clients download
+    <level id>/<version>.tar                         source for deltas
+    <level id>/patches/<from>-<version>.delta        from each kept version
+
+Patches are javify.delta deltas between the uncompressed archives; images
+are content-addressed and tar members are block-aligned, so after a text
+edit a patch is roughly the size of the edited topics. Clients keep the
+uncompressed archive, apply the patch and check the sha256 the delta
+carries. The last BUNDLE_KEEP_VERSIONS versions are kept; clients on older
+ones download the bundle again. BUNDLE_ROOT must be shared by all web nodes,
+like MEDIA_ROOT.
+"""
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tarfile
+import tempfile
+
+from django.conf import settings
+from django.db import transaction
+
+from javify.delta import make_delta
+from javify.uploads import get_storage, rewrite_img_tags, set_tag_attribute, tag_attributes, uploaded_image
+from .catalog import CatalogSnapshot
+from .models import Level, LevelBundle
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+IMAGES_DIR = 'images'
+
+_REMOVED_ATTRIBUTES = re.compile(r'\s(?:srcset|sizes)\s*=\s*"[^"]*"', re.IGNORECASE)
+
+
+def bundle_dir(level_id):
+    return os.path.join(settings.BUNDLE_ROOT, str(level_id))
+
+
+def archive_path(level_id, version, compressed=True):
+    return os.path.join(bundle_dir(level_id), f'{version}.tar{".gz" if compressed else ""}')
+
+
+def patch_path(level_id, from_version, to_version):
+    return os.path.join(bundle_dir(level_id), 'patches', f'{from_version}-{to_version}.delta')
+
+
+# -----------------------------
+# Building
+# -----------------------------
+def _bundle_image(src, storage):
+    """Storage name of the file to ship for an <img> src, or None if it isn't an upload."""
+    upload = uploaded_image(src, storage)
+    if upload is None:
+        return None
+    name, manifest = upload
+    if manifest and manifest['variants']:
+        fitting = [v for v in manifest['variants'] if v['width'] <= settings.BUNDLE_IMAGE_WIDTH]
+        return (fitting or manifest['variants'][:1])[-1]['webp']
+    # Not processed (GIF, SVG) or variants not built yet: the original
+    return name if storage.exists(name) else None
+
+
+def _localize_images(html, storage, images):
+    """Point uploaded images at their copy in the bundle; adds them to `images`."""
+
+    def rewrite(tag):
+        name = _bundle_image(tag_attributes(tag).get('src', ''), storage)
+        if name is None:
+            return tag  # external image: needs the network
+        images[f'{IMAGES_DIR}/{os.path.basename(name)}'] = name
+        tag = _REMOVED_ATTRIBUTES.sub('', tag)
+        return set_tag_attribute(tag, 'src', f'../{IMAGES_DIR}/{os.path.basename(name)}')
+
+    return rewrite_img_tags(html, rewrite)
+
+
+def _bundle_files(catalog, level):
+    """{archive path: bytes} for `level`."""
+    storage = get_storage()
+    files = {}
+    images = {}
+    topics = []
+    for topic in catalog.topics_of(level):
+        data = catalog.topic_data(topic)
+        explanation = data.pop('explanation')
+        data['explanation_path'] = f'topics/{topic.id}.html'
+        data['questions'] = [catalog.question_data(q) for q in catalog.questions_of(topic)]
+        topics.append(data)
+        files[data['explanation_path']] = _localize_images(explanation, storage, images).encode()
+
+    files['level.json'] = json.dumps({
+        "format": FORMAT_VERSION,
+        "level_id": level.id,
+        "level_number": level.number,
+        "level_title": level.title,
+        "description": level.description,
+        "xp_reward": level.xp_reward,
+        "coin_reward": level.coin_reward,
+        "required_topics": level.required_topics,
+        "topics": topics,
+    }, ensure_ascii=False, separators=(',', ':'), default=dict).encode()
+
+    for path, name in images.items():
+        with storage.open(name, 'rb') as fh:
+            files[path] = fh.read()
+    return files
+
+
+def _pack(files):
+    """Deterministic tar: fixed member order, no timestamps or owners."""
+    buffer = io.BytesIO()
+    order = ['level.json'] + sorted(p for p in files if p.startswith('topics/')) \
+        + sorted(p for p in files if p.startswith(f'{IMAGES_DIR}/'))
+    with tarfile.open(fileobj=buffer, mode='w', format=tarfile.GNU_FORMAT) as archive:
+        for path in order:
+            info = tarfile.TarInfo(path)
+            info.size = len(files[path])
+            info.mode = 0o644
+            info.mtime = 0
+            archive.addfile(info, io.BytesIO(files[path]))
+    return buffer.getvalue()
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def build_level_bundle(level_id, catalog=None, force=False):
+    """
+    Publish a new bundle version of the level if its content changed (or
+    `force`). Returns the new LevelBundle, or None if nothing changed.
+
+    Builders of the same level take turns on a lock of its Level row, so the
+    version a builder picks is still free when it writes that version's
+    files and row; the archive is packed before taking the lock.
+    """
+    catalog = catalog or CatalogSnapshot.load()
+    level = catalog.level(level_id)
+    if level is None:
+        return None
+    archive = _pack(_bundle_files(catalog, level))
+    digest = hashlib.sha256(archive).hexdigest()
+
+    with transaction.atomic():
+        if not Level.objects.select_for_update().filter(pk=level_id).exists():
+            return None  # deleted since the catalog was loaded
+        latest = LevelBundle.objects.filter(level_id=level_id).order_by('-version').first()
+        if latest is not None and latest.sha256 == digest and not force:
+            if latest.catalog_version != catalog.version:
+                LevelBundle.objects.filter(pk=latest.pk).update(catalog_version=catalog.version)
+            return None
+
+        version = latest.version + 1 if latest else 1
+        compressed = gzip.compress(archive, compresslevel=9, mtime=0)
+        # Files first, row last: the row only becomes visible with the commit,
+        # and by then the version has all its files
+        for previous in LevelBundle.objects.filter(level_id=level_id).order_by('-version')[:settings.BUNDLE_KEEP_VERSIONS - 1]:
+            try:
+                with open(archive_path(level_id, previous.version, compressed=False), 'rb') as fh:
+                    source = fh.read()
+            except FileNotFoundError:
+                continue
+            _write_atomic(patch_path(level_id, previous.version, version), make_delta(source, archive))
+        _write_atomic(archive_path(level_id, version, compressed=False), archive)
+        _write_atomic(archive_path(level_id, version), compressed)
+
+        bundle = LevelBundle.objects.create(
+            level_id=level_id,
+            version=version,
+            sha256=digest,
+            size=len(archive),
+            compressed_size=len(compressed),
+            catalog_version=catalog.version,
+        )
+        _prune(level_id)
+
+    logger.info("Built bundle v%s of level %s (%s bytes, %s compressed)", version, level_id, len(archive), len(compressed))
+    return bundle
+
+
+def _remove_files(level_id, versions):
+    for version in versions:
+        for path in (archive_path(level_id, version), archive_path(level_id, version, compressed=False)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    patches = os.path.join(bundle_dir(level_id), 'patches')
+    versions = {str(version) for version in versions}
+    for name in os.listdir(patches) if os.path.isdir(patches) else ():
+        if name.split('-')[0] in versions:
+            try:
+                os.remove(os.path.join(patches, name))
+            except FileNotFoundError:
+                pass
+
+
+def _prune(level_id):
+    """Forget versions beyond BUNDLE_KEEP_VERSIONS; their files and patches go after the commit."""
+    stale = list(
+        LevelBundle.objects.filter(level_id=level_id)
+        .order_by('-version')
+        .values_list('version', flat=True)[settings.BUNDLE_KEEP_VERSIONS:]
+    )
+    if not stale:
+        return
+    LevelBundle.objects.filter(level_id=level_id, version__in=stale).delete()
+    transaction.on_commit(lambda: _remove_files(level_id, stale))
+
+
+def build_bundles(force=False):
+    """Rebuild the levels whose latest bundle predates the current catalog; returns the new versions."""
+    catalog = CatalogSnapshot.load()
+    built = {}
+    for level_id, catalog_version in LevelBundle.objects.order_by('level_id', '-version').values_list(
+        'level_id', 'catalog_version'
+    ):
+        built.setdefault(level_id, catalog_version)
+
+    published = []
+    for level in catalog.levels:
+        if built.get(level.id) == catalog.version and not force:
+            continue
+        bundle = build_level_bundle(level.id, catalog=catalog, force=force)
+        if bundle is not None:
+            published.append(bundle)
+    return published
+
+
+def available_patches(bundle):
+    """[(from version, patch size)] for the patches to `bundle` still on disk."""
+    patches = []
+    for previous in LevelBundle.objects.filter(level_id=bundle.level_id, version__lt=bundle.version):
+        try:
+            size = os.path.getsize(patch_path(bundle.level_id, previous.version, bundle.version))
+        except FileNotFoundError:
+            continue
+        patches.append((previous.version, size))
+    return patches
@@ -0,0 +1,313 @@
+"""
+Immutable in-process snapshot of the tutorial and coding catalog
+(Level -> Topic -> Question, CodingTopic -> CodingProblem).
+
+The whole tree is small and changes only through the admin, so each worker
+keeps a read-only copy with id/number/order indexes and serves catalog
+lookups from memory. Writes bump CatalogVersion; workers re-read that stamp
+at most every CATALOG_CHECK_INTERVAL seconds and, when it moved, build a new
+snapshot and swap the module-level reference. Readers holding the old
+snapshot keep a consistent view until they finish.
+
+When CATALOG_FILE is set, workers instead map the compiled catalog file
+(tutorials/catalog_file.py) and share its pages instead of each holding a copy.
+"""
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from rest_framework import serializers
+
+from .models import CatalogVersion, Level, Topic, Question, CodingTopic, CodingProblem
+
+logger = logging.getLogger(__name__)
+
+
+class LevelRecord(NamedTuple):
+    id: int
+    number: int
+    title: str
+    description: str
+    xp_reward: int
+    coin_reward: int
+    required_topics: int
+    topic_ids: tuple  # ordered by (order, id)
+
+
+class TopicRecord(NamedTuple):
+    id: int
+    level_id: int
+    title: str
+    explanation: str
+    video_url: Optional[str]
+    order: int
+    question_ids: tuple  # ordered by id
+
+
+class QuestionRecord(NamedTuple):
+    id: int
+    topic_id: int
+    question_type: str
+    question_text: str
+    options: object
+    correct_answer: str
+
+
+class CodingTopicRecord(NamedTuple):
+    id: int
+    name: str
+    description: str
+    created_at: str  # already rendered the way the serializers do
+    problem_ids: tuple  # ordered by sno
+
+
+class CodingProblemRecord(NamedTuple):
+    id: int
+    topic_id: int
+    sno: int
+    title: str
+    explanation: str
+    code_snippet: Optional[str]
+    video_url: Optional[str]
+    created_at: str
+
+
+_render_datetime = serializers.DateTimeField().to_representation
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class CatalogReader:
+    """
+    Lookups shared by the in-memory snapshot and the mapped catalog file.
+    Subclasses provide level(), level_by_number(), topic(), question(),
+    coding_topic(), coding_problem() and the `levels` / `coding_topics` sequences.
+    """
+    __slots__ = ()
+
+    def topics_of(self, level):
+        return tuple(self.topic(i) for i in level.topic_ids)
+
+    def questions_of(self, topic):
+        return tuple(self.question(i) for i in topic.question_ids)
+
+    def problems_of(self, coding_topic):
+        return tuple(self.coding_problem(i) for i in coding_topic.problem_ids)
+
+    # Same shapes as TopicSerializer / QuestionSerializer
+    def topic_data(self, topic):
+        return {
+            "id": topic.id,
+            "title": topic.title,
+            "explanation": topic.explanation,
+            "video_url": topic.video_url,
+            "order": topic.order,
+            "questions_count": len(topic.question_ids),
+        }
+
+    def question_data(self, question):
+        return {
+            "id": question.id,
+            "question_type": question.question_type,
+            "question_text": question.question_text,
+            "options": question.options,
+            "correct_answer": question.correct_answer,
+        }
+
+    # Same shapes as CodingTopicSerializer / CodingProblemListSerializer / CodingProblemDetailSerializer
+    def coding_topic_data(self, coding_topic):
+        return {
+            "id": coding_topic.id,
+            "name": coding_topic.name,
+            "description": coding_topic.description,
+            "created_at": coding_topic.created_at,
+        }
+
+    def coding_problem_summary(self, problem):
+        return {
+            "id": problem.id,
+            "title": problem.title,
+            "created_at": problem.created_at,
+        }
+
+    def coding_problem_data(self, problem):
+        return {
+            "id": problem.id,
+            "topic": self.coding_topic(problem.topic_id).name,
+            "sno": problem.sno,
+            "title": problem.title,
+            "explanation": problem.explanation,
+            "code_snippet": problem.code_snippet,
+            "video_url": problem.video_url,
+            "created_at": problem.created_at,
+        }
+
+
+class CatalogSnapshot(CatalogReader):
+    __slots__ = (
+        'version', 'levels', 'levels_by_id', 'levels_by_number', 'topics_by_id', 'questions_by_id',
+        'coding_topics', 'coding_topics_by_id', 'coding_problems_by_id',
+    )
+
+    def __init__(self, version, levels, topics, questions, coding_topics=(), coding_problems=()):
+        self.version = version
+        self.levels = tuple(sorted(levels, key=lambda l: l.number))
+        self.levels_by_id = MappingProxyType({l.id: l for l in levels})
+        self.levels_by_number = MappingProxyType({l.number: l for l in levels})
+        self.topics_by_id = MappingProxyType({t.id: t for t in topics})
+        self.questions_by_id = MappingProxyType({q.id: q for q in questions})
+        self.coding_topics = tuple(sorted(coding_topics, key=lambda t: t.name))
+        self.coding_topics_by_id = MappingProxyType({t.id: t for t in coding_topics})
+        self.coding_problems_by_id = MappingProxyType({p.id: p for p in coding_problems})
+
+    def level(self, level_id):
+        return self.levels_by_id.get(level_id)
+
+    def level_by_number(self, number):
+        return self.levels_by_number.get(number)
+
+    def topic(self, topic_id):
+        return self.topics_by_id.get(topic_id)
+
+    def question(self, question_id):
+        return self.questions_by_id.get(question_id)
+
+    def coding_topic(self, coding_topic_id):
+        return self.coding_topics_by_id.get(coding_topic_id)
+
+    def coding_problem(self, problem_id):
+        return self.coding_problems_by_id.get(problem_id)
+
+    @classmethod
+    def load(cls):
+        """Read the catalog and its version stamp in one transaction on the primary."""
+        db = DEFAULT_DB_ALIAS
+        with transaction.atomic(using=db):
+            version = _read_version(db)
+            question_rows = list(
+                Question.objects.using(db).order_by('id').values_list(
+                    'id', 'topic_id', 'question_type', 'question_text', 'options', 'correct_answer'
+                )
+            )
+            topic_rows = list(
+                Topic.objects.using(db).order_by('order', 'id').values_list(
+                    'id', 'level_id', 'title', 'explanation', 'video_url', 'order'
+                )
+            )
+            level_rows = list(
+                Level.objects.using(db).values_list(
+                    'id', 'number', 'title', 'description', 'xp_reward', 'coin_reward', 'required_topics'
+                )
+            )
+            problem_rows = list(
+                CodingProblem.objects.using(db).order_by('sno').values_list(
+                    'id', 'topic_id', 'sno', 'title', 'explanation', 'code_snippet', 'video_url', 'created_at'
+                )
+            )
+            coding_topic_rows = list(
+                CodingTopic.objects.using(db).values_list('id', 'name', 'description', 'created_at')
+            )
+
+        questions_of_topic = {}
+        questions = []
+        for row in question_rows:
+            question = QuestionRecord(*row[:4], _freeze(row[4]), row[5])
+            questions.append(question)
+            questions_of_topic.setdefault(question.topic_id, []).append(question.id)
+
+        topics_of_level = {}
+        topics = []
+        for row in topic_rows:
+            topic = TopicRecord(*row, tuple(questions_of_topic.get(row[0], ())))
+            topics.append(topic)
+            topics_of_level.setdefault(topic.level_id, []).append(topic.id)
+
+        levels = [LevelRecord(*row, tuple(topics_of_level.get(row[0], ()))) for row in level_rows]
+
+        problems_of_topic = {}
+        problems = []
+        for row in problem_rows:
+            problem = CodingProblemRecord(*row[:7], _render_datetime(row[7]))
+            problems.append(problem)
+            problems_of_topic.setdefault(problem.topic_id, []).append(problem.id)
+
+        coding_topics = [
+            CodingTopicRecord(*row[:3], _render_datetime(row[3]), tuple(problems_of_topic.get(row[0], ())))
+            for row in coding_topic_rows
+        ]
+        return cls(version, levels, topics, questions, coding_topics, problems)
+
+
+def _read_version(db=DEFAULT_DB_ALIAS):
+    stamp = CatalogVersion.objects.using(db).filter(pk=1).values_list('version', flat=True).first()
+    return stamp or 0
+
+
+def bump_catalog_version():
+    """Mark the catalog as changed; called from the catalog model signals."""
+    stamps = CatalogVersion.objects.filter(pk=1)
+    if not stamps.update(version=F('version') + 1):
+        try:
+            with transaction.atomic():
+                CatalogVersion.objects.create(pk=1, version=1)
+        except IntegrityError:
+            stamps.update(version=F('version') + 1)
+    # This worker shouldn't wait for the next check to see its own edit
+    transaction.on_commit(_expire_local_snapshot)
+
+
+def _expire_local_snapshot():
+    global _checked_at
+    _checked_at = 0.0
+
+
+_snapshot = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Current snapshot. Costs no queries except one stamp read per
+    CATALOG_CHECK_INTERVAL seconds, plus a rebuild when the stamp moved.
+    With CATALOG_FILE it costs one stat() per interval and no queries at all.
+    """
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < settings.CATALOG_CHECK_INTERVAL:
+        return snapshot
+
+    with _lock:
+        if _snapshot is not None and time.monotonic() - _checked_at < settings.CATALOG_CHECK_INTERVAL:
+            return _snapshot
+        if settings.CATALOG_FILE:
+            from .catalog_file import open_catalog_file
+            mapped = open_catalog_file(settings.CATALOG_FILE, current=_snapshot)
+            if mapped is not None:
+                _snapshot = mapped
+                _checked_at = time.monotonic()
+                return _snapshot
+        if _snapshot is None or not isinstance(_snapshot, CatalogSnapshot) or _read_version() != _snapshot.version:
+            _snapshot = CatalogSnapshot.load()
+            logger.info("Loaded catalog snapshot v%s", _snapshot.version)
+        _checked_at = time.monotonic()
+        return _snapshot
+
+
+def warm_catalog():
+    """Build the snapshot at worker start; a missing DB just defers it to the first request."""
+    try:
+        get_catalog()
+    except Exception:
+        logger.warning("Catalog snapshot not loaded at startup", exc_info=True)
@@ -0,0 +1,280 @@
+"""
+Compiled catalog file shared by all workers on a host through mmap.
+
+compile_catalog_file() writes the whole catalog (levels, topics, questions,
+coding topics and problems) into one binary file:
+
+    header    magic, format, section count, catalog version, compiled at
+    sections  name, index offset, entry count            (one per index)
+    indexes   (key, record offset, record length) sorted by key
+    records   compact JSON arrays, one per record
+
+Indexes are binary searched directly in the mapping and only the requested
+record is decoded, so every worker shares the same page-cache pages instead
+of holding its own copy. Each mapping memoizes the records it has decoded
+(up to DECODED_CACHE_SIZE) and the `levels` / `coding_topics` sequences, so
+hot records are parsed once per file version, not once per lookup. A new
+version is written next to the file and moved over it with os.replace();
+workers notice the new inode on their next check and map it, while requests
+still reading the old mapping finish on it.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+from django.conf import settings
+
+from javify.transactions import on_commit_once
+from .catalog import (
+    CatalogReader,
+    CatalogSnapshot,
+    LevelRecord,
+    TopicRecord,
+    QuestionRecord,
+    CodingTopicRecord,
+    CodingProblemRecord,
+    _freeze,
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'JVCATLG\0'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sHHQQ')   # magic, format, sections, catalog version, compiled at
+_SECTION = struct.Struct('<32sQQ')   # name, index offset, entries
+_ENTRY = struct.Struct('<qQI')       # key, record offset, record length
+
+DECODED_CACHE_SIZE = 4096  # decoded records kept per mapping
+
+
+class CatalogFileError(ValueError):
+    pass
+
+
+def _encode(record):
+    # MappingProxyType (frozen question options) -> dict
+    return json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=dict).encode()
+
+
+def _sections(snapshot):
+    """(name, [(key, record), ...]) for every index in the file."""
+    return [
+        ('levels', [(r.id, r) for r in snapshot.levels]),
+        ('levels.number', [(r.number, r) for r in snapshot.levels]),
+        ('topics', [(r.id, r) for r in snapshot.topics_by_id.values()]),
+        ('questions', [(r.id, r) for r in snapshot.questions_by_id.values()]),
+        ('coding_topics', [(r.id, r) for r in snapshot.coding_topics]),
+        ('coding_topics.order', list(enumerate(snapshot.coding_topics))),
+        ('coding_problems', [(r.id, r) for r in snapshot.coding_problems_by_id.values()]),
+    ]
+
+
+def _build(snapshot):
+    sections = _sections(snapshot)
+    index_start = _HEADER.size + _SECTION.size * len(sections)
+    data_start = index_start + sum(_ENTRY.size * len(entries) for _, entries in sections)
+
+    records = []            # encoded bodies, in file order
+    located = {}            # id(record) -> (offset, length); records shared by two indexes are stored once
+    offset = data_start
+    table = []
+    indexes = []
+    index_offset = index_start
+    for name, entries in sections:
+        entries.sort(key=lambda entry: entry[0])
+        table.append(_SECTION.pack(name.encode(), index_offset, len(entries)))
+        for key, record in entries:
+            if id(record) not in located:
+                body = _encode(record)
+                located[id(record)] = (offset, len(body))
+                records.append(body)
+                offset += len(body)
+            indexes.append(_ENTRY.pack(key, *located[id(record)]))
+        index_offset += _ENTRY.size * len(entries)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), snapshot.version, int(time.time()))
+    return b''.join([header, *table, *indexes, *records])
+
+
+def compile_catalog_file(path=None):
+    """
+    Write the current catalog to `path` (CATALOG_FILE by default) atomically.
+    Returns (catalog version, size in bytes).
+    """
+    path = path or settings.CATALOG_FILE
+    snapshot = CatalogSnapshot.load()
+    data = _build(snapshot)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-catalog-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    logger.info("Compiled catalog file v%s (%s bytes) to %s", snapshot.version, len(data), path)
+    return snapshot.version, len(data)
+
+
+# -----------------------------
+# Record decoding
+# -----------------------------
+def _level(values):
+    values[-1] = tuple(values[-1])
+    return LevelRecord._make(values)
+
+
+def _topic(values):
+    values[-1] = tuple(values[-1])
+    return TopicRecord._make(values)
+
+
+def _question(values):
+    values[4] = _freeze(values[4])
+    return QuestionRecord._make(values)
+
+
+def _coding_topic(values):
+    values[-1] = tuple(values[-1])
+    return CodingTopicRecord._make(values)
+
+
+def _coding_problem(values):
+    return CodingProblemRecord._make(values)
+
+
+class MappedCatalog(CatalogReader):
+    """Read-only view of a compiled catalog file; same lookups as CatalogSnapshot."""
+
+    __slots__ = ('path', 'version', 'compiled_at', 'identity', '_buf', '_sections', '_decoded', '_scanned')
+
+    def __init__(self, path):
+        with open(path, 'rb') as fh:
+            stat = os.fstat(fh.fileno())
+            if stat.st_size < _HEADER.size:
+                raise CatalogFileError(f"{path} is too short to be a catalog file")
+            self._buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._decoded = {}  # record offset -> record; the file never changes under a mapping
+        self._scanned = {}  # section -> tuple of all its records
+
+        magic, file_format, count, self.version, self.compiled_at = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or file_format != FORMAT_VERSION:
+            raise CatalogFileError(f"{path} is not a format {FORMAT_VERSION} catalog file")
+        self._sections = {}
+        for i in range(count):
+            name, index_offset, entries = _SECTION.unpack_from(self._buf, _HEADER.size + i * _SECTION.size)
+            self._sections[name.rstrip(b'\0').decode()] = (index_offset, entries)
+
+    def _record(self, offset, length, decode):
+        record = self._decoded.get(offset)
+        if record is None:
+            record = decode(json.loads(self._buf[offset:offset + length]))
+            if len(self._decoded) >= DECODED_CACHE_SIZE:
+                self._decoded.clear()
+            self._decoded[offset] = record
+        return record
+
+    def _find(self, section, key, decode):
+        index_offset, entries = self._sections.get(section, (0, 0))
+        buf, unpack, size = self._buf, _ENTRY.unpack_from, _ENTRY.size
+        lo, hi = 0, entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found, offset, length = unpack(buf, index_offset + mid * size)
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return self._record(offset, length, decode)
+        return None
+
+    def _scan(self, section, decode):
+        records = self._scanned.get(section)
+        if records is None:
+            index_offset, entries = self._sections.get(section, (0, 0))
+            index = memoryview(self._buf)[index_offset:index_offset + entries * _ENTRY.size]
+            records = tuple(self._record(offset, length, decode) for _, offset, length in _ENTRY.iter_unpack(index))
+            index.release()
+            self._scanned[section] = records
+        return records
+
+    @property
+    def levels(self):
+        return self._scan('levels.number', _level)
+
+    @property
+    def coding_topics(self):
+        return self._scan('coding_topics.order', _coding_topic)
+
+    def level(self, level_id):
+        return self._find('levels', level_id, _level)
+
+    def level_by_number(self, number):
+        return self._find('levels.number', number, _level)
+
+    def topic(self, topic_id):
+        return self._find('topics', topic_id, _topic)
+
+    def question(self, question_id):
+        return self._find('questions', question_id, _question)
+
+    def coding_topic(self, coding_topic_id):
+        return self._find('coding_topics', coding_topic_id, _coding_topic)
+
+    def coding_problem(self, problem_id):
+        return self._find('coding_problems', problem_id, _coding_problem)
+
+
+def open_catalog_file(path, current=None):
+    """
+    Map `path`, reusing `current` if it is already a mapping of the same file.
+    Returns None when the file doesn't exist (yet). A damaged file keeps the
+    current mapping in service.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    keep = current if isinstance(current, MappedCatalog) and current.path == path else None
+    if keep is not None and keep.identity == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+        return keep
+    try:
+        mapped = MappedCatalog(path)
+    except (OSError, ValueError):
+        logger.exception("Could not map catalog file %s", path)
+        return keep
+    logger.info("Mapped catalog file v%s from %s", mapped.version, path)
+    return mapped
+
+
+# -----------------------------
+# Recompile after catalog edits
+# -----------------------------
+def _compile_after_commit():
+    try:
+        compile_catalog_file()
+    except Exception:
+        logger.exception("Compiling the catalog file failed")
+
+
+def schedule_compile():
+    """Recompile CATALOG_FILE once the current transaction commits."""
+    if not settings.CATALOG_FILE or not settings.CATALOG_FILE_AUTO_COMPILE:
+        return
+    on_commit_once(_compile_after_commit)
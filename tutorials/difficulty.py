@@ -0,0 +1,147 @@
+"""
+Per-question difficulty estimation from the quiz attempt log.
+
+Attempt bitmasks are unpacked into flat NumPy arrays of (learner, question,
+correct) responses and fitted with an item response model:
+
+    P(correct) = sigmoid(a_j * (theta_u - b_j))
+
+theta_u is learner ability, b_j question difficulty and a_j discrimination
+(fixed at 1 for the Rasch model). Every iteration is a damped Fisher-scoring
+step computed for all learners and questions at once with np.bincount, so
+run time grows with the number of responses, not with Python-level loops.
+"""
+import numpy as np
+from django.utils import timezone
+
+from .models import Question, QuizAttempt
+
+ABILITY_BOUND = 6.0
+DISCRIMINATION_BOUNDS = (0.2, 4.0)
+PRIOR_PRECISION = 1.0  # N(0, 1) prior on theta and b keeps perfect scores finite
+
+
+def load_responses(since=None):
+    """
+    Return (person, item, correct, question_ids) arrays.
+    `person` and `item` are dense indexes; question_ids[item] is the Question id.
+    Each attempt's bits go to the questions it graded (QuizAttempt.question_ids);
+    questions deleted since are left out.
+    """
+    question_ids = np.array(Question.objects.order_by('topic_id', 'id').values_list('id', flat=True), dtype=np.int64)
+    item_index = {qid: i for i, qid in enumerate(question_ids.tolist())}
+
+    # Attempts that graded the same questions in the same order unpack together
+    groups = {}
+    attempts = QuizAttempt.objects.all()
+    if since:
+        attempts = attempts.filter(submitted_at__gte=since)
+    for user_id, graded, mask in attempts.values_list('user_id', 'question_ids', 'result_mask').iterator():
+        if graded:
+            groups.setdefault(tuple(graded), []).append((user_id, mask))
+
+    users, items, answers = [], [], []
+    for graded, rows in groups.items():
+        columns = [i for i, qid in enumerate(graded) if qid in item_index]
+        if not columns:
+            continue
+
+        total = len(graded)
+        width = (total + 7) // 8
+        user_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        masks = np.frombuffer(b''.join(bytes(r[1]).ljust(width, b'\0') for r in rows), dtype=np.uint8)
+        bits = np.unpackbits(masks.reshape(len(rows), width), axis=1, bitorder='little')[:, columns]
+
+        users.append(np.repeat(user_ids, len(columns)))
+        items.append(np.tile(np.array([item_index[graded[i]] for i in columns], dtype=np.int64), len(rows)))
+        answers.append(bits.ravel())
+
+    if not users:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64), question_ids
+
+    _, person = np.unique(np.concatenate(users), return_inverse=True)
+    return person, np.concatenate(items), np.concatenate(answers).astype(np.float64), question_ids
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def fit_irt(person, item, correct, n_items, model='2pl', iterations=15, tol=1e-3):
+    """Fit the model; returns (difficulty, discrimination, ability) arrays."""
+    n_persons = int(person.max()) + 1 if person.size else 0
+    theta = np.zeros(n_persons)
+    b = np.zeros(n_items)
+    a = np.ones(n_items)
+
+    # Start difficulties from the logit of each question's miss rate
+    seen = np.bincount(item, minlength=n_items)
+    right = np.bincount(item, weights=correct, minlength=n_items)
+    rate = np.clip((right + 0.5) / (seen + 1.0), 0.01, 0.99)
+    b = np.log((1 - rate) / rate)
+
+    for _ in range(iterations):
+        # Abilities, holding item parameters fixed
+        a_item = a[item]
+        p = _sigmoid(a_item * (theta[person] - b[item]))
+        grad = np.bincount(person, weights=(correct - p) * a_item, minlength=n_persons) - PRIOR_PRECISION * theta
+        info = np.bincount(person, weights=p * (1.0 - p) * a_item * a_item, minlength=n_persons) + PRIOR_PRECISION
+        theta = np.clip(theta + grad / info, -ABILITY_BOUND, ABILITY_BOUND)
+        theta -= theta.mean()
+        if model == '2pl':
+            # Fix the ability scale, otherwise a and theta trade off and drift
+            theta /= max(theta.std(), 1e-6)
+
+        # Item parameters, holding abilities fixed
+        diff = theta[person] - b[item]
+        p = _sigmoid(a_item * diff)
+        residual = correct - p
+        weight = p * (1.0 - p)
+
+        grad = -np.bincount(item, weights=residual * a_item, minlength=n_items) - PRIOR_PRECISION * b
+        info = np.bincount(item, weights=weight * a_item * a_item, minlength=n_items) + PRIOR_PRECISION
+        step = grad / info
+        b = np.clip(b + step, -ABILITY_BOUND, ABILITY_BOUND)
+
+        # Discriminations (2PL only), shrunk towards 1
+        if model == '2pl':
+            grad = np.bincount(item, weights=residual * diff, minlength=n_items) - PRIOR_PRECISION * (a - 1.0)
+            info = np.bincount(item, weights=weight * diff * diff, minlength=n_items) + PRIOR_PRECISION
+            a = np.clip(a + grad / info, *DISCRIMINATION_BOUNDS)
+
+        if np.abs(step).max(initial=0.0) < tol:
+            break
+
+    return b, a, theta
+
+
+def estimate_question_difficulty(model='2pl', iterations=15, min_responses=20, since=None):
+    """
+    Fit the attempt log and store difficulty/discrimination on Question.
+    Questions with fewer than `min_responses` responses are left untouched.
+    Returns the number of questions updated.
+    """
+    person, item, correct, question_ids = load_responses(since=since)
+    if not item.size:
+        return 0
+
+    difficulty, discrimination, _ = fit_irt(
+        person, item, correct, len(question_ids), model=model, iterations=iterations
+    )
+    responses = np.bincount(item, minlength=len(question_ids))
+    keep = np.flatnonzero(responses >= min_responses)
+
+    now = timezone.now()
+    fitted = {
+        int(question_ids[i]): (round(float(difficulty[i]), 4), round(float(discrimination[i]), 4))
+        for i in keep
+    }
+    questions = list(Question.objects.filter(id__in=fitted).only('id'))
+    for question in questions:
+        question.difficulty, question.discrimination = fitted[question.id]
+        question.difficulty_updated_at = now
+    Question.objects.bulk_update(
+        questions, ['difficulty', 'discrimination', 'difficulty_updated_at'], batch_size=500
+    )
+    return len(questions)
@@ -0,0 +1,220 @@
+"""
+Streaming exports of learner progress for analytics.
+
+Rows are read in keyset-paginated batches (pk > last_pk ... LIMIT n) with the
+user/topic/level columns joined in SQL, then encoded one batch at a time.
+Memory stays flat no matter how many rows match, including on MySQL where the
+driver would otherwise buffer a whole result set client-side. Dedicated user
+shards are exported after "default", with joined columns looked up per batch.
+"""
+import csv
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+from javify.sharding import user_shards
+
+from .models import UserProgress, UserLevelCompletion
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_KINDS = {
+    'progress': (
+        UserProgress,
+        'topic__level__number',
+        [
+            ('id', 'id'),
+            ('user_id', 'user_id'),
+            ('username', 'user__username'),
+            ('email', 'user__email'),
+            ('level_id', 'topic__level_id'),
+            ('level_number', 'topic__level__number'),
+            ('level_title', 'topic__level__title'),
+            ('topic_id', 'topic_id'),
+            ('topic_title', 'topic__title'),
+            ('completed', 'completed'),
+            ('correct_answers', 'correct_answers'),
+            ('total_questions', 'total_questions'),
+            ('date_completed', 'date_completed'),
+        ],
+    ),
+    'levels': (
+        UserLevelCompletion,
+        'level__number',
+        [
+            ('id', 'id'),
+            ('user_id', 'user_id'),
+            ('username', 'user__username'),
+            ('email', 'user__email'),
+            ('level_id', 'level_id'),
+            ('level_number', 'level__number'),
+            ('level_title', 'level__title'),
+            ('date_completed', 'date_completed'),
+        ],
+    ),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def export_rows(kind, date_from=None, date_to=None, level=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Return (column_names, row_iterator) for an export.
+    `date_from` / `date_to` filter on date_completed (inclusive dates),
+    `level` is a level number.
+    """
+    model, level_lookup, columns = EXPORT_KINDS[kind]
+    names = [name for name, _ in columns]
+    sources = [source for _, source in columns]
+
+    filters = {}
+    if date_from:
+        filters['date_completed__date__gte'] = date_from
+    if date_to:
+        filters['date_completed__date__lte'] = date_to
+    if level is not None:
+        filters[level_lookup] = level
+
+    def rows():
+        for alias in user_shards():
+            if alias == DEFAULT_DB_ALIAS:
+                queryset = model.objects.using(alias).filter(**filters)
+                yield from _iter_batches(queryset, sources, chunk_size)
+            else:
+                yield from _iter_shard(model, alias, filters, sources, chunk_size)
+
+    return names, rows()
+
+
+def _iter_batches(queryset, sources, chunk_size):
+    """Keyset-paginate a values_list query; sources[0] must be the pk."""
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk').values_list(*sources)[:chunk_size]
+        )
+        if not batch:
+            return
+        yield from batch
+        last_pk = batch[-1][0]
+
+
+def _split_lookup(model, lookup):
+    """'topic__level__number' -> (topic field, 'level__number'); (None, lookup) if local."""
+    head, _, rest = lookup.partition('__')
+    field = model._meta.get_field(head)
+    if rest and field.is_relation:
+        return field, rest
+    return None, lookup
+
+
+def _iter_shard(model, alias, filters, sources, chunk_size):
+    """
+    Same rows from a dedicated user shard, where user/catalog tables don't
+    exist: fetch local columns, then fill the joined ones from "default"
+    with one lookup per related model per batch.
+    """
+    local_filters = {}
+    for lookup, value in filters.items():
+        field, rest = _split_lookup(model, lookup)
+        if field is None:
+            local_filters[lookup] = value
+        else:
+            ids = field.related_model.objects.filter(**{rest: value}).values_list('pk', flat=True)
+            local_filters[f'{field.attname}__in'] = list(ids)
+
+    plan = []          # per column: (FK field or None, column name)
+    local_columns = []
+    for source in sources:
+        field, rest = _split_lookup(model, source)
+        if field is None:
+            plan.append((None, source))
+            local_columns.append(source)
+        else:
+            plan.append((field, rest))
+            local_columns.append(field.attname)
+    local_columns = list(dict.fromkeys(local_columns))
+    position = {column: i for i, column in enumerate(local_columns)}
+
+    related = {}
+    for field, rest in plan:
+        if field is not None:
+            related.setdefault(field, []).append(rest)
+
+    queryset = model.objects.using(alias).filter(**local_filters)
+    batch = []
+    for row in _iter_batches(queryset, local_columns, chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield from _resolve(batch, plan, position, related)
+            batch = []
+    if batch:
+        yield from _resolve(batch, plan, position, related)
+
+
+def _resolve(batch, plan, position, related):
+    lookups = {}
+    for field, columns in related.items():
+        ids = {row[position[field.attname]] for row in batch}
+        lookups[field] = {
+            values[0]: dict(zip(columns, values[1:]))
+            for values in field.related_model.objects.filter(pk__in=ids).values_list('pk', *columns)
+        }
+    for row in batch:
+        out = []
+        for field, column in plan:
+            if field is None:
+                out.append(row[position[column]])
+            else:
+                match = lookups[field].get(row[position[field.attname]], {})
+                out.append(match.get(column))
+        yield tuple(out)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(names, rows, batch_size=500):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(names)
+    batch = []
+    for row in rows:
+        batch.append(writer.writerow([_csv_value(v) for v in row]))
+        if len(batch) >= batch_size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def iter_jsonl(names, rows, batch_size=500):
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n')
+        if len(batch) >= batch_size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def iter_export(output, names, rows):
+    """Encode rows in the requested output format ('csv' or 'jsonl')."""
+    if output == 'jsonl':
+        return iter_jsonl(names, rows)
+    return iter_csv(names, rows)
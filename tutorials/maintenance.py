@@ -0,0 +1,33 @@
+"""Periodic rollups, bundle builds and cleanup for tutorials (see javify/scheduler.py)."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from javify.scheduler import delete_in_batches, periodic
+from javify.sharding import user_shards
+from .analytics import rollup_quiz_attempts
+from .bundles import build_bundles
+from .models import SyncTombstone
+
+
+@periodic(every=timedelta(minutes=5))
+def rollup_attempts():
+    """Fold new quiz attempts into the per-day topic and question stats."""
+    return rollup_quiz_attempts(max_batches=settings.SCHEDULER_MAX_BATCHES)
+
+
+@periodic(every=timedelta(minutes=10))
+def build_level_bundles():
+    """Publish new offline bundles for levels edited since their last bundle."""
+    return len(build_bundles())
+
+
+@periodic(every=timedelta(hours=6))
+def prune_sync_tombstones():
+    """Deletions older than SYNC_TOMBSTONE_RETENTION_DAYS; tokens that old get a full sync."""
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    return sum(
+        delete_in_batches(SyncTombstone.objects.using(alias).filter(deleted_at__lt=cutoff))
+        for alias in user_shards()
+    )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tutorials.bundles import build_bundles, build_level_bundle
+from tutorials.models import Level
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the offline bundles of the levels whose content changed since "
+        "their last bundle, with patches from the kept earlier versions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--level', type=int, help="Level number; default all levels.")
+        parser.add_argument('--force', action='store_true', help="Publish a new version even if nothing changed.")
+
+    def handle(self, *args, **options):
+        if options['level'] is not None:
+            level = Level.objects.filter(number=options['level']).first()
+            if level is None:
+                raise CommandError(f"No level {options['level']}.")
+            bundle = build_level_bundle(level.id, force=options['force'])
+            bundles = [bundle] if bundle else []
+        else:
+            bundles = build_bundles(force=options['force'])
+        for bundle in bundles:
+            self.stdout.write(
+                f"Level {bundle.level_id} v{bundle.version}: {bundle.size} bytes, {bundle.compressed_size} compressed"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Published {len(bundles)} bundles."))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tutorials.catalog_file import compile_catalog_file
+
+
+class Command(BaseCommand):
+    help = "Compile the tutorial and coding catalog into the memory-mapped CATALOG_FILE."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Write here instead of CATALOG_FILE.")
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.CATALOG_FILE
+        if not path:
+            raise CommandError("Set CATALOG_FILE or pass --output.")
+        version, size = compile_catalog_file(path)
+        self.stdout.write(self.style.SUCCESS(f"Catalog v{version} written to {path} ({size} bytes)."))
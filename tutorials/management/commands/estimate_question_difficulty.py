@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+from tutorials.difficulty import estimate_question_difficulty
+
+
+class Command(BaseCommand):
+    help = "Estimate per-question difficulty/discrimination from quiz attempts (IRT fit)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['2pl', 'rasch'], default='2pl')
+        parser.add_argument('--iterations', type=int, default=15)
+        parser.add_argument('--min-responses', type=int, default=20)
+        parser.add_argument('--since', help="Only use attempts submitted after this ISO datetime")
+
+    def handle(self, *args, **options):
+        since = parse_datetime(options['since']) if options['since'] else None
+        started = time.perf_counter()
+        updated = estimate_question_difficulty(
+            model=options['model'],
+            iterations=options['iterations'],
+            min_responses=options['min_responses'],
+            since=since,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated difficulty for {updated} questions in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tutorials.exports import EXPORT_KINDS, EXPORT_FORMATS, export_rows, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream user progress or level completions as CSV/JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(EXPORT_KINDS), default='progress')
+        parser.add_argument('--format', dest='output', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--from', dest='date_from', help="date_completed on or after YYYY-MM-DD")
+        parser.add_argument('--to', dest='date_to', help="date_completed on or before YYYY-MM-DD")
+        parser.add_argument('--level', type=int, help="Only this level number")
+        parser.add_argument('--output', '-o', dest='path', help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        date_from = self._date(options['date_from'])
+        date_to = self._date(options['date_to'])
+        names, rows = export_rows(
+            options['kind'], date_from=date_from, date_to=date_to, level=options['level']
+        )
+
+        out = open(options['path'], 'w', newline='', encoding='utf-8') if options['path'] else sys.stdout
+        try:
+            for chunk in iter_export(options['output'], names, rows):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    @staticmethod
+    def _date(value):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f"Invalid date: {value}")
+        return parsed
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tutorials.analytics import rollup_quiz_attempts
+
+
+class Command(BaseCommand):
+    help = "Fold new quiz attempts into the per topic/day and per question/day rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--max-batches', type=int, default=None)
+
+    def handle(self, *args, **options):
+        processed = rollup_quiz_attempts(
+            batch_size=options['batch_size'], max_batches=options['max_batches']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {processed} quiz attempts."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0006_per_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LevelBundle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('compressed_size', models.BigIntegerField()),
+                ('catalog_version', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bundles', to='tutorials.level')),
+            ],
+            options={
+                'ordering': ['level', '-version'],
+                'unique_together': {('level', 'version')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+def backfill_question_ids(apps, schema_editor):
+    # Best guess for the attempts logged so far: the topic's current
+    # questions by id, where the count still matches
+    Question = apps.get_model('tutorials', 'Question')
+    QuizAttempt = apps.get_model('tutorials', 'QuizAttempt')
+    by_topic = {}
+    for topic_id, question_id in Question.objects.order_by('topic_id', 'id').values_list('topic_id', 'id'):
+        by_topic.setdefault(topic_id, []).append(question_id)
+    for topic_id, question_ids in by_topic.items():
+        QuizAttempt.objects.filter(topic_id=topic_id, total_questions=len(question_ids)).update(
+            question_ids=question_ids
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0008_synctombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_question_ids, migrations.RunPython.noop),
+    ]
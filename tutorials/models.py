@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
+from javify.sharding import UserShardedManager
 
 # --- Level Model ---
 class Level(models.Model):
@@ -17,8 +18,9 @@ class Level(models.Model):
 
     def is_completed_by(self, user):
         """Check if user completed all topics in this level."""
-        completed_count = UserProgress.objects.filter(
-            user=user, topic__level=self, completed=True
+        topic_ids = list(self.topics.values_list('id', flat=True))
+        completed_count = UserProgress.objects.for_user(user).filter(
+            user=user, topic_id__in=topic_ids, completed=True
         ).count()
         return completed_count >= self.required_topics
 
@@ -47,6 +49,10 @@ class Question(models.Model):
     question_text = models.TextField()
     options = models.JSONField(blank=True, null=True)
     correct_answer = models.TextField()
+    # Filled in by the estimate_question_difficulty job (IRT fit over QuizAttempt)
+    difficulty = models.FloatField(blank=True, null=True, db_index=True, editable=False)
+    discrimination = models.FloatField(blank=True, null=True, editable=False)
+    difficulty_updated_at = models.DateTimeField(blank=True, null=True, editable=False)
 
     def __str__(self):
         return f"{self.question_text[:50]}... ({self.question_type})"
@@ -81,16 +87,22 @@ class CodingProblem(models.Model):
 
 
 # --- User Progress ---
+# Per-user rows may live on a user shard (javify/sharding.py), so their
+# foreign keys carry no DB constraint and queries must not join across them.
 class UserProgress(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, db_constraint=False)
     completed = models.BooleanField(default=False)
     correct_answers = models.IntegerField(default=0)
     total_questions = models.IntegerField(default=0)
     date_completed = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)  # for delta sync
+
+    objects = UserShardedManager()
 
     class Meta:
         unique_together = ('user', 'topic')
+        indexes = [models.Index(fields=['user', 'updated_at'])]
 
     def mark_completed(self):
         self.completed = True
@@ -100,12 +112,145 @@ class UserProgress(models.Model):
 
 # --- Track Level Completion ---
 class UserLevelCompletion(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='completed_levels')
-    level = models.ForeignKey(Level, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='completed_levels', db_constraint=False)
+    level = models.ForeignKey(Level, on_delete=models.CASCADE, db_constraint=False)
     date_completed = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # for delta sync
+
+    objects = UserShardedManager()
 
     class Meta:
         unique_together = ('user', 'level')
+        indexes = [models.Index(fields=['user', 'updated_at'])]
 
     def __str__(self):
         return f"{self.user.username} - Level {self.level.number} completed"
+
+
+# --- Deleted per-user rows, for delta sync ---
+class SyncTombstone(models.Model):
+    """
+    A deleted UserProgress or UserLevelCompletion row, so delta syncs
+    (tutorials/sync.py) can tell clients to drop it. Kept for
+    SYNC_TOMBSTONE_RETENTION_DAYS; older sync tokens get a full sync.
+    """
+    PROGRESS = 'progress'
+    LEVEL_COMPLETION = 'level_completion'
+    KIND_CHOICES = [
+        (PROGRESS, 'Topic progress'),
+        (LEVEL_COMPLETION, 'Level completion'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_constraint=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()  # topic_id / level_id
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = UserShardedManager()
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'deleted_at'])]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.kind} {self.object_id} deleted"
+
+
+# --- Quiz Attempt Log (append-only) ---
+class QuizAttempt(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_attempts')
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='attempts')
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    correct_answers = models.IntegerField(default=0)
+    total_questions = models.IntegerField(default=0)
+    passed = models.BooleanField(default=False)
+    # Ids of the questions graded, in the order they were graded. Bit i
+    # (little-endian) of result_mask is set when question_ids[i] was
+    # answered correctly. Empty for old attempts whose questions are unknown.
+    question_ids = models.JSONField(default=list, blank=True)
+    result_mask = models.BinaryField(default=b'')
+
+    class Meta:
+        indexes = [models.Index(fields=['topic', 'submitted_at'])]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.topic.title}: {self.correct_answers}/{self.total_questions}"
+
+    @staticmethod
+    def encode_mask(results):
+        """Pack a list of booleans into bytes, one bit per question."""
+        mask = bytearray((len(results) + 7) // 8)
+        for i, correct in enumerate(results):
+            if correct:
+                mask[i // 8] |= 1 << (i % 8)
+        return bytes(mask)
+
+    @staticmethod
+    def decode_mask(mask, total_questions):
+        mask = bytes(mask)
+        return [bool(mask[i // 8] >> (i % 8) & 1) for i in range(total_questions)]
+
+
+# --- Quiz Analytics Rollups ---
+class TopicDailyStats(models.Model):
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    attempts = models.PositiveIntegerField(default=0)
+    passes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('topic', 'day')
+
+
+class QuestionDailyStats(models.Model):
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    attempts = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('question', 'day')
+
+
+class RollupCursor(models.Model):
+    """High-water mark of the last source row folded into a rollup."""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+# --- Catalog Version Stamp ---
+class CatalogVersion(models.Model):
+    """
+    Single-row counter bumped whenever a Level, Topic or Question changes.
+    Workers compare it with their in-memory catalog (tutorials/catalog.py).
+    """
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+
+# --- Offline Level Bundles ---
+class LevelBundle(models.Model):
+    """
+    One published version of a level's offline bundle (tutorials/bundles.py).
+    The archive and the patches from earlier versions live under BUNDLE_ROOT.
+    """
+    level = models.ForeignKey(Level, on_delete=models.CASCADE, related_name='bundles')
+    version = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)  # of the uncompressed archive
+    size = models.BigIntegerField()
+    compressed_size = models.BigIntegerField()
+    catalog_version = models.BigIntegerField()  # catalog the bundle was built from
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['level', '-version']
+        unique_together = ('level', 'version')
+
+    def __str__(self):
+        return f"Level {self.level_id} bundle v{self.version}"
@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from javify.sharding import dedicated_shards, shard_for_user
+from javify.uploads import register_editor_html
+from userauth.models import UserStateVersion
+from .models import (
+    Level, Topic, Question, CodingTopic, CodingProblem, UserProgress, UserLevelCompletion, SyncTombstone,
+)
+from .catalog import bump_catalog_version
+from .catalog_file import schedule_compile
+
+
+# -----------------------------
+# Cascades onto user shards
+# -----------------------------
+# Django's collector only cascades within the database of the deleted row,
+# so rows on dedicated user shards are removed here.
+@receiver(post_delete, sender=User)
+def delete_user_progress_on_shard(sender, instance, **kwargs):
+    alias = shard_for_user(instance)
+    if alias in dedicated_shards():
+        UserProgress.objects.using(alias).filter(user_id=instance.pk).delete()
+        UserLevelCompletion.objects.using(alias).filter(user_id=instance.pk).delete()
+    # Including the tombstones those deletes (or, on "default", the
+    # collector's cascade) just recorded
+    SyncTombstone.objects.using(alias).filter(user_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Topic)
+def delete_topic_progress_on_shards(sender, instance, **kwargs):
+    for alias in dedicated_shards():
+        UserProgress.objects.using(alias).filter(topic_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Level)
+def delete_level_completions_on_shards(sender, instance, **kwargs):
+    for alias in dedicated_shards():
+        UserLevelCompletion.objects.using(alias).filter(level_id=instance.pk).delete()
+
+
+# -----------------------------
+# Editor images -> resized variants
+# -----------------------------
+register_editor_html(Topic, 'explanation')
+register_editor_html(CodingProblem, 'explanation')
+
+
+# -----------------------------
+# Catalog snapshot invalidation
+# -----------------------------
+@receiver(post_save, sender=Level)
+@receiver(post_save, sender=Topic)
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=CodingTopic)
+@receiver(post_save, sender=CodingProblem)
+@receiver(post_delete, sender=Level)
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=CodingTopic)
+@receiver(post_delete, sender=CodingProblem)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+    schedule_compile()
+
+
+# -----------------------------
+# Per-user state version
+# -----------------------------
+@receiver(post_save, sender=UserProgress)
+@receiver(post_save, sender=UserLevelCompletion)
+def user_state_saved(sender, instance, **kwargs):
+    UserStateVersion.bump(instance.user_id)
+
+
+@receiver(post_delete, sender=UserProgress)
+@receiver(post_delete, sender=UserLevelCompletion)
+def user_state_deleted(sender, instance, **kwargs):
+    UserStateVersion.bump(instance.user_id, create=False)
+    # Delta syncs report deletions from these; written next to the deleted
+    # row, i.e. on the user's shard
+    tombstones = SyncTombstone.objects.using(kwargs['using'])
+    if sender is UserProgress:
+        tombstones.create(user_id=instance.user_id, kind=SyncTombstone.PROGRESS, object_id=instance.topic_id)
+    else:
+        tombstones.create(user_id=instance.user_id, kind=SyncTombstone.LEVEL_COMPLETION, object_id=instance.level_id)
@@ -0,0 +1,72 @@
+"""
+Delta sync of a learner's own state (profile, topic progress, level completions).
+
+Each sync returns a token; passing it back as ?since=<token> returns only
+rows whose updated_at is at or after it, read through the (user, updated_at)
+indexes. The token is the server time the sync started, moved back by
+SYNC_TOKEN_SKEW seconds so rows written by transactions that were still in
+flight are picked up by the next sync. Rows can therefore be sent twice;
+clients upsert them by topic_id / level_id.
+
+Deleted rows leave a SyncTombstone, returned as the topic / level ids to drop.
+Clients apply those before the upserts. Tombstones are kept for
+SYNC_TOMBSTONE_RETENTION_DAYS, so an older token gets a full sync instead,
+after which the client replaces its state.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from userauth.models import Profile
+
+from .models import SyncTombstone, UserProgress, UserLevelCompletion
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def make_token(moment):
+    return str((moment - _EPOCH) // timedelta(microseconds=1))
+
+
+def parse_token(token):
+    """Datetime for a sync token; ValueError if it isn't one."""
+    micros = int(token)
+    if micros < 0:
+        raise ValueError(token)
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def changes_since(user, since, progress_columns):
+    """
+    Rows of `user` changed at or after `since` (everything when None), plus the
+    token for the next sync: (token, full, profile or None, progress rows,
+    completion rows, {kind: [ids deleted]}). `full` is True when everything was
+    returned, either because `since` was None or it predates the tombstones.
+    """
+    now = timezone.now()
+    token = make_token(now - timedelta(seconds=settings.SYNC_TOKEN_SKEW))
+    if since is not None and since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        since = None
+
+    profiles = Profile.objects.for_user(user).filter(user=user)
+    progress = UserProgress.objects.for_user(user).filter(user=user)
+    completions = UserLevelCompletion.objects.for_user(user).filter(user=user)
+    deleted = {SyncTombstone.PROGRESS: [], SyncTombstone.LEVEL_COMPLETION: []}
+    if since is not None:
+        profiles = profiles.filter(updated_at__gte=since)
+        progress = progress.filter(updated_at__gte=since)
+        completions = completions.filter(updated_at__gte=since)
+        tombstones = SyncTombstone.objects.for_user(user).filter(user=user, deleted_at__gte=since)
+        for kind, object_id in tombstones.order_by('deleted_at').values_list('kind', 'object_id'):
+            if object_id not in deleted[kind]:
+                deleted[kind].append(object_id)
+
+    return (
+        token,
+        since is None,
+        profiles.first(),
+        list(progress.order_by('updated_at').values_list(*progress_columns)),
+        list(completions.order_by('updated_at').values_list('level_id', 'date_completed')),
+        deleted,
+    )
@@ -1,3 +1,448 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import router
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from javify.db_routers import PIN_COOKIE, ReadYourWritesMiddleware, ReplicaReadMixin, pin_to_primary
+from javify.delta import DeltaError, apply_delta, make_delta
+from javify.ranges import RangeNotSatisfiable, parse_range
+from javify.sharding import shard_for_user_id
+from userauth.models import Profile
+from .analytics import rollup_quiz_attempts
+from .bundles import archive_path, build_level_bundle
+from .catalog import CatalogSnapshot
+from .difficulty import fit_irt, load_responses
+from .catalog_file import CatalogFileError, MappedCatalog, compile_catalog_file, open_catalog_file
+from .models import (
+    Level, Topic, Question, CodingTopic, CodingProblem, UserProgress, UserLevelCompletion, SyncTombstone,
+    QuizAttempt, QuestionDailyStats, TopicDailyStats,
+)
+
+
+def create_user_on(alias, username):
+    """A user whose rows hash to the shard `alias`."""
+    user_id = next(pk for pk in range(1000, 2000) if shard_for_user_id(pk) == alias)
+    return User.objects.create_user(username, id=user_id)
+
+
+# -----------------------------
+# Delta sync
+# -----------------------------
+@override_settings(USER_SHARDS=['default'])
+class UserSyncDeletionTests(TestCase):
+    databases = '__all__'
+    shard = 'default'
+
+    def setUp(self):
+        self.user = create_user_on(self.shard, 'learner')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.level = Level.objects.create(number=1, title='Basics')
+        self.topics = [Topic.objects.create(level=self.level, title=f'Topic {i}', order=i) for i in range(2)]
+        for topic in self.topics:
+            UserProgress.objects.for_user(self.user).create(user=self.user, topic=topic, completed=True)
+        UserLevelCompletion.objects.for_user(self.user).create(user=self.user, level=self.level)
+        self.token = self.client.get('/user/sync/').json()['token']
+
+    def sync(self):
+        response = self.client.get(f'/user/sync/?since={self.token}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_deleted_rows_are_reported(self):
+        UserProgress.objects.for_user(self.user).get(user=self.user, topic=self.topics[0]).delete()
+        UserLevelCompletion.objects.for_user(self.user).filter(user=self.user).delete()
+
+        data = self.sync()
+        self.assertFalse(data['full'])
+        self.assertEqual(data['deleted'], {'progress': [self.topics[0].id], 'level_completions': [self.level.id]})
+
+    def test_cascaded_deletes_are_reported(self):
+        topic_id = self.topics[1].id
+        self.topics[1].delete()
+
+        self.assertEqual(self.sync()['deleted']['progress'], [topic_id])
+
+    def test_tombstones_live_on_the_users_shard(self):
+        self.topics[0].delete()
+
+        self.assertEqual(SyncTombstone.objects.using(self.shard).filter(user=self.user).count(), 1)
+        for alias in {'default', 'test_shard'} - {self.shard}:
+            self.assertFalse(SyncTombstone.objects.using(alias).exists())
+
+    def test_deleting_the_user_drops_its_tombstones(self):
+        self.topics[0].delete()
+        self.user.delete()
+
+        self.assertFalse(SyncTombstone.objects.using(self.shard).exists())
+
+
+@override_settings(USER_SHARDS=['default', 'test_shard'])
+class ShardedUserSyncDeletionTests(UserSyncDeletionTests):
+    shard = 'test_shard'
+
+
+# -----------------------------
+# Quiz analytics
+# -----------------------------
+@override_settings(ROLLUP_SETTLE_SECONDS=0)
+class QuizRollupTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        with self.captureOnCommitCallbacks(execute=True):
+            level = Level.objects.create(number=1, title='Basics')
+            self.topic = Topic.objects.create(level=level, title='Variables')
+            self.questions = [
+                Question.objects.create(topic=self.topic, question_type='FILL', question_text=f'Q{i}', correct_answer='a')
+                for i in range(2)
+            ]
+
+    def attempt(self, questions, results):
+        return QuizAttempt.objects.create(
+            user=self.user,
+            topic=self.topic,
+            correct_answers=sum(results),
+            total_questions=len(results),
+            passed=all(results),
+            question_ids=[q.id for q in questions],
+            result_mask=QuizAttempt.encode_mask(results),
+        )
+
+    def misses(self):
+        return dict(QuestionDailyStats.objects.values_list('question__question_text', 'misses'))
+
+    def test_submissions_record_the_graded_questions(self):
+        Profile.objects.for_user(self.user).create(user=self.user)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post(f'/topics/{self.topic.id}/submit/', {'answers': {str(self.questions[0].id): 'a'}}, format='json')
+
+        attempt = QuizAttempt.objects.get()
+        self.assertEqual(attempt.question_ids, [q.id for q in self.questions])
+        self.assertEqual(QuizAttempt.decode_mask(attempt.result_mask, 2), [True, False])
+
+    def test_replaced_questions_keep_their_own_answers(self):
+        self.attempt(self.questions, [True, False])
+        # Same number of questions, but Q1 is replaced by Q2
+        self.questions[1].delete()
+        replacement = Question.objects.create(topic=self.topic, question_type='FILL', question_text='Q2', correct_answer='a')
+        self.attempt([self.questions[0], replacement], [False, True])
+
+        self.assertEqual(rollup_quiz_attempts(), 2)
+        self.assertEqual(TopicDailyStats.objects.get().attempts, 2)
+        self.assertEqual(self.misses(), {'Q0': 1, 'Q2': 0})
+
+    def test_reordered_questions_keep_their_own_answers(self):
+        self.attempt(self.questions[::-1], [True, False])
+
+        rollup_quiz_attempts()
+        self.assertEqual(self.misses(), {'Q0': 1, 'Q1': 0})
+
+
+# -----------------------------
+# Question difficulty
+# -----------------------------
+class FitIRTTests(SimpleTestCase):
+    difficulty = np.linspace(-2.0, 2.0, 20)
+
+    def simulate(self, learners=1000):
+        """Responses drawn from the Rasch model with the class's difficulties."""
+        rng = np.random.default_rng(7)
+        ability = rng.normal(size=learners)
+        person = np.repeat(np.arange(learners), len(self.difficulty))
+        item = np.tile(np.arange(len(self.difficulty)), learners)
+        p = 1.0 / (1.0 + np.exp(-(ability[person] - self.difficulty[item])))
+        return person, item, (rng.random(p.size) < p).astype(np.float64)
+
+    def test_recovers_difficulties(self):
+        person, item, correct = self.simulate()
+        for model in ('rasch', '2pl'):
+            b, a, theta = fit_irt(person, item, correct, len(self.difficulty), model=model, iterations=50)
+            self.assertGreater(np.corrcoef(b, self.difficulty)[0, 1], 0.98)
+            # The data has discrimination 1 throughout
+            self.assertTrue(((a > 0.5) & (a < 2.0)).all())
+            self.assertTrue(np.isfinite(theta).all())
+
+    def test_converges(self):
+        person, item, correct = self.simulate()
+        for model in ('rasch', '2pl'):
+            b, a, _ = fit_irt(person, item, correct, len(self.difficulty), model=model, iterations=50)
+            b_more, a_more, _ = fit_irt(
+                person, item, correct, len(self.difficulty), model=model, iterations=200, tol=1e-9
+            )
+            np.testing.assert_allclose(b, b_more, atol=1e-2)
+            np.testing.assert_allclose(a, a_more, atol=1e-2)
+
+
+class LoadResponsesTests(TestCase):
+    def test_answers_go_to_the_graded_questions(self):
+        user = User.objects.create_user('learner')
+        topic = Topic.objects.create(level=Level.objects.create(number=1, title='Basics'), title='Variables')
+        q0, q1, q2 = [
+            Question.objects.create(topic=topic, question_type='FILL', question_text=f'Q{i}', correct_answer='a')
+            for i in range(3)
+        ]
+        for graded, results in (([q1, q0], [True, False]), ([q2, q1, q0], [False, True, True])):
+            QuizAttempt.objects.create(
+                user=user, topic=topic, total_questions=len(graded),
+                question_ids=[q.id for q in graded], result_mask=QuizAttempt.encode_mask(results),
+            )
+        q2.delete()
+
+        person, item, correct, question_ids = load_responses()
+        answered = sorted(zip(question_ids[item].tolist(), correct.tolist()))
+        self.assertEqual(answered, [(q0.id, 0.0), (q0.id, 1.0), (q1.id, 1.0), (q1.id, 1.0)])
+
+
+# -----------------------------
+# Replica routing
+# -----------------------------
+class ReadAliasView(ReplicaReadMixin, APIView):
+    """Answers with the database catalog reads would use."""
+
+    def get(self, request):
+        if 'fail' in request.query_params:
+            raise RuntimeError("handler failed")
+        return Response({'alias': router.db_for_read(Level)})
+
+    post = get
+
+
+@mock.patch('javify.db_routers.replica_configured', return_value=True)
+class ReplicaReadMixinTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader')
+        self.factory = APIRequestFactory()
+
+    def read_alias(self, request):
+        force_authenticate(request, self.user)
+        return ReadAliasView.as_view()(request).data['alias']
+
+    def pin_cookie(self, user):
+        response = HttpResponse()
+        pin_to_primary(response, user.pk)
+        return response.cookies[PIN_COOKIE].value
+
+    def test_safe_requests_read_from_the_replica(self, configured):
+        self.assertEqual(self.read_alias(self.factory.get('/')), 'replica')
+        self.assertEqual(router.db_for_read(Level), 'default')
+
+    def test_writes_read_from_the_primary(self, configured):
+        self.assertEqual(self.read_alias(self.factory.post('/')), 'default')
+
+    def test_pinned_user_reads_from_the_primary(self, configured):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = self.pin_cookie(self.user)
+        self.assertEqual(self.read_alias(request), 'default')
+
+    def test_pin_of_another_user_is_ignored(self, configured):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = self.pin_cookie(User.objects.create_user('writer'))
+        self.assertEqual(self.read_alias(request), 'replica')
+
+    def test_alias_is_reset_when_the_view_raises(self, configured):
+        request = self.factory.get('/?fail')
+        force_authenticate(request, self.user)
+        with self.assertRaises(RuntimeError):
+            ReadAliasView.as_view()(request)
+        self.assertEqual(router.db_for_read(Level), 'default')
+
+    def test_successful_writes_pin_the_user(self, configured):
+        request = self.factory.post('/')
+        request.user = self.user
+        response = ReadYourWritesMiddleware(lambda request: HttpResponse())(request)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        request = self.factory.post('/')
+        request.user = self.user
+        response = ReadYourWritesMiddleware(lambda request: HttpResponse(status=400))(request)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+# -----------------------------
+# Catalog file
+# -----------------------------
+class CatalogFileTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'catalog.bin')
+
+        for number in (2, 1):
+            level = Level.objects.create(number=number, title=f'Level {number}')
+            for order in range(3):
+                topic = Topic.objects.create(level=level, title=f'Topic {order}', explanation='<p>é</p>', order=order)
+                Question.objects.create(
+                    topic=topic, question_type='MCQ', question_text='Pick one', correct_answer='a',
+                    options=['a', {'b': [1, 2]}],
+                )
+        coding_topic = CodingTopic.objects.create(name='Loops', description='for and while')
+        CodingProblem.objects.create(topic=coding_topic, sno=1, title='FizzBuzz', code_snippet=None)
+
+    def test_round_trip(self):
+        version, size = compile_catalog_file(self.path)
+        snapshot = CatalogSnapshot.load()
+        mapped = MappedCatalog(self.path)
+
+        self.assertEqual(mapped.version, version)
+        self.assertEqual(mapped.levels, snapshot.levels)
+        self.assertEqual(mapped.coding_topics, snapshot.coding_topics)
+        for level in snapshot.levels:
+            self.assertEqual(mapped.level(level.id), level)
+            self.assertEqual(mapped.level_by_number(level.number), level)
+            self.assertEqual(mapped.topics_of(level), snapshot.topics_of(level))
+            for topic in snapshot.topics_of(level):
+                self.assertEqual(mapped.questions_of(topic), snapshot.questions_of(topic))
+        for coding_topic in snapshot.coding_topics:
+            self.assertEqual(mapped.problems_of(coding_topic), snapshot.problems_of(coding_topic))
+
+    def test_missing_records(self):
+        compile_catalog_file(self.path)
+        mapped = MappedCatalog(self.path)
+
+        self.assertIsNone(mapped.level(0))
+        self.assertIsNone(mapped.topic(10 ** 9))
+        self.assertIsNone(mapped.coding_problem(-1))
+
+    def test_mapping_is_reused_until_the_file_is_replaced(self):
+        compile_catalog_file(self.path)
+        mapped = open_catalog_file(self.path)
+        self.assertIs(open_catalog_file(self.path, mapped), mapped)
+
+        Level.objects.create(number=3, title='Level 3')
+        compile_catalog_file(self.path)
+        remapped = open_catalog_file(self.path, mapped)
+        self.assertIsNot(remapped, mapped)
+        self.assertEqual(len(remapped.levels), 3)
+        # Readers of the old mapping still see the old file
+        self.assertEqual(len(mapped.levels), 2)
+
+    def test_damaged_file_keeps_the_current_mapping(self):
+        compile_catalog_file(self.path)
+        mapped = open_catalog_file(self.path)
+        with open(self.path, 'wb') as fh:
+            fh.write(b'not a catalog file at all')
+
+        with self.assertRaises(CatalogFileError):
+            MappedCatalog(self.path)
+        with self.assertLogs('tutorials.catalog_file', 'ERROR'):
+            self.assertIs(open_catalog_file(self.path, mapped), mapped)
+
+
+# -----------------------------
+# Offline bundles
+# -----------------------------
+class ParseRangeTests(SimpleTestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=900-5000', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+
+    def test_whole_file_for_ranges_it_does_not_serve(self):
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(parse_range('items=0-1', 1000))
+        self.assertIsNone(parse_range('bytes=-', 1000))
+        self.assertIsNone(parse_range('bytes=50-10', 1000))
+
+    def test_unsatisfiable_ranges(self):
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=1000-', 1000)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=-0', 1000)
+
+
+class DeltaTests(SimpleTestCase):
+    source = b''.join(bytes([i]) * 512 for i in range(20))
+
+    def test_round_trip(self):
+        target = self.source[1024:4096] + b'edited' + self.source[:1024] + self.source[4096:]
+        delta = make_delta(self.source, target)
+        self.assertEqual(apply_delta(self.source, delta), target)
+        self.assertLess(len(delta), 200)
+
+    def test_rejects_another_source(self):
+        delta = make_delta(self.source, self.source + b'more')
+        with self.assertRaises(DeltaError):
+            apply_delta(self.source[:-1], delta)
+        with self.assertRaises(DeltaError):
+            apply_delta(self.source, delta[:-5])
+
+
+class LevelBundleTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        bundle_root = override_settings(BUNDLE_ROOT=root)
+        bundle_root.enable()
+        self.addCleanup(bundle_root.disable)
+
+        self.user = User.objects.create_user('learner')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.level = Level.objects.create(number=1, title='Basics')
+        self.topic = Topic.objects.create(level=self.level, title='Variables', explanation='<p>int x = 1;</p>')
+        self.v1 = build_level_bundle(self.level.id)
+
+    def read(self, version, compressed=False):
+        with open(archive_path(self.level.id, version, compressed), 'rb') as fh:
+            return fh.read()
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_unchanged_level_is_not_rebuilt(self):
+        self.assertIsNone(build_level_bundle(self.level.id))
+
+    def test_patch_turns_the_old_archive_into_the_new_one(self):
+        self.topic.explanation = '<p>int x = 2;</p>'
+        self.topic.save()
+        v2 = build_level_bundle(self.level.id)
+        self.assertEqual(v2.version, 2)
+
+        data = self.client.get(f'/levels/{self.level.id}/bundle/').json()
+        self.assertEqual(data['version'], 2)
+        self.assertEqual([patch['from_version'] for patch in data['patches']], [1])
+
+        patch = self.content(self.client.get(data['patches'][0]['url']))
+        archive = apply_delta(self.read(1), patch)
+        self.assertEqual(hashlib.sha256(archive).hexdigest(), v2.sha256)
+        self.assertEqual(archive, self.read(2))
+
+    def test_download_supports_ranges(self):
+        url = f'/levels/{self.level.id}/bundle/1/'
+        archive = self.read(1, compressed=True)
+        self.assertEqual(gzip.decompress(archive), self.read(1))
+
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(self.content(response), archive)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(archive)}')
+        self.assertEqual(self.content(response), archive[10:20])
+
+        # Another file's validator: start over
+        response = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(archive)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(archive)}')
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -9,11 +9,22 @@ from .views import (
     # User Progress
     UserProgressView,
     UserLevelProgressView,
+    UserSyncView,
+    DashboardView,
 
     # Coding Section
     CodingTopicListView,
     CodingProblemListAPIView,
     CodingProblemDetailAPIView,
+
+    # Analytics
+    ProgressExportView,
+    TopicAnalyticsView,
+
+    # Offline Bundles
+    LevelBundleView,
+    LevelBundleDownloadView,
+    LevelBundlePatchView,
 )
 
 urlpatterns = [
@@ -30,6 +41,8 @@ urlpatterns = [
     # ---------------------------------
     path('user/progress/', UserProgressView.as_view(), name='user-progress'),
     path('user/levels/', UserLevelProgressView.as_view(), name='user-level-progress'),
+    path('user/sync/', UserSyncView.as_view(), name='user-sync'),
+    path('user/dashboard/', DashboardView.as_view(), name='user-dashboard'),
 
     # ---------------------------------
     # 💻 CODING SECTION
@@ -37,4 +50,21 @@ urlpatterns = [
     path('coding/topics/', CodingTopicListView.as_view(), name='coding-topic-list'),
     path('coding/topics/<int:topic_id>/problems/', CodingProblemListAPIView.as_view(), name='coding-problem-list'),
     path('coding/problems/<int:pk>/', CodingProblemDetailAPIView.as_view(), name='coding-problem-detail'),
+
+    # ---------------------------------
+    # 📊 ANALYTICS (staff only)
+    # ---------------------------------
+    path('export/progress/', ProgressExportView.as_view(), name='progress-export'),
+    path('analytics/topics/<int:topic_id>/', TopicAnalyticsView.as_view(), name='topic-analytics'),
+
+    # ---------------------------------
+    # 📦 OFFLINE BUNDLES
+    # ---------------------------------
+    path('levels/<int:level_id>/bundle/', LevelBundleView.as_view(), name='level-bundle'),
+    path('levels/<int:level_id>/bundle/<int:version>/', LevelBundleDownloadView.as_view(), name='level-bundle-download'),
+    path(
+        'levels/<int:level_id>/bundle/<int:from_version>/patch/<int:to_version>/',
+        LevelBundlePatchView.as_view(),
+        name='level-bundle-patch',
+    ),
 ]
@@ -1,120 +1,161 @@
+import os
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, generics
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 from .models import (
     Level,
+    LevelBundle,
     Topic,
     UserProgress,
     UserLevelCompletion,
-    CodingTopic,
-    CodingProblem,
-)
-from .serializers import (
-    LevelSerializer,
-    TopicSerializer,
-    QuestionSerializer,
-    CodingTopicSerializer,
-    CodingProblemListSerializer,
-    CodingProblemDetailSerializer,
+    QuizAttempt,
+    SyncTombstone,
 )
+from .serializers import LevelSerializer
+from .exports import EXPORT_KINDS, EXPORT_FORMATS, export_rows, iter_export
+from .analytics import topic_analytics
+from .catalog import get_catalog
+from .bundles import archive_path, available_patches, patch_path
+from .sync import changes_since, parse_token
+from javify.db_routers import ReplicaReadMixin
+from javify.caching import cached_response
+from javify.fast_serializers import compile_serializer
+from javify.renderers import StreamingJSONMixin
+from javify.ranges import ranged_file_response
+from javify.views import IMMUTABLE_CACHE_CONTROL
+from userauth.models import Profile, UserEvent
+from userauth.events import publish, publish_rank_change
+from userauth.serializers import profile_data
+from userauth.conditional import user_state_etag
+
+
+def catalog_version(request):
+    return get_catalog().version
 
 
 # -----------------------------
 # 1️⃣ List all Levels
 # -----------------------------
-class LevelListView(APIView):
+class LevelListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response('levels', catalog_version)
     def get(self, request):
         """
         Get all available levels with their XP/coin rewards.
         """
         levels = Level.objects.all().order_by('number')
-        serializer = LevelSerializer(levels, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = compile_serializer(LevelSerializer).serialize(levels)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 # -----------------------------
 # 2️⃣ List all Topics under a Level
 # -----------------------------
-class TopicListView(APIView):
+class TopicListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response('topics', catalog_version)
     def get(self, request, level_id):
         """
         Get all topics that belong to a specific level.
         """
-        level = get_object_or_404(Level, id=level_id)
-        topics = level.topics.order_by('order')
-        serializer = TopicSerializer(topics, many=True)
+        catalog = get_catalog()
+        level = catalog.level(level_id)
+        if level is None:
+            raise Http404("No Level matches the given query.")
         return Response({
             "level_id": level.id,
             "level_number": level.number,
             "level_title": level.title,
             "required_topics": level.required_topics,
-            "topics": serializer.data
+            "topics": [catalog.topic_data(t) for t in catalog.topics_of(level)]
         }, status=status.HTTP_200_OK)
 
 
 # -----------------------------
 # 3️⃣ List all Questions under a Topic
 # -----------------------------
-class QuestionListView(APIView):
+class QuestionListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response('questions', catalog_version)
     def get(self, request, topic_id):
         """
         Get all questions for a specific topic.
         """
-        topic = get_object_or_404(Topic, id=topic_id)
-        questions = topic.questions.all()
-        serializer = QuestionSerializer(questions, many=True)
+        catalog = get_catalog()
+        topic = catalog.topic(topic_id)
+        if topic is None:
+            raise Http404("No Topic matches the given query.")
         return Response({
             "topic_id": topic.id,
             "topic_title": topic.title,
-            "questions": serializer.data
+            "questions": [catalog.question_data(q) for q in catalog.questions_of(topic)]
         }, status=status.HTTP_200_OK)
 
 
 # -----------------------------
 # 4️⃣ Coding Topics and Problems
 # -----------------------------
-class CodingTopicListView(APIView):
+class CodingTopicListView(ReplicaReadMixin, APIView):
     """
     Get all coding topics.
     """
     permission_classes = [IsAuthenticated]
 
+    @cached_response('coding-topics', catalog_version)
     def get(self, request):
-        topics = CodingTopic.objects.all().order_by('name')
-        serializer = CodingTopicSerializer(topics, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        catalog = get_catalog()
+        data = [catalog.coding_topic_data(t) for t in catalog.coding_topics]
+        return Response(data, status=status.HTTP_200_OK)
 
 
-class CodingProblemListAPIView(generics.ListAPIView):
+class CodingProblemListAPIView(ReplicaReadMixin, APIView):
     """
     List all coding problems under a specific topic.
     """
-    serializer_class = CodingProblemListSerializer
 
-    def get_queryset(self):
-        topic_id = self.kwargs['topic_id']
-        return CodingProblem.objects.filter(topic__id=topic_id).order_by('sno')
+    @cached_response('coding-problems', catalog_version)
+    def get(self, request, topic_id):
+        catalog = get_catalog()
+        coding_topic = catalog.coding_topic(topic_id)
+        problems = catalog.problems_of(coding_topic) if coding_topic else ()
+        return Response([catalog.coding_problem_summary(p) for p in problems])
 
 
-class CodingProblemDetailAPIView(generics.RetrieveAPIView):
+class CodingProblemDetailAPIView(APIView):
     """
     Retrieve details for a single coding problem.
     """
-    queryset = CodingProblem.objects.all()
-    serializer_class = CodingProblemDetailSerializer
+
+    @cached_response('coding-problem', catalog_version)
+    def get(self, request, pk):
+        catalog = get_catalog()
+        problem = catalog.coding_problem(pk)
+        if problem is None:
+            raise Http404("No CodingProblem matches the given query.")
+        return Response(catalog.coding_problem_data(problem))
 
 
 # -----------------------------
 # 5️⃣ Submit Answers + Rewards
 # -----------------------------
+def completed_topic_count(user, topic_ids):
+    """How many of the given topics the user has completed."""
+    return UserProgress.objects.for_user(user).filter(
+        user=user, topic_id__in=topic_ids, completed=True
+    ).count()
+
+
 class SubmitAnswersView(APIView):
     """
     Submit quiz answers for a topic, update progress, 
@@ -125,46 +166,82 @@ class SubmitAnswersView(APIView):
     def post(self, request, topic_id):
         user = request.user
         profile = user.profile  # Must exist in UserProfile model
-        topic = get_object_or_404(Topic, id=topic_id)
-        level = topic.level
+        catalog = get_catalog()
+        topic = catalog.topic(topic_id)
+        if topic is None:
+            raise Http404("No Topic matches the given query.")
+        level = catalog.level(topic.level_id)
         answers = request.data.get("answers", {})
 
-        questions = topic.questions.all()
-        correct_count = 0
+        questions = catalog.questions_of(topic)
+        total_questions = len(questions)
+        results = []
 
         # ✅ Check answers
         for q in questions:
             user_answer = str(answers.get(str(q.id), "")).strip().lower()
             correct = str(q.correct_answer).strip().lower()
-            if user_answer == correct:
-                correct_count += 1
-
-        progress, _ = UserProgress.objects.get_or_create(user=user, topic=topic)
+            results.append(user_answer == correct)
+        correct_count = sum(results)
+
+        # 📝 Keep every attempt for analytics
+        QuizAttempt.objects.create(
+            user=user,
+            topic_id=topic.id,
+            correct_answers=correct_count,
+            total_questions=total_questions,
+            passed=correct_count == total_questions,
+            question_ids=[q.id for q in questions],
+            result_mask=QuizAttempt.encode_mask(results),
+        )
+
+        progress, _ = UserProgress.objects.for_user(user).get_or_create(user=user, topic_id=topic.id)
         progress.correct_answers = correct_count
-        progress.total_questions = questions.count()
+        progress.total_questions = total_questions
 
         # ✅ All answers correct
-        if correct_count == questions.count():
+        if correct_count == total_questions:
             if not progress.completed:
+                xp_before, coins_before = profile.xp, profile.coins
                 progress.mark_completed()
                 profile.add_xp(10)  # Topic XP
                 profile.coins += 5  # Topic coins
 
                 # ✅ Check if level completed
-                if level.is_completed_by(user):
-                    if not UserLevelCompletion.objects.filter(user=user, level=level).exists():
-                        UserLevelCompletion.objects.create(user=user, level=level)
+                if completed_topic_count(user, level.topic_ids) >= level.required_topics:
+                    completions = UserLevelCompletion.objects.for_user(user)
+                    if not completions.filter(user=user, level_id=level.id).exists():
+                        completions.create(user=user, level_id=level.id)
                         profile.add_xp(level.xp_reward)
                         profile.coins += level.coin_reward
 
                         # 🔓 Unlock next level
-                        next_level = Level.objects.filter(number=level.number + 1).first()
+                        next_level = catalog.level_by_number(level.number + 1)
                         if next_level:
                             profile.unlocked_level = next_level.number
                             profile.save()
 
+                        publish(user.id, UserEvent.LEVEL_COMPLETED, {
+                            "level_id": level.id,
+                            "level_number": level.number,
+                            "xp_reward": level.xp_reward,
+                            "coin_reward": level.coin_reward,
+                            "unlocked_level": next_level.number if next_level else None,
+                        })
+
                 profile.save()
 
+                # 📡 Push to the user's open event streams
+                publish(user.id, UserEvent.REWARD, {
+                    "topic_id": topic.id,
+                    "xp_gained": profile.xp - xp_before,
+                    "coins_gained": profile.coins - coins_before,
+                    "xp": profile.xp,
+                    "coins": profile.coins,
+                    "level": profile.level,
+                })
+                publish_rank_change(user.id, xp_before, profile.xp)
+
                 return Response({
                     "message": f"✅ Topic '{topic.title}' completed successfully!",
                     "xp": profile.xp,
@@ -181,97 +258,411 @@ class SubmitAnswersView(APIView):
         else:
             progress.save()
             return Response({
-                "message": f"❌ You got {correct_count}/{questions.count()} correct. Try again!"
+                "message": f"❌ You got {correct_count}/{total_questions} correct. Try again!"
             }, status=status.HTTP_200_OK)
 
 
 # -----------------------------
 # 6️⃣ User Progress (All Topics)
 # -----------------------------
-class UserProgressView(APIView):
+PROGRESS_COLUMNS = ('topic_id', 'completed', 'correct_answers', 'total_questions', 'date_completed')
+
+
+def progress_data(catalog, topic_id, completed, correct_answers, total_questions, date_completed):
+    """One UserProgressView row; None if the topic is gone from the catalog."""
+    topic = catalog.topic(topic_id)
+    if topic is None:
+        return None
+    level = catalog.level(topic.level_id)
+    return {
+        "level_id": level.id,
+        "level_number": level.number,
+        "level_title": level.title,
+        "topic_id": topic.id,
+        "topic_title": topic.title,
+        "completed": completed,
+        "correct_answers": correct_answers,
+        "total_questions": total_questions,
+        "date_completed": date_completed,
+    }
+
+
+class UserProgressView(StreamingJSONMixin, ReplicaReadMixin, APIView):
     """
     Get topic-wise progress for authenticated user.
+    The progress list is streamed as the rows are read.
     """
     permission_classes = [IsAuthenticated]
 
+    @user_state_etag('progress', catalog_version)
     def get(self, request):
         user = request.user
-        progress_qs = UserProgress.objects.filter(user=user).select_related("topic", "topic__level")
-
-        data = [
-            {
-                "level_id": p.topic.level.id,
-                "level_number": p.topic.level.number,
-                "level_title": p.topic.level.title,
-                "topic_id": p.topic.id,
-                "topic_title": p.topic.title,
-                "completed": p.completed,
-                "correct_answers": p.correct_answers,
-                "total_questions": p.total_questions,
-                "date_completed": p.date_completed,
-            }
-            for p in progress_qs
-        ]
+        # Progress may live on a user shard; topics/levels come from the catalog
+        catalog = get_catalog()
+        progress_rows = UserProgress.objects.for_user(user).filter(user=user).values_list(*PROGRESS_COLUMNS)
+        # Rows are read while streaming, after the view has returned: fix the database now
+        progress_rows = progress_rows.using(progress_rows.db)
+
+        def progress():
+            for row in progress_rows.iterator():
+                item = progress_data(catalog, *row)
+                if item is not None:
+                    yield item
 
         return Response({
             "user": user.username,
-            "progress": data
+            "progress": progress()
         }, status=status.HTTP_200_OK)
 
+class UserSyncView(APIView):
+    """
+    Delta sync for mobile clients: ?since=<token from the previous sync>
+    returns only the profile, topic progress and level completions changed
+    since then, and under "deleted" the topic / level ids of rows removed
+    since then. Without `since`, or with one too old to have its deletions
+    on record, everything is returned ("full": true).
+    Reads stay on the primary so replica lag can't skip rows.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        since = request.query_params.get('since')
+        try:
+            since = parse_token(since) if since else None
+        except ValueError:
+            return Response({"error": "Invalid sync token."}, status=status.HTTP_400_BAD_REQUEST)
+
+        token, full, profile, progress_rows, completion_rows, deleted = changes_since(user, since, PROGRESS_COLUMNS)
+        catalog = get_catalog()
+
+        progress = []
+        for row in progress_rows:
+            item = progress_data(catalog, *row)
+            if item is not None:
+                progress.append(item)
+
+        level_completions = []
+        for level_id, date_completed in completion_rows:
+            level = catalog.level(level_id)
+            if level is not None:
+                level_completions.append({
+                    "level_id": level.id,
+                    "level_number": level.number,
+                    "date_completed": date_completed,
+                })
+
+        return Response({
+            "token": token,
+            "full": full,
+            "profile": profile_data(user, profile) if profile else None,
+            "progress": progress,
+            "level_completions": level_completions,
+            "deleted": {
+                "progress": deleted[SyncTombstone.PROGRESS],
+                "level_completions": deleted[SyncTombstone.LEVEL_COMPLETION],
+            },
+        }, status=status.HTTP_200_OK)
+
+
 # -----------------------------
 # 7️⃣ User Level Progress View
 # -----------------------------
-class UserLevelProgressView(APIView):
+def level_progress_data(catalog, completed_topics, current_unlocked_level=1):
+    """Completion/unlock state of every level, given the user's completed topic ids."""
+    levels = catalog.levels
+    data = []
+
+    completed_levels = {
+        level.number
+        for level in levels
+        if len(completed_topics.intersection(level.topic_ids)) >= level.required_topics
+    }
+
+    for level in levels:
+        completed = level.number in completed_levels
+
+        # ✅ FIX: Level is unlocked if:
+        # 1. It's the first level (level 1 is always unlocked)
+        # 2. User's unlocked_level is >= current level number
+        # 3. OR if the previous level is completed
+        unlocked = (
+            level.number == 1 or
+            current_unlocked_level >= level.number or
+            is_previous_level_completed(catalog, completed_levels, level)
+        )
+
+        data.append({
+            "level_id": level.id,
+            "level_number": level.number,
+            "level_title": level.title,
+            "xp_reward": level.xp_reward,
+            "coin_reward": level.coin_reward,
+            "required_topics": level.required_topics,
+            "completed": completed,
+            "unlocked": unlocked
+        })
+    return data
+
+
+def is_previous_level_completed(catalog, completed_levels, current_level):
+    """Check if the previous level is completed"""
+    if current_level.number == 1:
+        return True  # First level has no previous level
+
+    if catalog.level_by_number(current_level.number - 1) is None:
+        return False
+    return current_level.number - 1 in completed_levels
+
+
+class UserLevelProgressView(ReplicaReadMixin, APIView):
     """
     Get completion status for each level.
     """
     permission_classes = [IsAuthenticated]
 
+    @user_state_etag('levels', catalog_version)
     def get(self, request):
         user = request.user
         profile = user.profile
-        levels = Level.objects.all().order_by('number')
-        data = []
+        catalog = get_catalog()
+
+        # One query for the user's completed topics, counted per level in memory
+        completed_topics = set(
+            UserProgress.objects.for_user(user)
+            .filter(user=user, completed=True)
+            .values_list('topic_id', flat=True)
+        )
 
         # Get user's current unlocked level from profile
         current_unlocked_level = getattr(profile, "unlocked_level", 1)
-        
-        for level in levels:
-            completed = level.is_completed_by(user)
-            
-            # ✅ FIX: Level is unlocked if:
-            # 1. It's the first level (level 1 is always unlocked)
-            # 2. User's unlocked_level is >= current level number
-            # 3. OR if the previous level is completed
-            unlocked = (
-                level.number == 1 or 
-                current_unlocked_level >= level.number or
-                self.is_previous_level_completed(user, level)
-            )
-            
-            data.append({
-                "level_id": level.id,
-                "level_number": level.number,
-                "level_title": level.title,
-                "xp_reward": level.xp_reward,
-                "coin_reward": level.coin_reward,
-                "required_topics": level.required_topics,
-                "completed": completed,
-                "unlocked": unlocked
-            })
+        data = level_progress_data(catalog, completed_topics, current_unlocked_level)
 
         return Response({
             "user": user.username,
             "levels": data
         }, status=status.HTTP_200_OK)
 
-    def is_previous_level_completed(self, user, current_level):
-        """Check if the previous level is completed"""
-        if current_level.number == 1:
-            return True  # First level has no previous level
-            
+
+# -----------------------------
+# 8️⃣ Dashboard
+# -----------------------------
+class DashboardView(ReplicaReadMixin, APIView):
+    """
+    Everything the app needs on start in one response: profile, level
+    completion/unlock state, topic progress and the level catalog summary.
+    Fixed query budget whatever the catalog or history size: user
+    (authentication), state version (ETag), profile, progress rows.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @user_state_etag('dashboard', catalog_version)
+    def get(self, request):
+        user = request.user
+        catalog = get_catalog()
+        profile, _ = Profile.objects.for_user(user).get_or_create(user=user)
+        progress_rows = list(
+            UserProgress.objects.for_user(user).filter(user=user).values_list(*PROGRESS_COLUMNS)
+        )
+
+        progress = []
+        completed_topics = set()
+        for row in progress_rows:
+            item = progress_data(catalog, *row)
+            if item is None:
+                continue
+            progress.append(item)
+            if item["completed"]:
+                completed_topics.add(item["topic_id"])
+
+        return Response({
+            "profile": profile_data(user, profile),
+            "levels": level_progress_data(
+                catalog, completed_topics, getattr(profile, "unlocked_level", 1)
+            ),
+            "progress": progress,
+            # Same shape as LevelListView
+            "catalog": [
+                {
+                    "id": level.id,
+                    "number": level.number,
+                    "title": level.title,
+                    "description": level.description,
+                    "topics_count": len(level.topic_ids),
+                    "xp_reward": level.xp_reward,
+                    "coin_reward": level.coin_reward,
+                }
+                for level in catalog.levels
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# 9️⃣ Progress Export (Staff only)
+# -----------------------------
+def _parse_date(value):
+    """YYYY-MM-DD query parameter; None if missing, ValueError if not a real date."""
+    if not value:
+        return None
+    parsed = parse_date(value)  # raises ValueError itself for e.g. 2024-13-01
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class ProgressExportView(APIView):
+    """
+    Stream user progress as CSV or JSONL for analytics.
+
+    Query params:
+        kind    -- "progress" (topic progress, default) or "levels" (level completions)
+        output  -- "csv" (default) or "jsonl"
+        from/to -- date_completed range, YYYY-MM-DD (inclusive)
+        level   -- level number
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        kind = request.query_params.get("kind", "progress")
+        output = request.query_params.get("output", "csv")
+        if kind not in EXPORT_KINDS or output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"kind must be one of {sorted(EXPORT_KINDS)}, output one of {sorted(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            date_from = _parse_date(request.query_params.get("from"))
+            date_to = _parse_date(request.query_params.get("to"))
+            level = request.query_params.get("level")
+            level = int(level) if level else None
+        except ValueError:
+            return Response(
+                {"error": "Dates must be YYYY-MM-DD and level must be a number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        names, rows = export_rows(kind, date_from=date_from, date_to=date_to, level=level)
+        response = StreamingHttpResponse(
+            iter_export(output, names, rows),
+            content_type=EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{kind}.{output}"'
+        return response
+
+
+# -----------------------------
+# 🔟 Topic Quiz Analytics (Staff only)
+# -----------------------------
+class TopicAnalyticsView(APIView):
+    """
+    Attempts, pass rate and per-question miss rates for a topic.
+    Reads only the daily rollup tables (see tutorials/analytics.py).
+
+    Query params: from/to -- YYYY-MM-DD, defaults to the last 30 days.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, topic_id):
+        topic = get_object_or_404(Topic, id=topic_id)
+        today = timezone.localdate()
         try:
-            previous_level = Level.objects.get(number=current_level.number - 1)
-            return previous_level.is_completed_by(user)
-        except Level.DoesNotExist:
-            return False
\ No newline at end of file
+            date_from = _parse_date(request.query_params.get("from")) or today - timedelta(days=30)
+            date_to = _parse_date(request.query_params.get("to")) or today
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = topic_analytics(topic, date_from, date_to)
+        return Response({
+            "topic_id": topic.id,
+            "topic_title": topic.title,
+            "from": date_from,
+            "to": date_to,
+            **data,
+        }, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# 1️⃣1️⃣ Offline Level Bundles
+# -----------------------------
+class LevelBundleView(APIView):
+    """
+    Latest offline bundle of a level (see tutorials/bundles.py): its version,
+    checksum, download URL and the patches from earlier versions. A client
+    holding one of those versions fetches the patch instead of the bundle.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, level_id):
+        bundle = LevelBundle.objects.filter(level_id=level_id).order_by('-version').first()
+        if bundle is None:
+            raise Http404("No bundle has been built for this level.")
+        return Response({
+            "level_id": bundle.level_id,
+            "version": bundle.version,
+            "sha256": bundle.sha256,
+            "size": bundle.size,
+            "compressed_size": bundle.compressed_size,
+            "created_at": bundle.created_at,
+            "url": request.build_absolute_uri(
+                reverse('level-bundle-download', args=[bundle.level_id, bundle.version])
+            ),
+            "patches": [
+                {
+                    "from_version": from_version,
+                    "size": size,
+                    "url": request.build_absolute_uri(
+                        reverse('level-bundle-patch', args=[bundle.level_id, from_version, bundle.version])
+                    ),
+                }
+                for from_version, size in available_patches(bundle)
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+class BundleFileView(APIView):
+    """Bundle files never change once published; served with Range support."""
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The answer is the file, whatever Accept asks for
+        return super().perform_content_negotiation(request, force=True)
+
+    def serve(self, request, path, etag, content_type, filename):
+        if not os.path.isfile(path):
+            raise Http404("This bundle version is no longer available.")
+        return ranged_file_response(
+            request, path, content_type, etag, cache_control=IMMUTABLE_CACHE_CONTROL, filename=filename
+        )
+
+
+class LevelBundleDownloadView(BundleFileView):
+    """The gzip-compressed archive of one bundle version."""
+
+    def get(self, request, level_id, version):
+        bundle = get_object_or_404(LevelBundle, level_id=level_id, version=version)
+        return self.serve(
+            request,
+            archive_path(level_id, version),
+            etag=f"{bundle.sha256}.gz",
+            content_type="application/gzip",
+            filename=f"level-{level_id}-v{version}.tar.gz",
+        )
+
+
+class LevelBundlePatchView(BundleFileView):
+    """
+    Binary delta (javify/delta.py) from one bundle version's uncompressed
+    archive to another's. 404 when either version has been pruned: download
+    the bundle instead.
+    """
+
+    def get(self, request, level_id, from_version, to_version):
+        target = get_object_or_404(LevelBundle, level_id=level_id, version=to_version)
+        return self.serve(
+            request,
+            patch_path(level_id, from_version, to_version),
+            etag=f"{from_version}-{target.sha256}",
+            content_type="application/octet-stream",
+            filename=f"level-{level_id}-v{from_version}-v{to_version}.delta",
+        )
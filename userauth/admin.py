@@ -8,3 +8,27 @@ class ProfileAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__email')
     list_filter = ('level',)
     ordering = ('-xp',)
+
+
+@admin.register(UserStateVersion)
+class UserStateVersionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'version')
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'version')
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'user', 'created_at', 'sent_at', 'attempts')
+    list_filter = ('kind', 'sent_at')
+    search_fields = ('user__email',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(UserEvent)
+class UserEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'user', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('user__email',)
+    raw_id_fields = ('user',)
+    readonly_fields = ('created_at',)
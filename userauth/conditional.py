@@ -0,0 +1,44 @@
+"""
+Conditional GETs for personal endpoints.
+
+Responses built only from a user's own state (plus, optionally, other
+versioned content such as the catalog) carry an ETag made from the user's
+UserStateVersion. A request whose If-None-Match still matches is answered
+with 304 after a single indexed read of that counter.
+"""
+import functools
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import UserStateVersion
+
+
+def user_state_etag(name, extra_version=None):
+    """
+    Decorator for DRF view get() methods of authenticated, per-user endpoints.
+    `extra_version(request)` adds the version of any shared content the
+    response also depends on.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            user_id = request.user.pk
+            parts = [name, str(user_id), str(UserStateVersion.current(user_id))]
+            if extra_version is not None:
+                parts.append(str(extra_version(request)))
+            etag = quote_etag('-'.join(parts))
+
+            if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+            if etag in if_none_match or '*' in if_none_match:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
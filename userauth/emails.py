@@ -0,0 +1,69 @@
+"""
+Email builders and the outbox sender.
+
+Bulk operations queue QueuedEmail rows instead of talking to SMTP inline;
+send_queued_emails() delivers them in batches over one connection.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+
+def welcome_email(user):
+    subject = "🎉 Welcome to CodeLearn!"
+    html_message = render_to_string("emails/welcome_email.html", {"user": user})
+    email = EmailMessage(subject, html_message, settings.DEFAULT_FROM_EMAIL, [user.email])
+    email.content_subtype = "html"
+    return email
+
+
+EMAIL_BUILDERS = {
+    QueuedEmail.WELCOME: welcome_email,
+}
+
+
+def send_queued_emails(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """
+    Send one batch of pending emails. Rows are claimed with SKIP LOCKED where
+    the database supports it, so several senders can run at once.
+    Returns (sent, failed).
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        pending = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')
+            .filter(sent_at__isnull=True, attempts__lt=max_attempts)
+            .order_by('id')[:batch_size]
+        )
+        if not pending:
+            return 0, 0
+
+        now = timezone.now()
+        with get_connection() as connection:
+            for queued in pending:
+                queued.attempts += 1
+                try:
+                    message = EMAIL_BUILDERS[queued.kind](queued.user)
+                    message.connection = connection
+                    message.send()
+                except Exception as e:
+                    queued.last_error = str(e)
+                    failed += 1
+                    logger.warning("Sending %s email to user %s failed: %s", queued.kind, queued.user_id, e)
+                else:
+                    queued.sent_at = now
+                    queued.last_error = ''
+                    sent += 1
+        QueuedEmail.objects.bulk_update(pending, ['attempts', 'sent_at', 'last_error'])
+    return sent, failed
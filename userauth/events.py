@@ -0,0 +1,242 @@
+"""
+Live per-user events (rewards, level completions, rank changes) streamed to
+clients as server-sent events from GET /events/.
+
+    publish()  -> UserEvent row written in the caller's transaction (outbox)
+    EventHub   -> one per process: polls the outbox for new rows and fans
+                  them out to the streams open in this process
+
+The outbox carries events across worker processes and hosts: each process
+with open streams runs one poll query every EVENTS_POLL_INTERVAL no matter
+how many connections it holds, and a publish in the same process wakes its
+poller straight away. Streams are coroutines on the ASGI event loop waiting
+on a small queue, so an idle connection costs a few kilobytes and no thread;
+they need an ASGI worker (WSGI workers answer 501).
+
+The outbox id is the SSE event id. A client reconnecting with Last-Event-ID
+is sent what it missed from the last EVENTS_RETENTION seconds, so a stream
+that falls EVENTS_CONNECTION_BUFFER events behind is simply closed and the
+client's EventSource reconnects and catches up.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from javify.sharding import user_shards
+from .models import Profile, UserEvent
+
+logger = logging.getLogger(__name__)
+
+POLL_BATCH = 500
+RETRY_MS = 5000            # EventSource reconnect delay
+GAP_TIMEOUT = 10.0         # seconds to wait for an id skipped by a slower transaction
+MAX_GAPS = 1000
+
+
+# -----------------------------
+# Publishing
+# -----------------------------
+def publish(user_id, kind, payload):
+    """Queue an event for `user_id`; it is streamed once the transaction commits."""
+    event = UserEvent.objects.create(user_id=user_id, kind=kind, payload=payload)
+    transaction.on_commit(hub.wake)
+    return event
+
+
+def xp_rank(xp, exclude_user_id=None):
+    """1-based position on the XP leaderboard of a profile with `xp`."""
+    ahead = 0
+    for alias in user_shards():
+        profiles = Profile.objects.using(alias).filter(xp__gt=xp)
+        if exclude_user_id is not None:
+            profiles = profiles.exclude(user_id=exclude_user_id)
+        ahead += profiles.count()
+    return ahead + 1
+
+
+def publish_rank_change(user_id, xp_before, xp_after):
+    """Publish a leaderboard event if gaining XP moved the user up."""
+    if xp_after == xp_before:
+        return
+    previous = xp_rank(xp_before, exclude_user_id=user_id)
+    rank = xp_rank(xp_after)
+    if rank != previous:
+        publish(user_id, UserEvent.LEADERBOARD, {"rank": rank, "previous_rank": previous, "xp": xp_after})
+
+
+# -----------------------------
+# In-process fan-out
+# -----------------------------
+class Subscription:
+    def __init__(self, user_id, buffer):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=buffer)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+@sync_to_async
+def _latest_event_id():
+    return UserEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+@sync_to_async
+def _events_after(last_id, gaps):
+    condition = Q(id__gt=last_id)
+    if gaps:
+        condition |= Q(id__in=gaps)
+    return list(
+        UserEvent.objects.filter(condition)
+        .order_by('id')
+        .values_list('id', 'user_id', 'kind', 'payload')[:POLL_BATCH]
+    )
+
+
+class EventHub:
+    """
+    Streams open in this process, by user, plus the task polling the outbox
+    for them. The poller runs only while something is subscribed.
+    """
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.loop = None
+        self.wakeup = None
+        self.task = None
+        self.last_id = None
+        self.gaps = {}  # skipped id -> monotonic deadline
+
+    def subscribe(self, user_id):
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop, self.wakeup, self.task = loop, asyncio.Event(), None
+        subscription = Subscription(user_id, settings.EVENTS_CONNECTION_BUFFER)
+        self.subscriptions[user_id].add(subscription)
+        if self.task is None:
+            self.task = loop.create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self.subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.user_id]
+
+    def wake(self):
+        """Poll now instead of at the next interval. Safe to call from any thread."""
+        loop, task = self.loop, self.task
+        if loop is not None and task is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.wakeup.set)
+
+    def dispatch(self, rows):
+        now = time.monotonic()
+        for event_id, user_id, kind, payload in rows:
+            self.gaps.pop(event_id, None)
+            if event_id > self.last_id:
+                # Ids below this one that aren't visible yet may belong to a
+                # transaction that commits later; look for them for a while
+                missing = range(self.last_id + 1, event_id)
+                if len(self.gaps) + len(missing) <= MAX_GAPS:
+                    self.gaps.update(dict.fromkeys(missing, now + GAP_TIMEOUT))
+                self.last_id = event_id
+            for subscription in self.subscriptions.get(user_id, ()):
+                subscription.deliver((event_id, kind, payload))
+        self.gaps = {event_id: deadline for event_id, deadline in self.gaps.items() if deadline > now}
+
+    async def _poll(self):
+        try:
+            self.last_id = await _latest_event_id()
+            while self.subscriptions:
+                self.wakeup.clear()
+                try:
+                    rows = await _events_after(self.last_id, list(self.gaps))
+                    self.dispatch(rows)
+                except Exception:
+                    logger.exception("Polling user events failed")
+                    rows = ()
+                if len(rows) == POLL_BATCH:
+                    continue
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), settings.EVENTS_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.task, self.last_id = None, None
+            self.gaps.clear()
+
+
+hub = EventHub()
+
+
+# -----------------------------
+# Streams
+# -----------------------------
+def authenticate_stream(request):
+    """
+    User for a JWT access token from the Authorization header or, since
+    browsers' EventSource can't set headers, the `token` query parameter.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return user if user.is_active else None
+
+
+@sync_to_async
+def _missed_events(user_id, last_event_id):
+    since = timezone.now() - timedelta(seconds=settings.EVENTS_RETENTION)
+    return list(
+        UserEvent.objects.filter(user_id=user_id, id__gt=last_event_id, created_at__gte=since)
+        .order_by('id')
+        .values_list('id', 'kind', 'payload')[:settings.EVENTS_REPLAY_LIMIT]
+    )
+
+
+def _format(event_id, kind, payload):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+async def stream_events(user_id, last_event_id=None):
+    """SSE body: missed events after `last_event_id`, then live ones, with heartbeats."""
+    subscription = hub.subscribe(user_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        replayed = set()
+        if last_event_id is not None:
+            for event_id, kind, payload in await _missed_events(user_id, last_event_id):
+                replayed.add(event_id)
+                yield _format(event_id, kind, payload)
+        while not subscription.overflowed:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"  # keeps proxies from closing an idle connection
+                continue
+            if event[0] not in replayed and not subscription.overflowed:
+                yield _format(*event)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,32 @@
+"""Periodic cleanup of auth data (see javify/scheduler.py)."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from javify.scheduler import delete_in_batches, periodic
+from .models import UserEvent
+
+
+@periodic(every=timedelta(hours=6))
+def flush_expired_tokens():
+    """
+    Refresh tokens past their expiry; can't be used any more, blacklisted or
+    not. Their BlacklistedToken rows go with them (on_delete=CASCADE).
+    """
+    return delete_in_batches(OutstandingToken.objects.filter(expires_at__lt=timezone.now()))
+
+
+@periodic(every=timedelta(hours=1))
+def clear_expired_sessions():
+    """Sessions left by admin and allauth logins (the API itself uses JWTs)."""
+    return delete_in_batches(Session.objects.filter(expire_date__lt=timezone.now()))
+
+
+@periodic(every=timedelta(minutes=10))
+def prune_user_events():
+    """Live events older than EVENTS_RETENTION can no longer be replayed."""
+    cutoff = timezone.now() - timedelta(seconds=settings.EVENTS_RETENTION)
+    return delete_in_batches(UserEvent.objects.filter(created_at__lt=cutoff))
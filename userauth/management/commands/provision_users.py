@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from userauth.provisioning import ProvisioningError, provision_users, read_rows
+
+
+class Command(BaseCommand):
+    help = "Create accounts in bulk from a CSV with name,email[,password] columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--workers', type=int, help="Password hashing processes (default: CPU count).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--no-email', action='store_true', help="Don't queue welcome emails.")
+        parser.add_argument('--dry-run', action='store_true', help="Only validate and report.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig') as fh:
+                rows = read_rows(fh.read())
+        except (OSError, ProvisioningError) as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        report = provision_users(
+            rows,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            send_email=not options['no_email'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for problem in report['errors']:
+            self.stderr.write(f"line {problem['line']}: {problem['email']}: {' '.join(problem['errors'])}")
+        for skipped in report['skipped']:
+            self.stdout.write(f"line {skipped['line']}: {skipped['email']}: {skipped['reason']}")
+        if options['dry_run']:
+            summary = f"Would create {report['would_create']} accounts"
+        else:
+            summary = f"Created {report['created']} accounts in {elapsed:.1f}s"
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary}; {len(report['skipped'])} skipped, {len(report['errors'])} invalid."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from userauth.emails import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver pending QueuedEmail rows (welcome emails from bulk provisioning)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-batches', type=int, default=0, help="0 = until the queue is empty.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = batches = 0
+        while True:
+            sent, failed = send_queued_emails(batch_size=options['batch_size'])
+            if not sent and not failed:
+                break
+            total_sent += sent
+            total_failed += failed
+            batches += 1
+            if options['max_batches'] and batches >= options['max_batches']:
+                break
+            if not sent:
+                # Only failures left in this batch; retry on the next run
+                break
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed."))
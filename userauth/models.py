@@ -1,14 +1,26 @@
-from django.db import models
+from django.db import models, IntegrityError, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.utils import timezone
+from javify.sharding import UserShardedManager
 
 
 class Profile(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
+    # No DB constraint: with sharding enabled the row may live on a shard without auth_user
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile", db_constraint=False)
     xp = models.IntegerField(default=10)       # Default signup bonus XP
     level = models.IntegerField(default=1)     # Starting level
     coins = models.IntegerField(default=5)     # Default signup coins
     avatar = models.URLField(blank=True, null=True)  # Profile picture URL (from Google or custom)
+    updated_at = models.DateTimeField(auto_now=True)  # for delta sync
+
+    objects = UserShardedManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+            models.Index(fields=['xp']),  # leaderboard rank
+        ]
 
     def __str__(self):
         return f"{self.user.username} - Level {self.level}"
@@ -22,4 +34,78 @@ class Profile(models.Model):
         self.save()
 
 
+class UserStateVersion(models.Model):
+    """
+    Per-user counter bumped on every write to the user's profile or progress.
+    Personal endpoints derive their ETag from it (see userauth/conditional.py).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="state_version", db_constraint=False)
+    version = models.BigIntegerField(default=0)
+
+    objects = UserShardedManager()
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.version}"
+
+    @classmethod
+    def bump(cls, user_id, create=True):
+        """Increment the user's version; `create=False` leaves users without a row alone."""
+        rows = cls.objects.for_user(user_id).filter(user_id=user_id)
+        if rows.update(version=F('version') + 1) or not create:
+            return
+        try:
+            with transaction.atomic(using=rows.db):
+                cls.objects.for_user(user_id).create(user_id=user_id, version=1)
+        except IntegrityError:
+            rows.update(version=F('version') + 1)
+
+    @classmethod
+    def current(cls, user_id):
+        version = cls.objects.for_user(user_id).filter(user_id=user_id).values_list('version', flat=True).first()
+        return version or 0
+
+
+class QueuedEmail(models.Model):
+    """Outbox for emails sent by the send_queued_emails command instead of inline."""
+    WELCOME = 'welcome'
+    KIND_CHOICES = [(WELCOME, 'Welcome')]
 
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='queued_emails')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['sent_at', 'id'])]
+
+    def __str__(self):
+        return f"{self.kind} -> {self.user_id}"
+
+
+class UserEvent(models.Model):
+    """
+    Outbox of live events (rewards, level completions, rank changes) for the
+    event stream; see userauth/events.py. Rows are kept for EVENTS_RETENTION
+    so reconnecting clients can catch up with Last-Event-ID.
+    """
+    REWARD = 'reward'
+    LEVEL_COMPLETED = 'level_completed'
+    LEADERBOARD = 'leaderboard'
+    KIND_CHOICES = [
+        (REWARD, 'Reward'),
+        (LEVEL_COMPLETED, 'Level completed'),
+        (LEADERBOARD, 'Leaderboard change'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'id'])]
+
+    def __str__(self):
+        return f"{self.kind} -> {self.user_id}"
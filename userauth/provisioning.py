@@ -0,0 +1,166 @@
+"""
+Bulk account provisioning from a CSV of name,email[,password] rows.
+
+Compared with calling RegisterView per student:
+  * existing accounts are found with one query for the whole file,
+  * password hashing, which dominates the cost, is spread over a process pool,
+  * User rows are inserted with bulk_create in batches, Profile rows with
+    bulk_create per user shard,
+  * welcome emails are queued as QueuedEmail rows for send_queued_emails.
+
+Rows without a password get an unusable one; those students set theirs
+through the forgot-password flow.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+
+from javify.sharding import shard_for_user_id
+from .models import Profile, QueuedEmail
+
+REQUIRED_COLUMNS = ('name', 'email')
+
+
+class ProvisioningError(ValueError):
+    """The file as a whole can't be used (e.g. missing columns)."""
+
+
+def read_rows(text):
+    """Parse CSV text into [(line, name, email, password)]."""
+    reader = csv.DictReader(io.StringIO(text))
+    columns = [c.strip().lower() for c in (reader.fieldnames or [])]
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ProvisioningError(f"Missing column(s): {', '.join(missing)}")
+    reader.fieldnames = columns
+
+    rows = []
+    for record in reader:
+        rows.append((
+            reader.line_num,
+            (record.get('name') or '').strip(),
+            (record.get('email') or '').strip(),
+            record.get('password') or '',
+        ))
+    return rows
+
+
+def _init_worker(settings_module):
+    # Needed when the pool starts workers with "spawn" instead of "fork"
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _hash(password):
+    return make_password(password or None)
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password() for each entry, in parallel; empty ones become unusable."""
+    if workers == 1 or len(passwords) < 2:
+        return [_hash(p) for p in passwords]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'javify.settings'),),
+    ) as pool:
+        return list(pool.map(_hash, passwords, chunksize=chunksize))
+
+
+def provision_users(rows, workers=None, batch_size=1000, send_email=True, dry_run=False):
+    """
+    Create accounts for `rows` from read_rows(). Returns a report:
+    {"created": n, "skipped": [...], "errors": [...]}.
+    """
+    report = {"created": 0, "skipped": [], "errors": []}
+
+    # Validate and drop duplicates inside the file
+    valid = []
+    seen = set()
+    for line, name, email, password in rows:
+        problems = []
+        if not name or not email:
+            problems.append("Name and email are required.")
+        else:
+            try:
+                validate_email(email)
+            except ValidationError as e:
+                problems.extend(e.messages)
+        if password and not problems:
+            try:
+                validate_password(password, User(username=email, email=email, first_name=name))
+            except ValidationError as e:
+                problems.extend(e.messages)
+        if problems:
+            report["errors"].append({"line": line, "email": email, "errors": problems})
+            continue
+        key = email.lower()
+        if key in seen:
+            report["skipped"].append({"line": line, "email": email, "reason": "Duplicate in file."})
+            continue
+        seen.add(key)
+        valid.append((line, name, email, password))
+
+    # One query for accounts that already exist (usernames are emails)
+    # Lowercased variants too, so "Name@x.com" matches a stored "name@x.com"
+    emails = sorted({variant for _, _, email, _ in valid for variant in (email, email.lower())})
+    taken = set()
+    if emails:
+        for email, username in User.objects.filter(
+            Q(email__in=emails) | Q(username__in=emails)
+        ).values_list('email', 'username'):
+            taken.add(email.lower())
+            taken.add(username.lower())
+    new_rows = []
+    for row in valid:
+        if row[2].lower() in taken:
+            report["skipped"].append({"line": row[0], "email": row[2], "reason": "A user with this email already exists."})
+        else:
+            new_rows.append(row)
+
+    if dry_run:
+        report["would_create"] = len(new_rows)
+        return report
+    if not new_rows:
+        return report
+
+    hashes = hash_passwords([password for _, _, _, password in new_rows], workers=workers)
+
+    for start in range(0, len(new_rows), batch_size):
+        batch = new_rows[start:start + batch_size]
+        users = [
+            User(username=email, email=email, first_name=name, password=hashed)
+            for (_, name, email, _), hashed in zip(batch, hashes[start:start + batch_size])
+        ]
+        with transaction.atomic():
+            created = User.objects.bulk_create(users)
+            if any(user.pk is None for user in created):
+                # MySQL doesn't return ids from bulk inserts
+                ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            if send_email:
+                QueuedEmail.objects.bulk_create(
+                    [QueuedEmail(kind=QueuedEmail.WELCOME, user_id=user.pk) for user in users]
+                )
+
+            profiles_by_shard = {}
+            for user in users:
+                profiles_by_shard.setdefault(shard_for_user_id(user.pk), []).append(Profile(user_id=user.pk))
+            for alias, profiles in profiles_by_shard.items():
+                Profile.objects.using(alias).bulk_create(profiles)
+
+        report["created"] += len(users)
+    return report
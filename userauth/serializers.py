@@ -0,0 +1,11 @@
+def profile_data(user, profile):
+    """Profile payload shared by ProfileView and the delta sync endpoint."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.first_name,
+        "xp": profile.xp,
+        "level": profile.level,
+        "coins": profile.coins,
+        "avatar": profile.avatar,
+    }
@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from javify.sharding import dedicated_shards, shard_for_user
+from .models import Profile, UserStateVersion
+
+
+@receiver(post_delete, sender=User)
+def delete_profile_on_shard(sender, instance, **kwargs):
+    """The collector only cascades on "default"; clean up the user's shard too."""
+    alias = shard_for_user(instance)
+    if alias in dedicated_shards():
+        Profile.objects.using(alias).filter(user_id=instance.pk).delete()
+        UserStateVersion.objects.using(alias).filter(user_id=instance.pk).delete()
+
+
+# -----------------------------
+# Per-user state version
+# -----------------------------
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, **kwargs):
+    UserStateVersion.bump(instance.user_id)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    # Don't recreate the row while the user itself is being deleted
+    UserStateVersion.bump(instance.user_id, create=False)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Name and email are part of the profile payload; logins only touch last_login
+    if not created and update_fields != frozenset(['last_login']):
+        UserStateVersion.bump(instance.pk)
@@ -1,3 +1,126 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from javify.sharding import UserShardRouter, shard_for_user_id
+from tutorials.models import Level
+from .models import Profile, UserStateVersion
+
+SHARDS = ['default', 'test_shard']
+
+
+def create_user_on(alias, username):
+    """A user whose rows hash to the shard `alias`."""
+    user_id = next(pk for pk in range(1000, 2000) if shard_for_user_id(pk) == alias)
+    return User.objects.create_user(username, id=user_id)
+
+
+# -----------------------------
+# Sharding
+# -----------------------------
+class ShardSelectionTests(SimpleTestCase):
+    def test_single_shard_is_default(self):
+        self.assertEqual({shard_for_user_id(pk, ['default']) for pk in range(50)}, {'default'})
+
+    def test_users_spread_over_all_shards(self):
+        shards = ['default', 'a', 'b']
+        self.assertEqual({shard_for_user_id(pk, shards) for pk in range(50)}, set(shards))
+
+    def test_mapping_is_stable(self):
+        # crc32, not hash(): every process has to agree, and existing rows stay put
+        self.assertEqual([shard_for_user_id(pk, ['default', 'a', 'b']) for pk in (1, 2, 3)], ['b', 'a', 'a'])
+
+    def test_only_per_user_tables_migrate_on_dedicated_shards(self):
+        router = UserShardRouter()
+        with override_settings(USER_SHARDS=SHARDS):
+            self.assertTrue(router.allow_migrate('test_shard', 'userauth', 'profile'))
+            self.assertFalse(router.allow_migrate('test_shard', 'tutorials', 'level'))
+            self.assertIsNone(router.allow_migrate('default', 'tutorials', 'level'))
+
+
+@override_settings(USER_SHARDS=SHARDS)
+class ShardRoutingTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = create_user_on('test_shard', 'sharded')
+
+    def test_rows_are_written_to_the_users_shard(self):
+        Profile.objects.for_user(self.user).create(user=self.user)
+
+        self.assertTrue(Profile.objects.using('test_shard').filter(user=self.user).exists())
+        self.assertFalse(Profile.objects.using('default').exists())
+        # Saving bumps the state version next to the profile
+        self.assertEqual(UserStateVersion.objects.using('test_shard').get(user=self.user).version, 1)
+
+    def test_related_access_reads_the_users_shard(self):
+        Profile.objects.for_user(self.user).create(user=self.user, xp=42)
+
+        self.assertEqual(User.objects.get(pk=self.user.pk).profile.xp, 42)
+
+    def test_saving_an_instance_routes_by_user(self):
+        profile = Profile(user=self.user)
+        profile.save()
+
+        self.assertEqual(profile._state.db, 'test_shard')
+
+    def test_catalog_models_are_left_to_the_other_routers(self):
+        router = UserShardRouter()
+        self.assertIsNone(router.db_for_write(Level, instance=Level(number=1)))
+
+    def test_deleting_the_user_cleans_up_the_shard(self):
+        Profile.objects.for_user(self.user).create(user=self.user)
+        self.user.delete()
+
+        self.assertFalse(Profile.objects.using('test_shard').exists())
+        self.assertFalse(UserStateVersion.objects.using('test_shard').exists())
+
+
+# -----------------------------
+# Conditional GETs
+# -----------------------------
+class UserStateETagTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.profile = Profile.objects.for_user(self.user).create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_unchanged_state_answers_304(self):
+        response = self.get('/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        response = self.get('/profile/', response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+    def test_writes_change_the_etag(self):
+        etag = self.get('/profile/')['ETag']
+        self.profile.add_xp(10)
+
+        response = self.get('/profile/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['xp'], 20)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_of_another_user_does_not_match(self):
+        etag = self.get('/profile/')['ETag']
+        other = User.objects.create_user('other')
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.get('/profile/', etag).status_code, 200)
+
+    def test_catalog_changes_change_the_etag(self):
+        etag = self.get('/user/progress/')['ETag']
+        self.assertEqual(self.get('/user/progress/', etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Level.objects.create(number=1, title='Basics')
+        self.assertEqual(self.get('/user/progress/', etag).status_code, 200)
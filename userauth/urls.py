@@ -7,8 +7,10 @@ urlpatterns = [
     path("auth/login/", EmailLoginView.as_view(), name="email-login"),
     path('auth/google/', GoogleLoginView.as_view(), name='google_login'),  # Social login endpoint
     path('profile/', ProfileView.as_view(), name='profile'),  # User profile
+    path('events/', event_stream, name='event-stream'),  # Live rewards (SSE, ASGI only)
     path('auth/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     path("auth/logout/", LogoutView.as_view(), name="logout"),
+    path("auth/bulk-provision/", BulkProvisionView.as_view(), name="bulk-provision"),  # Staff only
    
     path("", include("tutorials.urls")),
 
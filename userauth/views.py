@@ -3,23 +3,25 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError, AccessToken
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from .models import *
 import logging
 from .serializers import *
+from .conditional import user_state_etag
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.forms import PasswordResetForm
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
+from .events import authenticate_stream, stream_events
 
 
 logger = logging.getLogger(__name__)
@@ -68,14 +70,14 @@ class RegisterView(APIView):
                 first_name=name,
             )
 
-            profile = Profile.objects.create(user=user)
+            profile = Profile.objects.for_user(user).create(user=user)
             send_welcome_email(user)
 
             # --- Generate JWT tokens ---
             refresh = RefreshToken.for_user(user)
             access = refresh.access_token
 
-            logger.info(f"New user registered: {email}")
+            logger.info("New user registered: %s", email)
 
             return Response(
                 {
@@ -130,7 +132,7 @@ class EmailLoginView(APIView):
         # --- Authenticate user normally ---
         user = authenticate(username=email, password=password)
         if user is None:
-            logger.warning(f"Failed login attempt for {email}")
+            logger.warning("Failed login attempt for %s", email)
             return Response(
                 {"error": "Invalid email or password."},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -141,9 +143,9 @@ class EmailLoginView(APIView):
             refresh = RefreshToken.for_user(user)
             access = refresh.access_token
 
-            profile, _ = Profile.objects.get_or_create(user=user)
+            profile, _ = Profile.objects.for_user(user).get_or_create(user=user)
 
-            logger.info(f"User logged in: {email}")
+            logger.info("User logged in: %s", email)
 
             return Response(
                 {
@@ -172,11 +174,8 @@ class EmailLoginView(APIView):
 
 def send_welcome_email(user):
     """Send HTML welcome email after signup."""
-    subject = "🎉 Welcome to CodeLearn!"
-    html_message = render_to_string("emails/welcome_email.html", {"user": user})
-    email = EmailMessage(subject, html_message, settings.DEFAULT_FROM_EMAIL, [user.email])
-    email.content_subtype = "html"
-    email.send(fail_silently=True)
+    from .emails import welcome_email
+    welcome_email(user).send(fail_silently=True)
 
 
 class GoogleLoginView(APIView):
@@ -187,6 +186,10 @@ class GoogleLoginView(APIView):
         if not token:
             return Response({"error": "No token provided"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # google-auth pulls in requests/urllib3; only this rarely used view needs it
+        from google.oauth2 import id_token
+        from google.auth.transport import requests as google_requests
+
         try:
             logger.info("Verifying Google token...")
 
@@ -209,11 +212,11 @@ class GoogleLoginView(APIView):
             )
 
             # Create or update profile
-            profile, profile_created = Profile.objects.get_or_create(user=user)
+            profile, profile_created = Profile.objects.for_user(user).get_or_create(user=user)
             if created or profile_created:
                 profile.avatar = avatar_url
                 profile.save()
-                logger.info(f"Created new profile for {email}")
+                logger.info("Created new profile for %s", email)
 
             refresh = RefreshToken.for_user(user)
             access = refresh.access_token
@@ -239,19 +242,11 @@ class GoogleLoginView(APIView):
 class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @user_state_etag('profile')
     def get(self, request):
         user = request.user
-        profile, _ = Profile.objects.get_or_create(user=user)
-        data = {
-            "id": user.id,
-            "email": user.email,
-            "name": user.first_name,
-            "xp": profile.xp,
-            "level": profile.level,
-            "coins": profile.coins,
-            "avatar": profile.avatar,
-        }
-        return Response(data, status=200)
+        profile, _ = Profile.objects.for_user(user).get_or_create(user=user)
+        return Response(profile_data(user, profile), status=200)
 
 class LogoutView(APIView):
     """
@@ -338,7 +333,7 @@ class TokenRefreshView(APIView):
             }, status=status.HTTP_200_OK)
 
         except TokenError as e:
-            logger.error(f"Invalid refresh token: {str(e)}")
+            logger.error("Invalid refresh token: %s", e)
             return Response({"error": "Invalid or expired refresh token"}, status=status.HTTP_401_UNAUTHORIZED)
         except Exception as e:
             logger.exception("Unexpected error during token refresh")
@@ -424,4 +419,70 @@ class ResetPasswordConfirmView(APIView):
 
         user.set_password(new_password)
         user.save()
-        return Response({"message": "Password reset successfully."}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({"message": "Password reset successfully."}, status=status.HTTP_200_OK)
+
+
+class BulkProvisionView(APIView):
+    """
+    Staff only: create accounts from a CSV (name,email[,password]) sent as
+    the "file" upload or a "csv" text field. Larger batches than
+    PROVISIONING_API_MAX_ROWS go through the provision_users command.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        # Loads multiprocessing for the hashing pool; keep it off worker start-up
+        from .provisioning import ProvisioningError, provision_users, read_rows
+
+        upload = request.FILES.get("file")
+        if upload is not None:
+            text = upload.read().decode("utf-8-sig", errors="replace")
+        else:
+            text = request.data.get("csv") or ""
+        if not text.strip():
+            return Response({"error": "Upload a CSV file or send it in the csv field."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = read_rows(text)
+        except ProvisioningError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.PROVISIONING_API_MAX_ROWS:
+            return Response(
+                {"error": f"At most {settings.PROVISIONING_API_MAX_ROWS} rows per request; use the provision_users command."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = str(request.query_params.get("dry_run", "")).lower() in ("1", "true", "yes")
+        report = provision_users(rows, dry_run=dry_run)
+        logger.info("Bulk provisioning by %s: %s created", request.user.email, report["created"])
+        return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+# -----------------------------
+# Live events (server-sent events)
+# -----------------------------
+@require_GET
+async def event_stream(request):
+    """
+    Reward, level-completion and leaderboard events for the current user as
+    text/event-stream (see userauth/events.py). Replaces polling profile/
+    and user/levels/ after each submission.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would hold a thread for the life of the connection
+        return JsonResponse({"error": "Event streams are served by the ASGI workers."}, status=501)
+
+    user = await sync_to_async(authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(stream_events(user.pk, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response